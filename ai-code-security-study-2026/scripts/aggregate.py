@@ -11,15 +11,36 @@ Usage:
     python3 analysis/aggregate.py                     # Default paths
     python3 analysis/aggregate.py --csv validation.csv --output ../../data/ai_code_study_2026.json
     python3 analysis/aggregate.py --scan-date 2026-03-01
+    python3 analysis/aggregate.py --cube              # Update findings.cube, aggregate from it
+    python3 analysis/aggregate.py --bootstrap 0       # Skip the bootstrap confidence intervals (no numpy needed)
+    python3 analysis/aggregate.py --split --compress  # Minified per-section shards + index
 """
 
 import argparse
 import csv
+import gzip
+import hashlib
 import json
+import os
+import re
 import sys
+import time
 from collections import Counter, defaultdict
+from itertools import combinations
 from pathlib import Path
 
+import sample_catalog
+
+try:
+    import numpy as np
+except ImportError:  # required only for the bootstrap; --bootstrap 0 runs without it
+    np = None
+
+try:
+    import brotli
+except ImportError:  # optional; --compress then writes only .gz siblings
+    brotli = None
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -29,8 +50,19 @@ STUDY_DIR = SCRIPT_DIR.parent
 HUGO_SITE_DIR = STUDY_DIR.parent
 DEFAULT_CSV = SCRIPT_DIR / "validation.csv"
 DEFAULT_OUTPUT = HUGO_SITE_DIR / "data" / "ai_code_study_2026.json"
+DEFAULT_SPLIT_DIR = HUGO_SITE_DIR / "static" / "data" / "ai_code_study_2026"
 CONFIG_PATH = STUDY_DIR / "config.json"
-PROMPTS_DIR = STUDY_DIR / "prompts"
+PROMPTS_DIR = sample_catalog.PROMPTS_DIR  # shared with collect.py, so they share a catalog
+OUTPUT_DIR = SCRIPT_DIR / "output"
+
+# Bootstrap confidence intervals for vulnerability rates
+DEFAULT_BOOTSTRAP_RESAMPLES = 10000
+DEFAULT_BOOTSTRAP_SEED = 2026
+CI_LEVEL = 0.95
+
+# Split output: {section}.{hash}.json shards listed in index.json
+SPLIT_INDEX_NAME = "index.json"
+SPLIT_HASH_DIGITS = 10
 
 # OWASP Top 10 (2021) category names
 OWASP_NAMES = {
@@ -118,53 +150,56 @@ def load_models():
     return {m["id"]: m["name"] for m in config.get("models", [])}
 
 
-def count_prompts():
+def load_catalog(model_ids=None):
     """
-    Count total prompts from prompts/{language}/*.json files.
-
-    Returns (total_prompts, prompts_by_language).
+    Load the prompt/sample catalog (see sample_catalog.py), rebuilding it
+    only if the prompt files, the collection manifest, the models or a code
+    file changed.
     """
-    total = 0
-    by_language = {}
+    if model_ids is None:
+        model_ids = list(load_models())
+    return sample_catalog.SampleCatalog.load(PROMPTS_DIR, OUTPUT_DIR, model_ids)
 
-    if not PROMPTS_DIR.is_dir():
-        return 0, {}
 
-    for lang_dir in sorted(PROMPTS_DIR.iterdir()):
-        if not lang_dir.is_dir() or lang_dir.name.startswith("."):
-            continue
-        lang = lang_dir.name
-        lang_count = 0
-        for prompt_file in lang_dir.glob("*.json"):
-            try:
-                with open(prompt_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                lang_count += len(data.get("prompts", []))
-            except (json.JSONDecodeError, OSError):
-                continue
-        by_language[lang] = lang_count
-        total += lang_count
+def count_prompts(catalog=None):
+    """
+    Count total prompts from the catalog of prompts/{language}/*.json files.
 
-    return total, by_language
+    Returns (total_prompts, prompts_by_language).
+    """
+    return (catalog or load_catalog()).prompt_counts()
 
 
-def load_validation_csv(csv_path):
+def iter_validation_csv(csv_path):
     """
-    Load validation.csv and return all rows as dicts.
+    Yield validation.csv rows as dicts, one at a time.
 
     Each row has: finding_id, model, file, line, cwe, owasp, severity,
     tools, validated, notes.
     """
-    rows = []
     if not csv_path.exists():
-        return rows
+        return
 
     with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
+        yield from csv.DictReader(f)
+
+
+def list_prompt_samples(catalog=None):
+    """
+    Return one (language, owasp_id, prompt_id) tuple per prompt, sorted.
+
+    Each prompt is one code sample per model, at output path
+    {language}/{owasp_id}/{prompt_id}.{ext}.
+    """
+    return sorted(
+        (item["language"], item["owasp_id"], item["prompt"]["id"])
+        for item in (catalog or load_catalog()).prompts
+    )
 
-    return rows
+
+def load_validation_csv(csv_path):
+    """Load validation.csv and return all rows as a list of dicts."""
+    return list(iter_validation_csv(csv_path))
 
 
 # ---------------------------------------------------------------------------
@@ -201,26 +236,263 @@ def get_cwe_name(cwe_id):
 # ---------------------------------------------------------------------------
 
 
-def aggregate(rows, scan_date="2026-02-XX"):
+class FindingStats:
+    """
+    Every count the Hugo data file needs, accumulated in one pass over the
+    validation rows.
+
+    Rows are not kept: memory grows with the number of distinct files,
+    models and CWEs, not with the number of rows. Only TP rows feed the
+    breakdowns; FP rows are counted, and every row contributes its tools.
+    """
+
+    def __init__(self):
+        self.total_rows = 0
+        self.tp = 0
+        self.fp = 0
+        self.tools_seen = set()
+
+        self.model_findings = Counter()              # model -> TP findings
+        self.model_files = defaultdict(set)          # model -> vulnerable files
+        self.model_owasp = defaultdict(Counter)      # model -> owasp -> findings
+        self.model_severity = defaultdict(Counter)   # model -> severity -> findings
+        self.owasp_model = defaultdict(Counter)      # owasp -> model -> findings
+        self.lang_files = defaultdict(set)           # language -> vulnerable files
+        self.lang_model_findings = Counter()         # (language, model) -> findings
+        self.lang_model_files = defaultdict(set)     # (language, model) -> vulnerable files
+        self.tool_counts = Counter()                 # tools per finding (capped at 3)
+        self.cwes = Counter()                        # cwe -> findings, first-seen order
+
+        self._languages = {}  # file -> language cache
+
+    def language(self, filepath):
+        lang = self._languages.get(filepath)
+        if lang is None:
+            lang = self._languages[filepath] = extract_language_from_file(filepath)
+        return lang
+
+    def add(self, row):
+        self.total_rows += 1
+        tools = parse_tools(row.get("tools", ""))
+        self.tools_seen.update(tools)
+
+        verdict = row.get("validated", "").strip().upper()
+        if verdict == "FP":
+            self.fp += 1
+            return
+        if verdict != "TP":
+            return
+        self.tp += 1
+
+        model = row.get("model", "")
+        filepath = row.get("file", "")
+        lang = self.language(filepath)
+
+        self.model_findings[model] += 1
+        self.lang_model_findings[(lang, model)] += 1
+        if filepath:
+            self.model_files[model].add(filepath)
+            self.lang_files[lang].add(filepath)
+            self.lang_model_files[(lang, model)].add(filepath)
+
+        owasp = row.get("owasp", "").strip()
+        if owasp:
+            self.model_owasp[model][owasp] += 1
+        self.owasp_model[owasp][model] += 1
+
+        sev = row.get("severity", "").strip().upper()
+        if sev:
+            self.model_severity[model][sev] += 1
+
+        self.tool_counts[min(len(tools), 3)] += 1
+
+        cwe = row.get("cwe", "").strip()
+        if cwe:
+            self.cwes[cwe] += 1
+
+
+def stats_from_cube(cube):
+    """
+    Fill a FindingStats from a findings_cube.FindingsCube instead of rows.
+
+    Cells are visited in cube order, which for a freshly built cube is the
+    order their first row appeared in, so top_cwes ties break the same way.
+    """
+    stats = FindingStats()
+    verdicts = cube.slice(["verdict"])
+    stats.total_rows = sum(g["findings"] for g in verdicts.values())
+    stats.tp = verdicts.get(("TP",), {}).get("findings", 0)
+    stats.fp = verdicts.get(("FP",), {}).get("findings", 0)
+    for (tools,) in cube.slice(["tools"]):
+        stats.tools_seen.update(parse_tools(tools))
+
+    dims = ["model", "language", "owasp", "cwe", "severity", "tools"]
+    for (model, lang, owasp, cwe, sev, tools), group in cube.slice(dims, {"verdict": "TP"}).items():
+        count = group["findings"]
+        files = cube.file_paths(group["files"])
+
+        stats.model_findings[model] += count
+        stats.lang_model_findings[(lang, model)] += count
+        if files:
+            stats.model_files[model] |= files
+            stats.lang_files[lang] |= files
+            stats.lang_model_files[(lang, model)] |= files
+        if owasp:
+            stats.model_owasp[model][owasp] += count
+        stats.owasp_model[owasp][model] += count
+        if sev:
+            stats.model_severity[model][sev] += count
+        stats.tool_counts[min(len(parse_tools(tools)), 3)] += count
+        if cwe:
+            stats.cwes[cwe] += count
+    return stats
+
+
+def accumulate(rows):
+    """Stream an iterable of validation rows into a FindingStats."""
+    stats = FindingStats()
+    for row in rows:
+        stats.add(row)
+    return stats
+
+
+def rate(vulnerable, total):
+    """Percentage rounded to one decimal, 0.0 when there is nothing to divide."""
+    return round((vulnerable / total * 100) if total > 0 else 0.0, 1)
+
+
+def aggregate(rows, scan_date="2026-02-XX", **options):
     """
     Build the full aggregation data structure from validated CSV rows.
 
     Only TP (True Positive) findings are counted in vulnerability metrics.
-    FP findings are counted separately in metadata.
+    FP findings are counted separately in metadata. `rows` may be any
+    iterable (e.g. iter_validation_csv); it is consumed once. Options
+    (bootstrap, seed) are passed to build_result.
     """
-    model_names = load_models()
-    total_prompts, prompts_by_language = count_prompts()
-    model_ids = list(model_names.keys())
+    return build_result(accumulate(rows), scan_date=scan_date, **options)
+
+
+# ---------------------------------------------------------------------------
+# Bootstrap confidence intervals
+# ---------------------------------------------------------------------------
+
+
+def resample_rates(matrix, cols, resamples, rng):
+    """
+    Bootstrap the vulnerability rate (%) of every model over the samples
+    in `cols`, resampling those samples with replacement.
+
+    `matrix` holds one 0/1 row per model (1 = sample vulnerable). All
+    models share the same resampled sample indexes, so their rates stay
+    paired. Returns a (models, resamples) array of rates.
+    """
+    n = len(cols)
+    idx = rng.integers(0, n, size=(resamples, n))
+    return matrix[:, cols][:, idx].mean(axis=2) * 100
 
-    # Separate TP and FP rows
-    tp_rows = [r for r in rows if r.get("validated", "").strip().upper() == "TP"]
-    fp_rows = [r for r in rows if r.get("validated", "").strip().upper() == "FP"]
 
-    # Collect all tools seen across all rows (TP and FP)
-    all_tools_seen = set()
-    for r in rows:
-        for tool in parse_tools(r.get("tools", "")):
-            all_tools_seen.add(tool)
+def summarize(values, point):
+    """Point estimate plus percentile CI, rounded like vulnerability_rate."""
+    tail = (1 - CI_LEVEL) / 2 * 100
+    lo, hi = np.percentile(values, [tail, 100 - tail])
+    return {"rate": round(point, 1), "ci": [round(float(lo), 1), round(float(hi), 1)]}
+
+
+def bootstrap_intervals(stats, model_ids, resamples=DEFAULT_BOOTSTRAP_RESAMPLES,
+                        seed=DEFAULT_BOOTSTRAP_SEED, catalog=None):
+    """
+    Percentile bootstrap CIs for vulnerability rates, resampling code samples.
+
+    Covers each model overall, per language and per OWASP category (plus
+    all models pooled for each language and category), and every pairwise
+    difference between model rates. Uses one vectorized numpy resample
+    per sample group; numpy is required, so a given seed always yields
+    the same intervals.
+    """
+    if np is None:
+        raise RuntimeError("bootstrap confidence intervals need numpy (pip3 install numpy)")
+    samples = list_prompt_samples(catalog)
+    keys = {f"{lang}/{owasp}/{pid}": i for i, (lang, owasp, pid) in enumerate(samples)}
+    rows = []
+    for model_id in model_ids:
+        row = [0] * len(samples)
+        for filepath in stats.model_files.get(model_id, ()):
+            i = keys.get(Path(filepath).with_suffix("").as_posix())
+            if i is not None:
+                row[i] = 1
+        rows.append(row)
+
+    if not samples or not rows:
+        return {}
+
+    matrix = np.array(rows, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    def point(m, cols):
+        return sum(rows[m][c] for c in cols) * 100 / len(cols)
+
+    def group(cols):
+        resampled = resample_rates(matrix, cols, resamples, rng)
+        pooled = resampled.mean(axis=0)
+        pooled_point = sum(point(m, cols) for m in range(len(rows))) / len(rows)
+        return resampled, {
+            **summarize(pooled, pooled_point),
+            "by_model": {
+                model_ids[m]: summarize(resampled[m], point(m, cols)) for m in range(len(rows))
+            },
+        }
+
+    all_cols = list(range(len(samples)))
+    overall, overall_summary = group(all_cols)
+
+    by_language, by_owasp = {}, {}
+    for index, target in ((0, by_language), (1, by_owasp)):
+        for value in sorted({s[index] for s in samples}):
+            cols = [i for i, s in enumerate(samples) if s[index] == value]
+            target[value] = group(cols)[1]
+
+    pairwise = []
+    for a, b in combinations(range(len(rows)), 2):
+        diff = summarize(overall[a] - overall[b], point(a, all_cols) - point(b, all_cols))
+        pairwise.append({
+            "model_a": model_ids[a],
+            "model_b": model_ids[b],
+            "diff": diff["rate"],
+            "ci": diff["ci"],
+            "significant": diff["ci"][0] > 0 or diff["ci"][1] < 0,
+        })
+
+    return {
+        "method": "percentile bootstrap over code samples",
+        "level": CI_LEVEL,
+        "resamples": resamples,
+        "seed": seed,
+        "by_model": overall_summary["by_model"],
+        "all_models": {"rate": overall_summary["rate"], "ci": overall_summary["ci"]},
+        "by_language": by_language,
+        "by_owasp": by_owasp,
+        "pairwise": pairwise,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+
+def build_result(stats, scan_date="2026-02-XX", bootstrap=DEFAULT_BOOTSTRAP_RESAMPLES,
+                 seed=DEFAULT_BOOTSTRAP_SEED):
+    """
+    Produce the Hugo data structure from accumulated FindingStats.
+
+    With bootstrap > 0, a confidence_intervals section is added (see
+    bootstrap_intervals).
+    """
+    model_names = load_models()
+    catalog = load_catalog(list(model_names))
+    total_prompts, prompts_by_language = count_prompts(catalog)
+    model_ids = list(model_names.keys())
 
     # total_code_samples = total_prompts * number of models
     total_models = len(model_ids)
@@ -232,67 +504,34 @@ def aggregate(rows, scan_date="2026-02-XX"):
     by_model = {}
 
     for model_id in model_ids:
-        model_tp = [r for r in tp_rows if r.get("model") == model_id]
-
         # Vulnerable samples = unique files with at least one TP finding
-        vulnerable_files = set(r.get("file", "") for r in model_tp if r.get("file"))
-        vulnerable_count = len(vulnerable_files)
+        vulnerable_count = len(stats.model_files.get(model_id, ()))
 
         # Total samples for this model = total_prompts (all prompts sent to all models)
         model_total_samples = total_prompts
 
-        vuln_rate = round(
-            (vulnerable_count / model_total_samples * 100) if model_total_samples > 0 else 0.0,
-            1,
-        )
-
-        # OWASP breakdown
-        model_owasp = Counter()
-        for r in model_tp:
-            owasp = r.get("owasp", "").strip()
-            if owasp:
-                model_owasp[owasp] += 1
-
-        # Language breakdown
-        model_by_lang = {}
-        lang_files = defaultdict(set)     # lang -> set of all files
-        lang_vuln_files = defaultdict(set) # lang -> set of vulnerable files
-        for r in model_tp:
-            lang = extract_language_from_file(r.get("file", ""))
-            if lang == "unknown":
-                continue
-            lang_vuln_files[lang].add(r.get("file", ""))
-
         # Total files per language = prompts in that language
+        model_by_lang = {}
         for lang, lang_prompt_count in prompts_by_language.items():
-            vuln_in_lang = len(lang_vuln_files.get(lang, set()))
-            lang_total = lang_prompt_count  # each prompt = one code sample per model
-            lang_vuln_rate = round(
-                (vuln_in_lang / lang_total * 100) if lang_total > 0 else 0.0,
-                1,
-            )
+            if lang == "unknown":
+                vuln_in_lang = 0
+            else:
+                vuln_in_lang = len(stats.lang_model_files.get((lang, model_id), ()))
             model_by_lang[lang] = {
-                "vuln_rate": lang_vuln_rate,
-                "total": lang_total,
+                "vuln_rate": rate(vuln_in_lang, lang_prompt_count),
+                "total": lang_prompt_count,
                 "vulnerable": vuln_in_lang,
             }
 
-        # Severity breakdown
-        model_severity = Counter()
-        for r in model_tp:
-            sev = r.get("severity", "").strip().upper()
-            if sev:
-                model_severity[sev] += 1
-
         by_model[model_id] = {
             "name": model_names.get(model_id, model_id),
             "total_samples": model_total_samples,
             "vulnerable_samples": vulnerable_count,
-            "vulnerability_rate": vuln_rate,
-            "total_findings": len(model_tp),
-            "by_owasp": dict(sorted(model_owasp.items())),
+            "vulnerability_rate": rate(vulnerable_count, model_total_samples),
+            "total_findings": stats.model_findings.get(model_id, 0),
+            "by_owasp": dict(sorted(stats.model_owasp.get(model_id, {}).items())),
             "by_language": dict(sorted(model_by_lang.items())),
-            "by_severity": dict(sorted(model_severity.items())),
+            "by_severity": dict(sorted(stats.model_severity.get(model_id, {}).items())),
         }
 
     # -----------------------------------------------------------------------
@@ -300,13 +539,10 @@ def aggregate(rows, scan_date="2026-02-XX"):
     # -----------------------------------------------------------------------
     by_owasp = {}
     for owasp_id, owasp_name in sorted(OWASP_NAMES.items()):
-        owasp_tp = [r for r in tp_rows if r.get("owasp", "").strip() == owasp_id]
-        owasp_by_model = Counter()
-        for r in owasp_tp:
-            owasp_by_model[r.get("model", "")] += 1
+        owasp_by_model = stats.owasp_model.get(owasp_id, Counter())
         by_owasp[owasp_id] = {
             "name": owasp_name,
-            "total_findings": len(owasp_tp),
+            "total_findings": sum(owasp_by_model.values()),
             "by_model": dict(sorted(owasp_by_model.items())),
         }
 
@@ -315,36 +551,21 @@ def aggregate(rows, scan_date="2026-02-XX"):
     # -----------------------------------------------------------------------
     by_language = {}
     for lang, lang_prompt_count in sorted(prompts_by_language.items()):
-        lang_tp = [
-            r for r in tp_rows
-            if extract_language_from_file(r.get("file", "")) == lang
-        ]
-
-        # Overall vuln rate for this language across all models
-        lang_vuln_files_all = set(r.get("file", "") for r in lang_tp if r.get("file"))
         # Total samples for this language = prompts_in_lang * total_models
-        lang_total_all = lang_prompt_count * total_models
-        lang_vuln_rate_all = round(
-            (len(lang_vuln_files_all) / lang_total_all * 100) if lang_total_all > 0 else 0.0,
-            1,
+        lang_vuln_rate_all = rate(
+            len(stats.lang_files.get(lang, ())), lang_prompt_count * total_models
         )
 
         lang_by_model = {}
         for model_id in model_ids:
-            model_lang_tp = [
-                r for r in lang_tp if r.get("model") == model_id
-            ]
-            model_lang_vuln_files = set(
-                r.get("file", "") for r in model_lang_tp if r.get("file")
-            )
-            model_lang_total = lang_prompt_count
-            model_lang_rate = round(
-                (len(model_lang_vuln_files) / model_lang_total * 100)
-                if model_lang_total > 0 else 0.0,
-                1,
-            )
-            if model_lang_tp:  # only include models that have findings in this language
-                lang_by_model[model_id] = {"vuln_rate": model_lang_rate}
+            # only include models that have findings in this language
+            if stats.lang_model_findings.get((lang, model_id)):
+                lang_by_model[model_id] = {
+                    "vuln_rate": rate(
+                        len(stats.lang_model_files.get((lang, model_id), ())),
+                        lang_prompt_count,
+                    )
+                }
 
         by_language[lang] = {
             "vuln_rate": lang_vuln_rate_all,
@@ -354,37 +575,18 @@ def aggregate(rows, scan_date="2026-02-XX"):
     # -----------------------------------------------------------------------
     # tool_agreement
     # -----------------------------------------------------------------------
-    single_tool = 0
-    two_tools = 0
-    three_plus = 0
-    for r in tp_rows:
-        tools = parse_tools(r.get("tools", ""))
-        n = len(tools)
-        if n >= 3:
-            three_plus += 1
-        elif n == 2:
-            two_tools += 1
-        else:
-            single_tool += 1
-
     tool_agreement = {
-        "single_tool_only": single_tool,
-        "two_tools": two_tools,
-        "three_or_more": three_plus,
+        "single_tool_only": stats.tool_counts[0] + stats.tool_counts[1],
+        "two_tools": stats.tool_counts[2],
+        "three_or_more": stats.tool_counts[3],
     }
 
     # -----------------------------------------------------------------------
     # top_cwes
     # -----------------------------------------------------------------------
-    cwe_counter = Counter()
-    for r in tp_rows:
-        cwe = r.get("cwe", "").strip()
-        if cwe:
-            cwe_counter[cwe] += 1
-
     top_cwes = [
         {"cwe": cwe, "name": get_cwe_name(cwe), "count": count}
-        for cwe, count in cwe_counter.most_common(20)
+        for cwe, count in stats.cwes.most_common(20)
     ]
 
     # -----------------------------------------------------------------------
@@ -395,12 +597,12 @@ def aggregate(rows, scan_date="2026-02-XX"):
             "total_prompts": total_prompts,
             "total_models": total_models,
             "total_code_samples": total_code_samples,
-            "total_findings_raw": len(rows),
-            "total_findings_validated_tp": len(tp_rows),
-            "total_findings_validated_fp": len(fp_rows),
+            "total_findings_raw": stats.total_rows,
+            "total_findings_validated_tp": stats.tp,
+            "total_findings_validated_fp": stats.fp,
             "scan_date": scan_date,
             "models": [model_names.get(mid, mid) for mid in model_ids],
-            "tools": sorted(all_tools_seen) if all_tools_seen else [],
+            "tools": sorted(stats.tools_seen) if stats.tools_seen else [],
         },
         "by_model": by_model,
         "by_owasp": by_owasp,
@@ -409,9 +611,80 @@ def aggregate(rows, scan_date="2026-02-XX"):
         "top_cwes": top_cwes,
     }
 
+    if bootstrap > 0:
+        result["confidence_intervals"] = bootstrap_intervals(
+            stats, model_ids, resamples=bootstrap, seed=seed, catalog=catalog
+        )
+
     return result
 
 
+# ---------------------------------------------------------------------------
+# Split output
+# ---------------------------------------------------------------------------
+
+
+def write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_split(result, out_dir, compress=False):
+    """
+    Write each top-level section of `result` as a minified shard named
+    {section}.{content hash}.json, plus an index.json mapping sections to
+    shard files, so pages can fetch only the sections they chart and cache
+    shards forever.
+
+    With compress, each shard also gets a .gz sibling (and a .br one if the
+    brotli package is installed) when that is smaller than the shard. The index is written last, then shards
+    from earlier runs are removed. Returns the index dict.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = {"sections": {}}
+    keep = {SPLIT_INDEX_NAME}
+
+    for section, value in result.items():
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{section}.{digest[:SPLIT_HASH_DIGITS]}.json"
+        entry = {"file": name, "bytes": len(data), "sha256": digest}
+
+        variants = [(name, data)]
+        if compress:
+            encoded = [("gzip", ".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                encoded.append(("brotli", ".br", brotli.compress(data, quality=11)))
+            for encoding, suffix, blob in encoded:
+                if len(blob) < len(data):  # tiny shards don't shrink
+                    variants.append((name + suffix, blob))
+                    entry[encoding] = {"file": name + suffix, "bytes": len(blob)}
+
+        for file_name, blob in variants:
+            path = out_dir / file_name
+            if not path.exists():  # content-addressed: same name, same bytes
+                write_atomic(path, blob)
+            keep.add(file_name)
+        index["sections"][section] = entry
+
+    write_atomic(
+        out_dir / SPLIT_INDEX_NAME,
+        json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    )
+
+    # Remove shards of these sections left over from earlier runs
+    stale = re.compile(
+        rf"^(?:{'|'.join(map(re.escape, result))})\.[0-9a-f]{{{SPLIT_HASH_DIGITS}}}\.json(?:\.gz|\.br)?$"
+    )
+    for path in out_dir.iterdir():
+        if path.name not in keep and stale.match(path.name):
+            path.unlink()
+
+    return index
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -443,16 +716,68 @@ def main():
         default="2026-02-XX",
         help="Date string for metadata.scan_date (default: 2026-02-XX)",
     )
+    parser.add_argument(
+        "--cube",
+        type=Path,
+        nargs="?",
+        const=SCRIPT_DIR / "findings.cube",
+        default=None,
+        help="Update this findings cube from the CSV and aggregate from it "
+             f"(default when given without a path: {SCRIPT_DIR / 'findings.cube'})",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=DEFAULT_BOOTSTRAP_RESAMPLES,
+        help=f"Bootstrap resamples for rate confidence intervals, 0 = skip (default: {DEFAULT_BOOTSTRAP_RESAMPLES})",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_BOOTSTRAP_SEED,
+        help=f"Bootstrap random seed (default: {DEFAULT_BOOTSTRAP_SEED})",
+    )
+    parser.add_argument(
+        "--split",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_SPLIT_DIR,
+        default=None,
+        metavar="DIR",
+        help="Write minified per-section shards and an index to DIR instead of "
+             f"one JSON file (default DIR: {DEFAULT_SPLIT_DIR})",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="With --split, also write .gz (and .br, if brotli is installed) shards",
+    )
     args = parser.parse_args()
+    if args.compress and not args.split:
+        parser.error("--compress requires --split")
+    if args.bootstrap < 0:
+        parser.error("--bootstrap must be >= 0")
+    if args.bootstrap and np is None:
+        parser.error("--bootstrap needs numpy (pip3 install numpy); --bootstrap 0 skips the intervals")
 
     print("Aggregation Script")
     print("=" * 50)
 
-    # Load validation CSV
+    # Stream the validation CSV into the accumulators
     print(f"Input:  {args.csv}")
-    rows = load_validation_csv(args.csv)
-
-    if not rows:
+    if args.cube:
+        import findings_cube
+
+        cube = findings_cube.FindingsCube.load(args.cube, with_rows=True)
+        changes = cube.update(iter_validation_csv(args.csv))
+        cube.save()
+        print(f"Cube:   {args.cube} ({changes['added']} added, {changes['changed']} changed, "
+              f"{changes['removed']} removed, {changes['unchanged']} unchanged)")
+        stats = stats_from_cube(cube)
+    else:
+        stats = accumulate(iter_validation_csv(args.csv))
+
+    if not stats.total_rows:
         print("No validation data found.")
         print(f"  Looked for: {args.csv}")
         print("  Run validate.py first, then manually review the CSV.")
@@ -460,25 +785,33 @@ def main():
         print("Generating empty structure with metadata only...")
 
     # Count validated rows
-    tp_count = sum(1 for r in rows if r.get("validated", "").strip().upper() == "TP")
-    fp_count = sum(1 for r in rows if r.get("validated", "").strip().upper() == "FP")
-    unreviewed = len(rows) - tp_count - fp_count
-    print(f"Total rows: {len(rows)}")
-    print(f"  TP: {tp_count} | FP: {fp_count} | Unreviewed: {unreviewed}")
+    unreviewed = stats.total_rows - stats.tp - stats.fp
+    print(f"Total rows: {stats.total_rows}")
+    print(f"  TP: {stats.tp} | FP: {stats.fp} | Unreviewed: {unreviewed}")
 
-    if unreviewed > 0 and rows:
+    if unreviewed > 0 and stats.total_rows:
         print(f"\n  WARNING: {unreviewed} findings not yet validated (TP/FP)")
         print("  These will be excluded from aggregation.")
 
-    # Run aggregation
-    result = aggregate(rows, scan_date=args.scan_date)
+    # Build output
+    start = time.monotonic()
+    result = build_result(stats, scan_date=args.scan_date, bootstrap=args.bootstrap, seed=args.seed)
+    if args.bootstrap:
+        print(f"Bootstrap: {args.bootstrap} resamples in {time.monotonic() - start:.2f}s")
 
     # Write output
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-
-    print(f"\nOutput: {args.output}")
+    if args.split:
+        index = write_split(result, args.split, compress=args.compress)
+        print(f"\nOutput: {args.split / SPLIT_INDEX_NAME}")
+        for section, entry in index["sections"].items():
+            sizes = [f"{entry['bytes']} B"]
+            sizes += [f"{entry[c]['bytes']} B {c}" for c in ("gzip", "brotli") if c in entry]
+            print(f"  {entry['file']:40s} {', '.join(sizes)}")
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\nOutput: {args.output}")
     print()
 
     # Print summary
@@ -497,6 +830,7 @@ def main():
             print(f"  {entry['cwe']}: {entry['name']} ({entry['count']})")
 
     # Model vulnerability rates
+    intervals = result.get("confidence_intervals", {}).get("by_model", {})
     if any(m["total_findings"] > 0 for m in result["by_model"].values()):
         print(f"\nVulnerability rates by model:")
         for model_id, data in sorted(
@@ -504,9 +838,11 @@ def main():
             key=lambda x: x[1]["vulnerability_rate"],
             reverse=True,
         ):
+            ci = intervals.get(model_id, {}).get("ci")
+            ci_text = f" [{ci[0]:.1f}-{ci[1]:.1f}]" if ci else ""
             print(
                 f"  {data['name']:25s} "
-                f"{data['vulnerability_rate']:5.1f}% "
+                f"{data['vulnerability_rate']:5.1f}%{ci_text} "
                 f"({data['vulnerable_samples']}/{data['total_samples']} samples, "
                 f"{data['total_findings']} findings)"
             )
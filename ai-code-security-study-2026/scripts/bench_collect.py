@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Collection Throughput Benchmark
+AI-Generated Code Security Study 2026
+
+Runs collect.py's collection loop against the local mock OpenRouter server
+(mock_openrouter.py) at several concurrency levels and reports throughput,
+API latency percentiles and retry counts. No API credits are used: every
+level collects into a fresh temporary directory with the response cache
+disabled.
+
+Usage:
+    python3 bench_collect.py                                   # 1,2,4,8,16
+    python3 bench_collect.py --concurrency 1,8,32 --limit 200
+    python3 bench_collect.py --latency exp:1.0 --rate-429 0.05 --rate-5xx 0.02
+    python3 bench_collect.py --stream --json bench.json
+    python3 bench_collect.py --degraded-provider xai --concurrency 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import collect
+import mock_openrouter
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_LEVELS = "1,2,4,8,16"
+DEFAULT_LIMIT = 120
+DEFAULT_RPM = 100000  # effectively unlimited; the mock has no quota
+
+# Scale collect.RETRY_POLICIES delays (and the circuit breaker cooldown) so
+# injected failures don't dominate the run
+DEFAULT_RETRY_SCALE = 0.05
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0.0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def build_combinations(limit):
+    """Return (models, prompt_items) covering at most `limit` combinations."""
+    models = collect.load_config()["models"]
+    prompt_items = collect.load_prompts()
+    if limit and limit < len(models) * len(prompt_items):
+        per_model = max(1, limit // len(models))
+        prompt_items = prompt_items[:per_model]
+    return models, prompt_items
+
+
+def run_level(concurrency, models, prompt_items, url, stream=False):
+    """Collect every combination once at the given concurrency level."""
+    tmpdir = Path(tempfile.mkdtemp(prefix="bench_collect_"))
+    collect.OUTPUT_DIR = tmpdir
+    collect.OPENROUTER_URL = url
+    collect.HTTP_POOL = collect.HTTPConnectionPool()
+
+    logger = logging.getLogger(f"collect.bench.c{concurrency}")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    run_stats = collect.RunStats()
+    breakers = collect.ProviderCircuitBreakers()
+    stream_metrics = collect.StreamMetrics() if stream else None
+
+    start = time.monotonic()
+    try:
+        counts = collect.run_collection(
+            models, prompt_items, logger,
+            concurrency=concurrency,
+            limiter=collect.ProviderRateLimiter(DEFAULT_RPM),
+            stream_metrics=stream_metrics,
+            run_stats=run_stats,
+            breakers=breakers,
+        )
+    finally:
+        wall = time.monotonic() - start
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    latencies = run_stats.latencies
+    result = {
+        "concurrency": concurrency,
+        "samples": counts["done"],
+        "errors": counts["errors"],
+        "wall_seconds": round(wall, 3),
+        "samples_per_sec": round(counts["done"] / wall, 2) if wall > 0 else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "retries": sum(run_stats.retries.values()),
+        "retries_by_reason": dict(run_stats.retries),
+        "deferred": counts["deferred"],
+        "breakers": breakers.summary(),
+        "connections_opened": collect.HTTP_POOL.stats["opened"],
+        "connections_reused": collect.HTTP_POOL.stats["reused"],
+    }
+    if stream_metrics:
+        result["stream"] = stream_metrics.summary_lines()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark collect.py against the local mock OpenRouter server."
+    )
+    parser.add_argument(
+        "--concurrency",
+        default=DEFAULT_LEVELS,
+        help=f"Comma-separated concurrency levels (default: {DEFAULT_LEVELS})",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_LIMIT,
+        help=f"Approximate combinations per level, 0 = all (default: {DEFAULT_LIMIT})",
+    )
+    parser.add_argument(
+        "--latency",
+        default=mock_openrouter.DEFAULT_LATENCY,
+        help=f"Mock latency spec (default: {mock_openrouter.DEFAULT_LATENCY})",
+    )
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of 5xx responses")
+    parser.add_argument(
+        "--retry-after", type=float, default=0.2, help="Retry-After sent with 429s (default: 0.2)"
+    )
+    parser.add_argument(
+        "--retry-scale",
+        type=float,
+        default=DEFAULT_RETRY_SCALE,
+        help=f"Multiplier for collect retry delays and breaker cooldown (default: {DEFAULT_RETRY_SCALE})",
+    )
+    parser.add_argument(
+        "--degraded-provider",
+        default=None,
+        help="Have the mock fail every request for this OpenRouter provider",
+    )
+    parser.add_argument("--stream", action="store_true", help="Benchmark streaming mode")
+    parser.add_argument(
+        "--url",
+        default=None,
+        help="Use an already running mock server instead of starting one",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Failure injection seed (default: 1)")
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    try:
+        levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    except ValueError:
+        parser.error(f"Invalid --concurrency list: {args.concurrency}")
+    if not levels or min(levels) < 1:
+        parser.error("--concurrency levels must be positive integers")
+
+    collect.RETRY_POLICIES = {
+        name: collect.RetryPolicy(p.attempts, p.base * args.retry_scale, p.cap * args.retry_scale)
+        for name, p in collect.RETRY_POLICIES.items()
+    }
+    collect.BREAKER_COOLDOWN *= args.retry_scale
+    collect.BREAKER_MAX_COOLDOWN *= args.retry_scale
+    os.environ.setdefault("OPENROUTER_API_KEY", "mock")
+    if not collect.PROMPTS_DIR.is_dir():
+        collect.PROMPTS_DIR = mock_openrouter.PROMPTS_DIR
+
+    server = None
+    url = args.url
+    if url is None:
+        try:
+            options = mock_openrouter.MockOptions(
+                latency=args.latency,
+                rate_429=args.rate_429,
+                rate_5xx=args.rate_5xx,
+                retry_after=args.retry_after,
+                seed=args.seed,
+                degraded_provider=args.degraded_provider,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        server, url = mock_openrouter.start_in_thread(options)
+
+    models, prompt_items = build_combinations(args.limit)
+    total = len(models) * len(prompt_items)
+
+    print("Collection Throughput Benchmark")
+    print("=" * 78)
+    print(f"Endpoint:     {url}")
+    print(f"Combinations: {total} per level ({len(models)} models x {len(prompt_items)} prompts)")
+    print(f"Latency:      {args.latency} | 429: {args.rate_429:.0%} | 5xx: {args.rate_5xx:.0%}")
+    print(f"Mode:         {'streaming' if args.stream else 'non-streaming'}")
+    if args.degraded_provider:
+        print(f"Degraded:     {args.degraded_provider} (always 5xx)")
+    print("-" * 78)
+    print(f"{'conc':>5} {'samples':>8} {'errors':>7} {'wall s':>8} {'samples/s':>10} "
+          f"{'p50 s':>7} {'p95 s':>7} {'retries':>8} {'conns':>6}")
+
+    results = []
+    try:
+        for level in levels:
+            r = run_level(level, models, prompt_items, url, stream=args.stream)
+            results.append(r)
+            print(
+                f"{r['concurrency']:>5} {r['samples']:>8} {r['errors']:>7} "
+                f"{r['wall_seconds']:>8.2f} {r['samples_per_sec']:>10.2f} "
+                f"{r['latency_p50']:>7.3f} {r['latency_p95']:>7.3f} "
+                f"{r['retries']:>8} {r['connections_opened']:>6}"
+            )
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+    print("-" * 78)
+    if len(results) > 1 and results[0]["samples_per_sec"] > 0:
+        best = max(results, key=lambda r: r["samples_per_sec"])
+        speedup = best["samples_per_sec"] / results[0]["samples_per_sec"]
+        print(f"Best: concurrency {best['concurrency']} ({speedup:.1f}x level {results[0]['concurrency']})")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2, default=str)
+        print(f"Results: {args.json}")
+
+    if any(r["errors"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
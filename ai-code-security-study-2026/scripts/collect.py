@@ -13,34 +13,81 @@ Usage:
     python3 collect.py --model claude-opus-4.6  # Single model
     python3 collect.py --prompt-id a03-py-01    # Single prompt
     python3 collect.py --dry-run                # Preview without running
+    python3 collect.py --concurrency 8 --rpm 30 # Parallel, 30 req/min per provider
+    python3 collect.py --reextract              # Re-extract code from stored responses
+    python3 collect.py --report                 # Latency/token report from the manifest
+    python3 collect.py --samples 5 --temperature 0.7   # 5 samples per prompt ({id}.s1..s5)
+    python3 collect.py --pipeline-scan          # Run scan.py's tools on samples as they arrive
+    python3 collect.py --archive                # Store responses in output/responses.pack
+
+Set OPENROUTER_URL to point the collector at a local mock endpoint; only
+loopback hosts are accepted, so the API key never leaves for another host.
 """
 
 import argparse
+import gzip
+import hashlib
+import heapq
+import http.client
+import itertools
 import json
 import logging
 import os
+import random
 import re
 import sys
+import statistics
+import threading
 import time
-import urllib.request
-import urllib.error
+import urllib.parse
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 
+import response_archive
+import sample_catalog
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CONFIG_PATH = SCRIPT_DIR / "config.json"
-PROMPTS_DIR = SCRIPT_DIR / "prompts"
+PROMPTS_DIR = sample_catalog.PROMPTS_DIR
 OUTPUT_DIR = SCRIPT_DIR / "output"
 LOG_PATH = OUTPUT_DIR / "collection.log"
+MANIFEST_PATH = OUTPUT_DIR / "collection-manifest.jsonl"
+ARCHIVE_PATH = OUTPUT_DIR / "responses.pack"
 
 API_TIMEOUT = 120  # seconds
-MAX_RETRIES = 3
-RETRY_DELAYS = [2, 4, 8]  # exponential backoff in seconds
+MAX_TOKENS = 4096
+
+DEFAULT_OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Overridable only via the environment, and only with a loopback URL (a
+# local mock endpoint): the request carries the OpenRouter API key
+OPENROUTER_URL = os.environ.get("OPENROUTER_URL") or DEFAULT_OPENROUTER_URL
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# Concurrent collection defaults
+DEFAULT_CONCURRENCY = 1     # 1 = sequential, the original behaviour
+DEFAULT_RPM = 60            # requests per minute per openrouter_provider, with --concurrency > 1
+
+# Pipelined collect-to-scan (--pipeline-scan)
+DEFAULT_SCAN_WORKERS = 2
+
+# Circuit breaker per openrouter_provider: open after this many consecutive
+# failures, probe again after the cooldown (doubling up to the max while
+# probes keep failing)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0       # seconds
+BREAKER_MAX_COOLDOWN = 300.0  # seconds
+MAX_DEFERRALS = 6  # times a combination may be deferred by an open breaker
 
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"  # hardcoded, not user-controlled
+# Content-addressed cache of raw API responses (dot-dir: ignored by scan.py)
+CACHE_DIR = OUTPUT_DIR / ".response-cache"
 
 SYSTEM_PROMPTS = {
     "python": (
@@ -53,12 +100,19 @@ SYSTEM_PROMPTS = {
     ),
 }
 
-# Regex to extract fenced code blocks from a response.
-# Matches ```python, ```py, ```javascript, ```js, or bare ``` blocks.
-CODE_BLOCK_RE = re.compile(
-    r"```(?:python|py|javascript|js|typescript|ts)?\s*\n(.*?)```",
-    re.DOTALL,
-)
+# Opening line of a fenced block: three or more backticks plus an optional
+# language tag. Used by FenceTokenizer for extraction and streaming.
+FENCE_OPEN_RE = re.compile(r"^(`{3,})\s*([\w+#.-]*)")
+
+# {prompt_id}.s{k}.response.md, written by --samples
+SAMPLE_RESPONSE_RE = re.compile(r"^(?P<prompt>.+)\.s(?P<sample>\d+)\.response\.md$")
+
+# Fence language tags that count as code in each study language. Untagged
+# blocks always qualify; other tags (bash, json, ...) only as a fallback.
+LANGUAGE_TAGS = {
+    "python": {"python", "py", "python3"},
+    "javascript": {"javascript", "js", "node", "nodejs", "typescript", "ts", "jsx", "tsx"},
+}
 
 # ---------------------------------------------------------------------------
 # Logging setup
@@ -97,32 +151,272 @@ def load_config():
         return json.load(f)
 
 
+def load_catalog(model_ids=None, save=True):
+    """
+    Load the prompt/sample catalog (see sample_catalog.py), rebuilding it
+    only if the prompt files, the manifest, the model list or a code file
+    changed. With save=False a rebuilt catalog is not written.
+    """
+    if model_ids is None:
+        model_ids = [m["id"] for m in load_config()["models"]]
+    return sample_catalog.SampleCatalog.load(PROMPTS_DIR, OUTPUT_DIR, model_ids, save=save)
+
+
 def load_prompts():
     """
-    Load all prompt JSON files from prompts/{language}/.
+    Load all prompts from prompts/{language}/, via the catalog (which is
+    not written here; collect.py saves it once a run has collected).
 
     Returns a list of dicts, each containing:
         owasp_id, language, and individual prompt dict (id, task, ...).
     """
-    items = []
-    for lang in ("python", "javascript"):
-        lang_dir = PROMPTS_DIR / lang
-        if not lang_dir.is_dir():
-            continue
-        for json_path in sorted(lang_dir.glob("*.json")):
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            owasp_id = data["owasp_id"]
-            language = data["language"]
-            for prompt in data["prompts"]:
-                items.append(
-                    {
-                        "owasp_id": owasp_id,
-                        "language": language,
-                        "prompt": prompt,
-                    }
-                )
-    return items
+    return load_catalog(save=False).prompts
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Refills at `rate` tokens per second up to `capacity`. acquire() blocks
+    until a token is available. block_for() freezes the bucket entirely,
+    which is how a 429 Retry-After from one worker throttles every other
+    worker talking to the same provider.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._blocked_until:
+                self._blocked_until = until
+                self._tokens = 0
+                self._updated = until
+
+
+class ProviderRateLimiter:
+    """One TokenBucket per openrouter_provider, created on first use."""
+
+    def __init__(self, rpm):
+        self.rate = rpm / 60.0
+        self.capacity = max(1.0, self.rate)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, provider):
+        with self._lock:
+            if provider not in self._buckets:
+                self._buckets[provider] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[provider]
+
+
+def provider_key(model_cfg):
+    """Return the key used to rate-limit a model's traffic."""
+    return model_cfg.get("openrouter_provider") or model_cfg.get("provider", "default")
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header into seconds.
+
+    Accepts both delta-seconds ("30") and HTTP-date forms. Returns None if
+    the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+# ---------------------------------------------------------------------------
+# Retry policies and circuit breaker
+# ---------------------------------------------------------------------------
+
+
+class RetryPolicy:
+    """
+    How often, and how patiently, to retry one class of error.
+
+    Delays use decorrelated jitter: each sleep is drawn uniformly from
+    [base, 3 * previous sleep] and capped, so workers that failed together
+    don't retry in lockstep.
+    """
+
+    def __init__(self, attempts, base, cap):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+
+    def next_delay(self, previous):
+        upper = max(self.base, previous * 3)
+        return min(self.cap, random.uniform(self.base, upper))
+
+
+# Keyed by classify_error(). A timeout already cost API_TIMEOUT, so it gets
+# one retry; 429s mostly wait on Retry-After; client errors are final.
+RETRY_POLICIES = {
+    "timeout": RetryPolicy(attempts=2, base=5.0, cap=30.0),
+    "rate_limit": RetryPolicy(attempts=5, base=2.0, cap=60.0),
+    "server": RetryPolicy(attempts=4, base=1.0, cap=20.0),
+    "network": RetryPolicy(attempts=4, base=0.5, cap=10.0),
+    "malformed": RetryPolicy(attempts=2, base=1.0, cap=5.0),
+    "client": RetryPolicy(attempts=1, base=0.0, cap=0.0),
+    "other": RetryPolicy(attempts=3, base=2.0, cap=8.0),
+}
+
+# Error classes that count towards opening a provider's circuit breaker.
+# 429s are the rate limiter's job; client errors say nothing about health.
+BREAKER_ERROR_CLASSES = {"timeout", "server", "network", "malformed"}
+
+
+def classify_error(error):
+    """Map an API call exception to a RETRY_POLICIES key."""
+    if isinstance(error, MalformedResponseError):
+        return "malformed"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    status = getattr(error, "status", None)
+    if status == 429:
+        return "rate_limit"
+    if status == 408:
+        return "timeout"
+    if status and status >= 500:
+        return "server"
+    if status and status >= 400:
+        return "client"
+    if isinstance(error, (OSError, http.client.HTTPException)):
+        return "network"
+    return "other"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+    def __init__(self, provider, wait):
+        super().__init__(f"circuit open for provider {provider}, next probe in {wait:.0f}s")
+        self.provider = provider
+        self.wait = wait
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one provider.
+
+    closed:    calls flow; consecutive failures are counted.
+    open:      calls are refused until the cooldown expires.
+    half_open: a single probe call is let through. Success closes the
+               breaker; failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, provider, threshold=None, cooldown=None, max_cooldown=None):
+        self.provider = provider
+        self.threshold = threshold or BREAKER_FAILURE_THRESHOLD
+        self.base_cooldown = cooldown or BREAKER_COOLDOWN
+        self.max_cooldown = max_cooldown or BREAKER_MAX_COOLDOWN
+        self.state = "closed"
+        self.failures = 0
+        self.times_opened = 0
+        self._cooldown = self.base_cooldown
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may be made now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if self.state == "open" and now >= self._open_until:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            wait = max(self._open_until - now, 1.0)
+        raise CircuitOpenError(self.provider, wait)
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._cooldown = self.base_cooldown
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failure. Returns True if this call opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self._probe_in_flight = False
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            elif self.state != "closed" or self.failures < self.threshold:
+                return False
+            self.state = "open"
+            self.times_opened += 1
+            self._open_until = time.monotonic() + self._cooldown
+            return True
+
+    def release(self):
+        """End a call whose outcome says nothing about provider health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class ProviderCircuitBreakers:
+    """One CircuitBreaker per openrouter_provider, created on first use."""
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider):
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider, **self._kwargs)
+            return self._breakers[provider]
+
+    def summary(self):
+        tripped = [b for b in self._breakers.values() if b.times_opened]
+        return ", ".join(
+            f"{b.provider} opened {b.times_opened}x (now {b.state})"
+            for b in sorted(tripped, key=lambda b: b.provider)
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -141,8 +435,18 @@ def code_ext(language):
     return ext
 
 
+def sample_stem(prompt_id, sample):
+    """File stem of one sample of a prompt: a03-py-01.s2 (sample 2)."""
+    return f"{prompt_id}.s{sample}"
+
+
 def output_paths(model_id, language, owasp_id, prompt_id):
-    """Return (code_path, response_path) for a given combination."""
+    """
+    Return (code_path, response_path) for a given combination.
+
+    prompt_id may also be a sample_stem(); samples live next to the
+    single temperature-0 sample so scan.py's path parsing is unchanged.
+    """
     ext = code_ext(language)
     base = OUTPUT_DIR / model_id / language / owasp_id
     code_path = base / f"{prompt_id}{ext}"
@@ -150,39 +454,285 @@ def output_paths(model_id, language, owasp_id, prompt_id):
     return code_path, response_path
 
 
+def save_response(response_path, response_text, archive=None, model_id=None,
+                  language=None, owasp_id=None):
+    """Write a response next to its code file, or into the archive if given."""
+    if archive is None:
+        response_path.write_text(response_text, encoding="utf-8")
+        return
+    prompt_id, sample = response_archive.parse_response_name(response_path.name)
+    archive.put(model_id, prompt_id, sample, response_text, language=language, owasp=owasp_id)
+    # A loose copy from before archiving would otherwise shadow the new one
+    response_path.unlink(missing_ok=True)
+
+
+def load_response(response_path, archive=None, model_id=None):
+    """Read a stored response from its loose file or the archive (or None)."""
+    if response_path.exists():
+        return response_path.read_text(encoding="utf-8")
+    if archive is None:
+        return None
+    prompt_id, sample = response_archive.parse_response_name(response_path.name)
+    return archive.get(model_id, prompt_id, sample)
+
+
 # ---------------------------------------------------------------------------
 # Code block extraction
 # ---------------------------------------------------------------------------
 
 
-def extract_code(response_text):
+def extract_code(response_text, language=None):
     """
     Extract the largest fenced code block from a response.
 
     LLMs often produce multiple code blocks (imports, helpers, main code).
     We pick the largest one as it is most likely the main implementation.
+    When the language is known, blocks tagged for it (or untagged) win over
+    blocks tagged for something else, such as a ```bash install line. A
+    final fence the model never closed still counts as a block.
 
     Returns (code, found) where found indicates whether a code block was
     detected. If no code block is found, the full response is returned.
     """
-    matches = CODE_BLOCK_RE.findall(response_text)
-    if matches:
-        best = max(matches, key=len)
+    tokenizer = FenceTokenizer()
+    tokenizer.feed(response_text)
+    blocks = tokenizer.close()
+    if blocks:
+        tags = LANGUAGE_TAGS.get(language)
+        if tags:
+            preferred = [b for b in blocks if not b[0] or b[0] in tags]
+            blocks = preferred or blocks
+        best = max((code for _, code in blocks), key=len)
         return best.strip(), True
     return response_text.strip(), False
 
 
+def normalize_code(code):
+    """
+    Normalize code for duplicate detection across samples: unify line
+    endings, strip trailing whitespace and drop blank lines.
+    """
+    lines = (line.rstrip() for line in code.replace("\r\n", "\n").split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+class FenceTokenizer:
+    """
+    Incremental, line-oriented tokenizer for fenced code blocks.
+
+    Text may be fed in arbitrary chunks (e.g. streamed tokens); only complete
+    lines are examined. A block opens on a line starting with three or more
+    backticks and closes on a line of backticks at least as long as the
+    opening fence, so a ```` block can contain ``` lines.
+
+    Closed blocks accumulate in `blocks` as (language, code) tuples. Each
+    line is looked at once, so tokenizing is linear in the response length.
+    """
+
+    def __init__(self):
+        self.blocks = []
+        self._pending = ""
+        self._fence = None
+        self._lang = ""
+        self._lines = []
+
+    def feed(self, text):
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._process_line(line)
+
+    def _process_line(self, line):
+        stripped = line.strip()
+        if self._fence is None:
+            m = FENCE_OPEN_RE.match(stripped)
+            if m:
+                self._fence = m.group(1)
+                self._lang = m.group(2).lower()
+                self._lines = []
+        elif stripped.startswith(self._fence) and not stripped.strip("`"):
+            self.blocks.append((self._lang, "\n".join(self._lines)))
+            self._fence = None
+        else:
+            self._lines.append(line)
+
+    def close(self):
+        """
+        Flush the last partial line and return all blocks.
+
+        A block still open at the end of the text (the model ran out of
+        tokens, or was cut off) is kept as if it had been closed.
+        """
+        if self._pending:
+            self._process_line(self._pending)
+            self._pending = ""
+        if self._fence is not None:
+            self.blocks.append((self._lang, "\n".join(self._lines)))
+            self._fence = None
+        return self.blocks
+
+
+# ---------------------------------------------------------------------------
+# HTTP client
+# ---------------------------------------------------------------------------
+
+
+class HTTPConnectionPool:
+    """
+    Keep-alive http.client connections pooled per (scheme, host, port).
+
+    A connection goes back to the pool only after its response has been read
+    in full and the server did not ask to close it. Each request checks out
+    its own connection, so one pool can be shared by all worker threads.
+    """
+
+    def __init__(self, max_idle_per_host=16):
+        self.max_idle_per_host = max_idle_per_host
+        self.stats = Counter()
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _checkout(self, key, timeout):
+        """Return (connection, reused)."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.stats["reused"] += 1
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            self.stats["opened"] += 1
+
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """
+        Send one request and return (status, headers, body_bytes).
+
+        If a reused connection turns out to have been closed by the server
+        while idle, the request is transparently resent on the next one.
+        """
+        with self.stream(method, url, body=body, headers=headers, timeout=timeout) as resp:
+            data = resp.read()
+        return resp.status, resp.headers, data
+
+    @contextmanager
+    def stream(self, method, url, body=None, headers=None, timeout=None):
+        """
+        Send one request and yield the unread http.client.HTTPResponse.
+
+        The connection is pooled again only if the caller consumed the whole
+        body; abandoning a response part-way closes its connection.
+        """
+        parts = urllib.parse.urlsplit(url)
+        default_port = 443 if parts.scheme == "https" else 80
+        key = (parts.scheme, parts.hostname, parts.port or default_port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        while True:
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused:
+                    self._count("stale")
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+        self._count("requests")
+        try:
+            yield resp
+        except BaseException:
+            conn.close()
+            raise
+        if resp.isclosed() and not resp.will_close:
+            self._checkin(key, conn)
+        else:
+            conn.close()
+
+    def summary(self):
+        """One-line connection reuse summary for the log."""
+        s = self.stats
+        return (
+            f"{s['requests']} requests over {s['opened']} connections "
+            f"({s['reused']} reused, {s['stale']} stale)"
+        )
+
+
+HTTP_POOL = HTTPConnectionPool()
+
+
 # ---------------------------------------------------------------------------
 # OpenRouter API
 # ---------------------------------------------------------------------------
 
 
-def call_openrouter(prompt, model_cfg, system_prompt):
-    """Send a prompt via OpenRouter HTTP API and return the response text."""
+class OpenRouterError(RuntimeError):
+    """An HTTP error from OpenRouter, carrying the status and Retry-After."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class MalformedResponseError(RuntimeError):
+    """A 2xx response whose body is not a usable chat completion."""
+
+
+def check_openrouter_url(url):
+    """Raise RuntimeError unless url is OpenRouter's or a loopback mock endpoint."""
+    if url == DEFAULT_OPENROUTER_URL:
+        return
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or parsed.hostname not in LOOPBACK_HOSTS:
+        raise RuntimeError(
+            f"OPENROUTER_URL must be {DEFAULT_OPENROUTER_URL} or a loopback mock "
+            f"endpoint (localhost, 127.0.0.1, ::1), got {url!r}"
+        )
+
+
+def request_headers():
+    """Return the HTTP headers for an OpenRouter chat-completions call."""
+    check_openrouter_url(OPENROUTER_URL)
     api_key = os.environ.get("OPENROUTER_API_KEY")
     if not api_key:
         raise RuntimeError("OPENROUTER_API_KEY environment variable is not set")
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+        "HTTP-Referer": "https://appsecsanta.com",
+        "X-Title": "AI Code Security Study 2026",
+    }
 
+
+def request_body(prompt, model_cfg, system_prompt):
+    """Return the chat-completions request body as a dict."""
     model_id = model_cfg["model_id"]
     temperature = model_cfg.get("temperature", 0)
     openrouter_provider = model_cfg.get("openrouter_provider")
@@ -190,7 +740,7 @@ def call_openrouter(prompt, model_cfg, system_prompt):
     body = {
         "model": model_id,
         "temperature": temperature,
-        "max_tokens": 4096,
+        "max_tokens": MAX_TOKENS,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt},
@@ -198,36 +748,479 @@ def call_openrouter(prompt, model_cfg, system_prompt):
     }
     if openrouter_provider:
         body["provider"] = {"only": [openrouter_provider]}
+    return body
+
+
+def raise_for_status(status, headers, data):
+    """Raise OpenRouterError for an HTTP error response."""
+    if status >= 400:
+        error_body = data.decode("utf-8", errors="replace")
+        raise OpenRouterError(
+            f"OpenRouter API HTTP {status}: {error_body}",
+            status=status,
+            retry_after=parse_retry_after(headers.get("Retry-After")),
+        )
 
-    payload = json.dumps(body).encode("utf-8")
 
-    req = urllib.request.Request(
-        OPENROUTER_URL,
-        data=payload,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-            "HTTP-Referer": "https://appsecsanta.com",
-            "X-Title": "AI Code Security Study 2026",
-        },
-        method="POST",
+def call_openrouter(prompt, model_cfg, system_prompt):
+    """
+    Send a prompt via OpenRouter HTTP API.
+
+    Returns (response_text, usage) where usage is the response's token
+    usage dict (empty if the API did not report it).
+    """
+    headers = request_headers()
+    payload = json.dumps(request_body(prompt, model_cfg, system_prompt)).encode("utf-8")
+
+    status, resp_headers, data = HTTP_POOL.request(
+        "POST", OPENROUTER_URL, body=payload, headers=headers, timeout=API_TIMEOUT,
     )
+    raise_for_status(status, resp_headers, data)
 
     try:
-        # nosemgrep: python.lang.security.audit.dynamic-urllib-use-detected.dynamic-urllib-use-detected
-        with urllib.request.urlopen(req, timeout=API_TIMEOUT) as resp:  # URL is hardcoded OPENROUTER_URL constant
-            body = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8", errors="replace")
-        raise RuntimeError(
-            f"OpenRouter API HTTP {e.code}: {error_body}"
-        )
+        body = json.loads(data.decode("utf-8"))
+    except ValueError as e:
+        raise MalformedResponseError(f"OpenRouter returned invalid JSON: {e}") from e
 
     choices = body.get("choices", [])
     if not choices:
-        raise RuntimeError(f"OpenRouter returned no choices: {json.dumps(body)}")
+        raise MalformedResponseError(f"OpenRouter returned no choices: {json.dumps(body)}")
+
+    try:
+        content = choices[0]["message"]["content"]
+    except (KeyError, TypeError) as e:
+        raise MalformedResponseError(f"OpenRouter choice has no message content: {e!r}") from e
+    return content, body.get("usage") or {}
+
+
+def iter_sse_data(resp):
+    """Yield the data payload of each server-sent event in a response."""
+    data_lines = []
+    for raw in resp:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            # Comment line; OpenRouter sends these as keep-alives
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def stream_openrouter(prompt, model_cfg, system_prompt, stop_at_fence=False):
+    """
+    Stream a completion via server-sent events.
+
+    Content deltas are fed to a FenceTokenizer as they arrive. With
+    stop_at_fence, reading stops as soon as the first code block closes
+    (the connection is then dropped rather than pooled).
+
+    Returns (response_text, info) where info holds ttft and duration in
+    seconds, completion_tokens (from usage, else the delta count), the raw
+    usage dict and stopped_early.
+    """
+    headers = request_headers()
+    body = request_body(prompt, model_cfg, system_prompt)
+    body["stream"] = True
+    body["usage"] = {"include": True}
+    payload = json.dumps(body).encode("utf-8")
+
+    start = time.monotonic()
+    ttft = None
+    parts = []
+    deltas = 0
+    usage = None
+    stopped_early = False
+    fences = FenceTokenizer()
+
+    with HTTP_POOL.stream(
+        "POST", OPENROUTER_URL, body=payload, headers=headers, timeout=API_TIMEOUT,
+    ) as resp:
+        if resp.status >= 400:
+            raise_for_status(resp.status, resp.headers, resp.read())
+
+        for data in iter_sse_data(resp):
+            if data == "[DONE]":
+                # Keep reading to EOF so the connection can be reused
+                continue
+            try:
+                chunk = json.loads(data)
+            except ValueError as e:
+                raise MalformedResponseError(f"OpenRouter sent an invalid SSE chunk: {e}") from e
+            if "error" in chunk:
+                raise RuntimeError(f"OpenRouter stream error: {json.dumps(chunk['error'])}")
+            usage = chunk.get("usage") or usage
+            for choice in chunk.get("choices", []):
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - start
+                    deltas += 1
+                    parts.append(delta)
+                    fences.feed(delta)
+            if stop_at_fence and fences.blocks:
+                stopped_early = True
+                break
+
+    if ttft is None:
+        raise RuntimeError("OpenRouter stream ended without any content")
+
+    info = {
+        "ttft": ttft,
+        "duration": time.monotonic() - start,
+        "completion_tokens": (usage or {}).get("completion_tokens") or deltas,
+        "usage": usage or {},
+        "stopped_early": stopped_early,
+    }
+    return "".join(parts), info
+
+
+class StreamMetrics:
+    """Per-model time-to-first-token and generation speed of streamed calls."""
+
+    def __init__(self, stop_at_fence=False):
+        self.stop_at_fence = stop_at_fence
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, model_id, info):
+        with self._lock:
+            self._samples[model_id].append(info)
+
+    @staticmethod
+    def tokens_per_sec(info):
+        generating = info["duration"] - info["ttft"]
+        return info["completion_tokens"] / generating if generating > 0 else 0.0
+
+    def summary_lines(self):
+        """One log line per model: median TTFT, median tokens/sec, early stops."""
+        lines = []
+        with self._lock:
+            for model_id, infos in sorted(self._samples.items()):
+                ttft = statistics.median(i["ttft"] for i in infos)
+                tps = statistics.median(self.tokens_per_sec(i) for i in infos)
+                early = sum(1 for i in infos if i["stopped_early"])
+                lines.append(
+                    f"{model_id}: {len(infos)} streamed | TTFT p50 {ttft:.2f}s | "
+                    f"{tps:.1f} tok/s p50 | stopped early: {early}"
+                )
+        return lines
+
+
+class RunStats:
+    """Thread-safe API latencies and retry reasons for one collection run."""
+
+    def __init__(self):
+        self.latencies = []
+        self.retries = Counter()
+        self._lock = threading.Lock()
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def record_retry(self, error):
+        status = getattr(error, "status", None)
+        reason = f"HTTP {status}" if status else type(error).__name__
+        with self._lock:
+            self.retries[reason] += 1
+
+    def retry_summary(self):
+        total = sum(self.retries.values())
+        detail = ", ".join(f"{k}: {v}" for k, v in self.retries.most_common())
+        return f"{total} ({detail})"
+
+
+# ---------------------------------------------------------------------------
+# Collection manifest
+# ---------------------------------------------------------------------------
+
+
+class CollectionManifest:
+    """
+    Append-only JSONL index with one record per (model, prompt_id).
+
+    Each record holds status ("collected", "error", or "missing" once its
+    output has been deleted), attempts, latency, rate-limit wait,
+    prompt/completion tokens, response hash and extraction outcome. Records are appended as they
+    happen; on load the last record for a key wins, and compact() rewrites
+    the file down to one line per key.
+
+    Skip decisions read this index instead of listing the output tree, and
+    only stat the combination's own files (see manifest_collected). If the
+    file does not exist yet, it is bootstrapped once from the tree.
+
+    Multi-sample records are keyed by sample_stem() and carry sample_of,
+    sample, code_sha256 (of the normalized code) and duplicate_of. The
+    distinct ones also populate code_index, the content hash index used to
+    deduplicate later samples of the same prompt.
+    """
 
-    return choices[0]["message"]["content"]
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self.code_index = {}  # (model, sample_of, code_sha256) -> sample stem
+        self._lock = threading.Lock()
+        if path.exists():
+            self._load()
+
+    def _index(self, rec):
+        if rec.get("sample_of") and rec.get("code_sha256") and not rec.get("duplicate_of"):
+            key = (rec["model"], rec["sample_of"], rec["code_sha256"])
+            self.code_index.setdefault(key, rec["prompt_id"])
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    self.records[(rec["model"], rec["prompt_id"])] = rec
+                    self._index(rec)
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Half-written trailing line from an interrupted run
+                    continue
+
+    def get(self, model_id, prompt_id):
+        return self.records.get((model_id, prompt_id))
+
+    def is_collected(self, model_id, prompt_id):
+        rec = self.get(model_id, prompt_id)
+        return rec is not None and rec["status"] == "collected"
+
+    def canonical_sample(self, model_id, prompt_id, code_sha256):
+        """Return the stem of the distinct sample with this code, if any."""
+        return self.code_index.get((model_id, prompt_id, code_sha256))
+
+    def record(self, model_id, prompt_id, **fields):
+        """Append a record (merged over any existing one) and return it."""
+        with self._lock:
+            rec = dict(self.records.get((model_id, prompt_id), {}))
+            rec.update(fields)
+            rec["model"] = model_id
+            rec["prompt_id"] = prompt_id
+            rec["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            self.records[(model_id, prompt_id)] = rec
+            self._index(rec)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            return rec
+
+    def compact(self):
+        """Rewrite the file with only the latest record per key."""
+        with self._lock:
+            tmp = self.path.with_suffix(".jsonl.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key in sorted(self.records):
+                    f.write(json.dumps(self.records[key], ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+
+    def bootstrap(self, prompt_items, archive=None, save=True):
+        """
+        Record every combination already present in OUTPUT_DIR (responses
+        may be loose files or in the archive).
+
+        Timing and token usage are unknown for these, so only the response
+        hash and extraction outcome are filled in. Samples are deduplicated
+        in sample order, as collect_samples() would have. With save=False
+        the records are only kept in memory. Returns the count added.
+        """
+        archived = defaultdict(set)  # (model, prompt_id) -> archived sample numbers
+        for model_id, prompt_id, sample in (archive.keys() if archive else []):
+            archived[(model_id, prompt_id)].add(sample)
+
+        added = 0
+        for model_dir in sorted(OUTPUT_DIR.iterdir()) if OUTPUT_DIR.is_dir() else []:
+            if not model_dir.is_dir() or model_dir.name.startswith("."):
+                continue
+            model_id = model_dir.name
+            for item in prompt_items:
+                prompt_id = item["prompt"]["id"]
+                language = item["language"]
+                code_path, response_path = output_paths(
+                    model_id, language, item["owasp_id"], prompt_id
+                )
+                samples = archived[(model_id, prompt_id)] | {
+                    int(m.group("sample"))
+                    for m in (
+                        SAMPLE_RESPONSE_RE.match(p.name)
+                        for p in response_path.parent.glob(f"{prompt_id}.s*.response.md")
+                    )
+                    if m and m.group("prompt") == prompt_id
+                }
+                stems = []
+                if code_path.exists() and (response_path.exists() or 0 in samples):
+                    stems.append(prompt_id)
+                stems += [sample_stem(prompt_id, k) for k in sorted(samples - {0})]
+
+                for stem in stems:
+                    code_path, response_path = output_paths(
+                        model_id, language, item["owasp_id"], stem
+                    )
+                    response_text = load_response(response_path, archive, model_id)
+                    code, found = extract_code(response_text, language)
+                    rec = {
+                        "model": model_id,
+                        "prompt_id": stem,
+                        "language": language,
+                        "owasp": item["owasp_id"],
+                        "status": "collected",
+                        "source": "bootstrap",
+                        "response_sha256": sha256_text(response_text),
+                        "extraction": "block" if found else "no_block",
+                    }
+                    if stem != prompt_id:
+                        code_sha256 = sha256_text(normalize_code(code))
+                        rec.update(
+                            sample_of=prompt_id,
+                            sample=int(stem.rsplit(".s", 1)[1]),
+                            code_sha256=code_sha256,
+                            duplicate_of=self.canonical_sample(model_id, prompt_id, code_sha256),
+                        )
+                    self.records[(model_id, stem)] = rec
+                    self._index(rec)
+                    added += 1
+        if save:
+            self.compact()
+        return added
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def manifest_report(manifest, models):
+    """
+    Summarise collected records per provider and model: sample count, mean
+    attempts, p50/max latency and total prompt/completion tokens.
+    """
+    provider_of = {m["id"]: provider_key(m) for m in models}
+    groups = defaultdict(list)
+    for rec in manifest.records.values():
+        if rec.get("status") == "collected" and rec["model"] in provider_of:
+            groups[(provider_of[rec["model"]], rec["model"])].append(rec)
+
+    lines = [
+        f"{'provider':18s} {'model':18s} {'samples':>7} {'attempts':>8} "
+        f"{'p50 s':>7} {'max s':>7} {'prompt tok':>10} {'compl tok':>10}"
+    ]
+    for (provider, model_id), recs in sorted(groups.items()):
+        timed = [r["latency"] for r in recs if r.get("latency") is not None]
+        attempts = [r["attempts"] for r in recs if r.get("attempts")]
+        lines.append(
+            f"{provider:18s} {model_id:18s} {len(recs):>7} "
+            f"{(sum(attempts) / len(attempts)) if attempts else 0:>8.2f} "
+            f"{statistics.median(timed) if timed else 0:>7.1f} "
+            f"{max(timed) if timed else 0:>7.1f} "
+            f"{sum(r.get('prompt_tokens') or 0 for r in recs):>10} "
+            f"{sum(r.get('completion_tokens') or 0 for r in recs):>10}"
+        )
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+
+def response_cache_key(model_cfg, system_prompt, task, sample=None):
+    """
+    Hash everything that determines the API request for a combination.
+
+    Output paths and code extraction are deliberately not part of the key,
+    so changing either never invalidates a cached response. The sample
+    number is only included for multi-sample runs, so single-sample keys
+    are unchanged.
+    """
+    material = [
+        model_cfg["model_id"],
+        model_cfg.get("openrouter_provider"),
+        model_cfg.get("temperature", 0),
+        MAX_TOKENS,
+        system_prompt,
+        task,
+    ]
+    if sample is not None:
+        material.append(sample)
+    material = json.dumps(material, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Gzipped raw responses stored at {cache_dir}/{key[:2]}/{key}.json.gz.
+
+    Each entry also records how long the original API call took, which is
+    what the "time saved" figure in the run summary adds up.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.stats = Counter()
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, key, accept_partial=False):
+        """
+        Return the cached entry dict, or None on a miss.
+
+        Responses cut short by --stop-at-fence are only served when the
+        caller would have stopped early too (accept_partial).
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, EOFError, json.JSONDecodeError):
+            # Truncated or corrupt entry: treat as a miss and overwrite later
+            entry = None
+        if entry and entry.get("stopped_early") and not accept_partial:
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+                self.saved_seconds += entry.get("elapsed", 0.0)
+        return entry
+
+    def put(self, key, model_cfg, response_text, elapsed, stopped_early=False, usage=None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "model_id": model_cfg["model_id"],
+            "provider": model_cfg.get("openrouter_provider"),
+            "elapsed": round(elapsed, 3),
+            "cached_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "usage": usage or {},
+            "response": response_text,
+        }
+        if stopped_early:
+            entry["stopped_early"] = True
+        # Write-then-rename so a concurrent reader never sees a partial file
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def summary(self):
+        """One-line hit/miss summary for the log."""
+        return (
+            f"{self.stats['hits']} hits | {self.stats['misses']} misses | "
+            f"API time saved: {self.saved_seconds:.1f}s"
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -235,25 +1228,270 @@ def call_openrouter(prompt, model_cfg, system_prompt):
 # ---------------------------------------------------------------------------
 
 
-def collect_one(model_cfg, prompt_item, logger, dry_run=False):
+def call_with_retries(task, model_cfg, system_prompt, tag, logger, bucket=None,
+                      stream_metrics=None, run_stats=None, breaker=None):
+    """
+    Call OpenRouter, retrying transient failures per RETRY_POLICIES.
+
+    Each error class has its own attempt budget and decorrelated-jitter
+    backoff. A 429 carrying Retry-After waits for the advertised time
+    instead, and also blocks the provider's rate-limit bucket so other
+    workers back off.
+
+    With a CircuitBreaker, failures are reported to it and a call is not
+    attempted while it is open: CircuitOpenError is raised so the caller
+    can come back to this combination later.
+
+    With stream_metrics the completion is streamed and its timing recorded.
+    Returns (response_text, meta) where meta holds attempts, usage,
+    stopped_early, latency (of the successful attempt alone, timed from
+    when it got its rate-limit token) and waited (seconds spent waiting for
+    tokens and in backoff). On final failure the raised error carries
+    .attempts and the last attempt's .latency.
+    """
+    attempts = 0
+    waited = 0.0
+    per_class = Counter()
+    delays = {}
+    while True:
+        if breaker:
+            breaker.before_call()
+        if bucket:
+            queued = time.monotonic()
+            bucket.acquire()
+            waited += time.monotonic() - queued
+        attempts += 1
+        started = time.monotonic()
+        try:
+            if stream_metrics is None:
+                response_text, usage = call_openrouter(task, model_cfg, system_prompt)
+                meta = {"attempts": attempts, "usage": usage, "stopped_early": False}
+            else:
+                response_text, info = stream_openrouter(
+                    task, model_cfg, system_prompt,
+                    stop_at_fence=stream_metrics.stop_at_fence,
+                )
+                stream_metrics.record(model_cfg["id"], info)
+                logger.debug(
+                    f"{tag} streamed: TTFT {info['ttft']:.2f}s, "
+                    f"{info['completion_tokens']} tokens, "
+                    f"{StreamMetrics.tokens_per_sec(info):.1f} tok/s"
+                    + (", stopped at closing fence" if info["stopped_early"] else "")
+                )
+                meta = {
+                    "attempts": attempts,
+                    "usage": info["usage"],
+                    "stopped_early": info["stopped_early"],
+                }
+        except (RuntimeError, OSError, http.client.HTTPException) as e:
+            e.attempts = attempts
+            e.latency = time.monotonic() - started
+            error_class = classify_error(e)
+            if breaker:
+                if error_class in BREAKER_ERROR_CLASSES:
+                    if breaker.record_failure():
+                        logger.warning(
+                            f"{tag} circuit opened for provider {breaker.provider} "
+                            f"after {breaker.failures} failures"
+                        )
+                else:
+                    breaker.release()
+
+            per_class[error_class] += 1
+            policy = RETRY_POLICIES[error_class]
+            if per_class[error_class] >= policy.attempts:
+                raise
+
+            if run_stats:
+                run_stats.record_retry(e)
+            delay = delays[error_class] = policy.next_delay(delays.get(error_class, policy.base))
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after is not None:
+                # Server told us how long to back off; honour it, plus a
+                # little jitter so blocked workers don't all return at once
+                delay = retry_after + random.uniform(0, policy.base)
+                if bucket:
+                    bucket.block_for(retry_after)
+            if breaker and breaker.state == "open":
+                # Don't sit out the backoff; before_call() defers us instead
+                continue
+            logger.warning(
+                f"{tag} attempt {attempts} failed ({error_class}): {e}, "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            waited += delay
+            continue
+        except Exception as e:
+            # Not retried (e.g. a malformed SSE payload), but counted as a
+            # failure so a half-open breaker's probe is never left in flight
+            e.attempts = attempts
+            e.latency = time.monotonic() - started
+            if breaker and breaker.record_failure():
+                logger.warning(
+                    f"{tag} circuit opened for provider {breaker.provider} "
+                    f"after {breaker.failures} failures"
+                )
+            raise
+
+        meta["latency"] = time.monotonic() - started
+        meta["waited"] = waited
+        if breaker:
+            breaker.record_success()
+        return response_text, meta
+
+
+def fetch_response(model_cfg, prompt_item, stem, logger, limiter=None, cache=None,
+                   stream_metrics=None, run_stats=None, manifest=None, breakers=None,
+                   sample=None):
+    """
+    Get the response for one combination (or one sample of it), from the
+    cache if possible, else from OpenRouter with retries.
+
+    API failures other than CircuitOpenError are recorded in the manifest
+    under stem before being re-raised.
+
+    Returns (response_text, meta, elapsed) where elapsed is the API latency
+    of the successful attempt, excluding rate-limit waits and backoff (see
+    call_with_retries), and None for a cache hit.
+    """
+    model_id = model_cfg["id"]
+    language = prompt_item["language"]
+    task = prompt_item["prompt"]["task"]
+    tag = f"[{model_id}] [{stem}]"
+
+    system_prompt = SYSTEM_PROMPTS[language]
+    cache_key = response_cache_key(model_cfg, system_prompt, task, sample)
+    accept_partial = bool(stream_metrics and stream_metrics.stop_at_fence)
+    cached = cache.get(cache_key, accept_partial=accept_partial) if cache else None
+
+    if cached is not None:
+        response_text = cached["response"]
+        logger.debug(f"{tag} cache hit {cache_key[:12]} ({len(response_text)} chars)")
+        return response_text, {"attempts": 0, "usage": cached.get("usage", {})}, None
+
+    # Send prompt via OpenRouter
+    logger.debug(f"{tag} sending prompt ({len(task)} chars) via OpenRouter ({model_cfg['model_id']})")
+
+    bucket = limiter.bucket(provider_key(model_cfg)) if limiter else None
+    breaker = breakers.breaker(provider_key(model_cfg)) if breakers else None
+    try:
+        response_text, meta = call_with_retries(
+            task, model_cfg, system_prompt, tag, logger, bucket, stream_metrics, run_stats,
+            breaker,
+        )
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        if manifest is not None:
+            manifest.record(
+                model_id, stem,
+                language=language, owasp=prompt_item["owasp_id"], status="error",
+                attempts=getattr(e, "attempts", None),
+                latency=round(e.latency, 3) if hasattr(e, "latency") else None,
+                error=str(e)[:500],
+            )
+        raise
+
+    elapsed = meta["latency"]
+    if run_stats:
+        run_stats.record_latency(elapsed)
+    logger.debug(
+        f"{tag} received response ({len(response_text)} chars) in {elapsed:.1f}s"
+        + (f" after {meta['waited']:.1f}s of rate-limit waits and backoff" if meta["waited"] else "")
+    )
+
+    if cache:
+        cache.put(
+            cache_key, model_cfg, response_text, elapsed,
+            meta["stopped_early"], meta["usage"],
+        )
+    return response_text, meta, elapsed
+
+
+def manifest_fields(prompt_item, response_text, meta, elapsed, found_block):
+    """Manifest record fields for a successfully collected response."""
+    usage = meta["usage"]
+    return {
+        "language": prompt_item["language"],
+        "owasp": prompt_item["owasp_id"],
+        "status": "collected",
+        "source": "cache" if elapsed is None else "api",
+        "attempts": meta["attempts"],
+        "latency": None if elapsed is None else round(elapsed, 3),
+        "waited": None if elapsed is None else round(meta["waited"], 3),
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "response_sha256": sha256_text(response_text),
+        "extraction": "block" if found_block else "no_block",
+        "error": None,
+    }
+
+
+def manifest_collected(manifest, model_id, prompt_item, stem, archive=None, mark=True):
+    """
+    True if the manifest records stem as collected and its output is still
+    there: the response (loose or archived) and, unless the sample is a
+    duplicate, the code file. A record whose output has been deleted is
+    re-marked "missing" (unless mark is False), so it is collected again.
+    """
+    rec = manifest.get(model_id, stem)
+    if rec is None or rec["status"] != "collected":
+        return False
+    code_path, response_path = output_paths(
+        model_id, prompt_item["language"], prompt_item["owasp_id"], stem
+    )
+    archived = archive is not None and (
+        (model_id, prompt_item["prompt"]["id"], rec.get("sample") or 0) in archive
+    )
+    if (response_path.exists() or archived) and (rec.get("duplicate_of") or code_path.exists()):
+        return True
+    if mark:
+        manifest.record(model_id, stem, status="missing")
+    return False
+
+
+def collect_one(model_cfg, prompt_item, logger, dry_run=False, manifest=None, scanner=None,
+                archive=None, stored=None, **fetch_options):
     """
     Collect code from one model for one prompt.
 
+    If a ProviderRateLimiter is given, every API attempt first takes a token
+    from the model's provider bucket. If a ResponseCache is given, a cached
+    response for the same request is used without touching the network.
+    If StreamMetrics are given, the completion is streamed. RunStats, if
+    given, collect API latency and retry counts. With a CollectionManifest,
+    the skip decision comes from the manifest (see manifest_collected) and
+    the outcome is recorded there. With ProviderCircuitBreakers,
+    CircuitOpenError propagates so the combination can be retried once the
+    provider recovers. With a scan.PipelineScanner, the written code file
+    is queued for scanning. With a ResponseArchive, the response goes there
+    instead of to a loose .response.md file. stored is an existing
+    ResponseArchive that counts as output for the manifest's skip decision
+    even when new responses are not written to it (default: archive).
+
     Returns True if work was done, False if skipped, raises on error.
     """
     model_id = model_cfg["id"]
     language = prompt_item["language"]
     owasp_id = prompt_item["owasp_id"]
-    prompt = prompt_item["prompt"]
-    prompt_id = prompt["id"]
-    task = prompt["task"]
+    prompt_id = prompt_item["prompt"]["id"]
 
     code_path, response_path = output_paths(model_id, language, owasp_id, prompt_id)
 
     tag = f"[{model_id}] [{prompt_id}]"
 
     # Skip if already collected
-    if code_path.exists() and response_path.exists():
+    if manifest is not None:
+        collected = manifest_collected(
+            manifest, model_id, prompt_item, prompt_id,
+            stored if stored is not None else archive, mark=not dry_run,
+        )
+    else:
+        collected = code_path.exists() and (
+            response_path.exists() or (archive is not None and (model_id, prompt_id, 0) in archive)
+        )
+    if collected:
         logger.info(f"{tag} ... SKIP (exists)")
         return False
 
@@ -261,32 +1499,12 @@ def collect_one(model_cfg, prompt_item, logger, dry_run=False):
         logger.info(f"{tag} ... DRY RUN (would collect)")
         return False
 
-    # Send prompt via OpenRouter
-    system_prompt = SYSTEM_PROMPTS[language]
-
-    logger.debug(f"{tag} sending prompt ({len(task)} chars) via OpenRouter ({model_cfg['model_id']})")
-    start = time.time()
-
-    # Retry with exponential backoff for transient failures
-    last_err = None
-    for attempt in range(MAX_RETRIES):
-        try:
-            response_text = call_openrouter(task, model_cfg, system_prompt)
-            break
-        except (RuntimeError, urllib.error.URLError) as e:
-            last_err = e
-            if attempt < MAX_RETRIES - 1:
-                delay = RETRY_DELAYS[attempt]
-                logger.warning(f"{tag} attempt {attempt + 1} failed: {e}, retrying in {delay}s")
-                time.sleep(delay)
-            else:
-                raise last_err
-
-    elapsed = time.time() - start
-    logger.debug(f"{tag} received response ({len(response_text)} chars) in {elapsed:.1f}s")
+    response_text, meta, elapsed = fetch_response(
+        model_cfg, prompt_item, prompt_id, logger, manifest=manifest, **fetch_options,
+    )
 
     # Extract code
-    code, found_block = extract_code(response_text)
+    code, found_block = extract_code(response_text, language)
     if not found_block:
         logger.warning(
             f"{tag} no code block found in response, saving full response as code"
@@ -295,12 +1513,330 @@ def collect_one(model_cfg, prompt_item, logger, dry_run=False):
     # Write output
     code_path.parent.mkdir(parents=True, exist_ok=True)
     code_path.write_text(code + "\n", encoding="utf-8")
-    response_path.write_text(response_text, encoding="utf-8")
+    save_response(response_path, response_text, archive, model_id, language, owasp_id)
+    if scanner:
+        scanner.submit(model_id, code_path)
+
+    if manifest is not None:
+        manifest.record(
+            model_id, prompt_id,
+            **manifest_fields(prompt_item, response_text, meta, elapsed, found_block),
+        )
+
+    timing = "cached" if elapsed is None else f"{elapsed:.1f}s"
+    logger.info(f"{tag} ... done ({len(code)} chars, {timing})")
+    return True
+
+
+def collect_samples(model_cfg, prompt_item, logger, samples, dry_run=False, manifest=None,
+                    scanner=None, archive=None, stored=None, slots=None, **fetch_options):
+    """
+    Collect samples 1..N of one prompt, fanning the API calls out
+    concurrently (each still takes a rate-limit token). slots, a semaphore
+    shared by every prompt in the run, caps the calls in flight overall.
+    stored is as for collect_one.
+
+    Every sample keeps its {prompt_id}.s{k}.response.md, but a code file is
+    only written for code not seen before for this model and prompt:
+    samples whose normalized code matches an earlier one are recorded in
+    the manifest with duplicate_of instead, so scanners only see distinct
+    code. Responses are processed in sample order, which makes the choice
+    of canonical sample deterministic.
+
+    Returns True if any sample was collected, False if all were skipped.
+    If some samples fail, the others are still saved before the first
+    error is raised.
+    """
+    model_id = model_cfg["id"]
+    language = prompt_item["language"]
+    owasp_id = prompt_item["owasp_id"]
+    prompt_id = prompt_item["prompt"]["id"]
+    tag = f"[{model_id}] [{prompt_id}]"
+
+    def is_collected(k):
+        stem = sample_stem(prompt_id, k)
+        if manifest is not None:
+            return manifest_collected(
+                manifest, model_id, prompt_item, stem,
+                stored if stored is not None else archive, mark=not dry_run,
+            )
+        if archive is not None and (model_id, prompt_id, k) in archive:
+            return True
+        return output_paths(model_id, language, owasp_id, stem)[1].exists()
+
+    missing = [k for k in range(1, samples + 1) if not is_collected(k)]
+    if not missing:
+        logger.info(f"{tag} ... SKIP ({samples} samples exist)")
+        return False
+    if dry_run:
+        logger.info(f"{tag} ... DRY RUN (would collect samples {', '.join(map(str, missing))})")
+        return False
+
+    def fetch(k):
+        with slots if slots is not None else nullcontext():
+            return fetch_response(
+                model_cfg, prompt_item, sample_stem(prompt_id, k), logger,
+                manifest=manifest, sample=k, **fetch_options,
+            )
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+        futures = {k: pool.submit(fetch, k) for k in missing}
+        for k, future in futures.items():
+            try:
+                results[k] = future.result()
+            except Exception as e:
+                results[k] = e
 
-    logger.info(f"{tag} ... done ({len(code)} chars, {elapsed:.1f}s)")
+    # Seen code for this prompt: earlier runs (via the manifest) plus this one
+    seen = {}
+    distinct = duplicates = 0
+    for k in missing:
+        if isinstance(results[k], Exception):
+            continue
+        response_text, meta, elapsed = results[k]
+        stem = sample_stem(prompt_id, k)
+        code_path, response_path = output_paths(model_id, language, owasp_id, stem)
+
+        code, found_block = extract_code(response_text, language)
+        code_sha256 = sha256_text(normalize_code(code))
+        duplicate_of = seen.get(code_sha256)
+        if duplicate_of is None and manifest is not None:
+            duplicate_of = manifest.canonical_sample(model_id, prompt_id, code_sha256)
+
+        code_path.parent.mkdir(parents=True, exist_ok=True)
+        save_response(response_path, response_text, archive, model_id, language, owasp_id)
+        if duplicate_of is None:
+            seen[code_sha256] = stem
+            code_path.write_text(code + "\n", encoding="utf-8")
+            if scanner:
+                scanner.submit(model_id, code_path)
+            distinct += 1
+        else:
+            code_path.unlink(missing_ok=True)
+            duplicates += 1
+            logger.debug(f"{tag} sample {k} duplicates {duplicate_of}")
+
+        if manifest is not None:
+            manifest.record(
+                model_id, stem,
+                sample_of=prompt_id,
+                sample=k,
+                temperature=model_cfg.get("temperature", 0),
+                code_sha256=code_sha256,
+                duplicate_of=duplicate_of,
+                **manifest_fields(prompt_item, response_text, meta, elapsed, found_block),
+            )
+
+    errors = [e for e in results.values() if isinstance(e, Exception)]
+    logger.info(
+        f"{tag} ... done ({distinct + duplicates}/{len(missing)} samples, "
+        f"{distinct} distinct, {duplicates} duplicate)"
+    )
+    if errors:
+        # A deferral takes precedence so the whole prompt is re-queued
+        deferrals = [e for e in errors if isinstance(e, CircuitOpenError)]
+        raise deferrals[0] if deferrals else errors[0]
     return True
 
 
+# ---------------------------------------------------------------------------
+# Offline re-extraction
+# ---------------------------------------------------------------------------
+
+
+def reextract_one(response_path, response_text=None):
+    """
+    Re-run extract_code on one stored response and update its code file.
+
+    response_path locates the response (and so its code file); the text is
+    read from it unless given, as it is for archived responses. The code
+    file is only written when the extracted code differs from what is on
+    disk. Returns (response_path, status, found_block) where status is one
+    of "updated", "created", "unchanged" or "skipped" (language unknown).
+    """
+    response_path = Path(response_path)
+    # output/{model_id}/{language}/{owasp_id}/{prompt_id}.response.md
+    language = response_path.parent.parent.name
+    if language not in EXTENSIONS:
+        return str(response_path), "skipped", False
+
+    prompt_id = response_path.name[: -len(".response.md")]
+    code_path = response_path.with_name(prompt_id + code_ext(language))
+
+    if response_text is None:
+        response_text = response_path.read_text(encoding="utf-8")
+    code, found = extract_code(response_text, language)
+    new_content = code + "\n"
+
+    try:
+        old_content = code_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        old_content = None
+
+    if old_content == new_content:
+        return str(response_path), "unchanged", found
+    code_path.write_text(new_content, encoding="utf-8")
+    return str(response_path), "created" if old_content is None else "updated", found
+
+
+def reextract_all(logger, jobs=None, model_filter=None, prompt_filter=None, manifest=None,
+                  archive=None):
+    """
+    Re-extract code from every stored response under OUTPUT_DIR, spread
+    across a process pool. No API calls are made. Loose .response.md files
+    are read by the workers; archived responses without a loose copy are
+    read here and handed over. Extraction outcomes that changed are written
+    back to the manifest, if given; samples it lists as duplicates are left
+    without a code file.
+
+    Returns a Counter of reextract_one statuses.
+    """
+    def wanted(path):
+        model_id = path.relative_to(OUTPUT_DIR).parts[0]
+        if model_id.startswith("."):
+            return False
+        if model_filter and model_id != model_filter:
+            return False
+        if prompt_filter and path.name != f"{prompt_filter}.response.md":
+            match = SAMPLE_RESPONSE_RE.match(path.name)
+            if not (match and match.group("prompt") == prompt_filter):
+                return False
+        if manifest is not None:
+            rec = manifest.get(model_id, path.name[: -len(".response.md")])
+            if rec and rec.get("duplicate_of"):
+                return False
+        return True
+
+    paths = [str(p) for p in sorted(OUTPUT_DIR.glob("*/*/*/*.response.md")) if wanted(p)]
+    texts = [None] * len(paths)
+    if archive is not None:
+        loose = set(paths)
+        for entry, text in archive.iter_entries(model_filter=model_filter):
+            path = response_archive.response_path_for(OUTPUT_DIR, entry)
+            if str(path) not in loose and wanted(path):
+                paths.append(str(path))
+                texts.append(text)
+
+    counts = Counter()
+    if not paths:
+        return counts
+
+    jobs = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for path, status, found in pool.map(reextract_one, paths, texts, chunksize=chunksize):
+            counts[status] += 1
+            if status in ("updated", "created"):
+                logger.info(f"{Path(path).relative_to(OUTPUT_DIR)} ... {status}")
+            if manifest is not None and status != "skipped":
+                model_id = Path(path).relative_to(OUTPUT_DIR).parts[0]
+                prompt_id = Path(path).name[: -len(".response.md")]
+                rec = manifest.get(model_id, prompt_id)
+                extraction = "block" if found else "no_block"
+                if rec and rec["status"] == "collected" and rec.get("extraction") != extraction:
+                    manifest.record(model_id, prompt_id, extraction=extraction)
+    return counts
+
+
+def run_collection(models, prompt_items, logger, concurrency=1, **options):
+    """
+    Run collect_one over every model x prompt combination.
+
+    With concurrency > 1 (and not a dry run) combinations are submitted to a
+    thread pool; otherwise they run sequentially, grouped by model. Extra
+    keyword options are passed through to collect_one.
+
+    A combination refused by an open circuit breaker is deferred until the
+    breaker's next probe (at most MAX_DEFERRALS times), so other providers
+    keep flowing meanwhile.
+
+    With a samples option, each combination is handled by collect_samples()
+    instead of collect_one(), and at most `concurrency` sample requests are
+    in flight across all combinations.
+
+    Returns a Counter with "done", "skipped", "errors" and "deferred".
+    """
+    counts = Counter(done=0, skipped=0, errors=0, deferred=0)
+    worker = collect_samples if options.get("samples") else collect_one
+    if options.get("samples"):
+        # Each prompt fans its samples out; keep the total in flight at the cap
+        options["slots"] = threading.BoundedSemaphore(concurrency)
+    else:
+        options.pop("samples", None)
+    deferred = []  # heap of (ready_at, seq, model_cfg, prompt_item, times)
+    seq = itertools.count()
+
+    def record(model_cfg, prompt_item, call, times=0):
+        model_id = model_cfg["id"]
+        prompt_id = prompt_item["prompt"]["id"]
+        try:
+            counts["done" if call() else "skipped"] += 1
+        except CircuitOpenError as e:
+            if times >= MAX_DEFERRALS:
+                logger.error(f"[{model_id}] [{prompt_id}] ... ERROR: {e} (gave up)")
+                counts["errors"] += 1
+                return
+            logger.info(f"[{model_id}] [{prompt_id}] ... DEFERRED ({e})")
+            counts["deferred"] += 1
+            heapq.heappush(
+                deferred,
+                (time.monotonic() + e.wait, next(seq), model_cfg, prompt_item, times + 1),
+            )
+        except Exception as e:
+            logger.error(f"[{model_id}] [{prompt_id}] ... ERROR: {e}")
+            counts["errors"] += 1
+
+    if concurrency > 1 and not options.get("dry_run"):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {}
+
+            def submit(model_cfg, prompt_item, times=0):
+                future = pool.submit(worker, model_cfg, prompt_item, logger, **options)
+                futures[future] = (model_cfg, prompt_item, times)
+
+            for model_cfg in models:
+                for prompt_item in prompt_items:
+                    submit(model_cfg, prompt_item)
+
+            while futures or deferred:
+                while deferred and deferred[0][0] <= time.monotonic():
+                    _, _, model_cfg, prompt_item, times = heapq.heappop(deferred)
+                    submit(model_cfg, prompt_item, times)
+                timeout = max(0.0, deferred[0][0] - time.monotonic()) if deferred else None
+                if not futures:
+                    time.sleep(timeout)
+                    continue
+                finished, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    model_cfg, prompt_item, times = futures.pop(future)
+                    record(model_cfg, prompt_item, future.result, times)
+    else:
+        for model_cfg in models:
+            logger.info(f"--- {model_cfg['name']} ({model_cfg['id']}) ---")
+
+            for prompt_item in prompt_items:
+                record(
+                    model_cfg,
+                    prompt_item,
+                    lambda: worker(model_cfg, prompt_item, logger, **options),
+                )
+
+        if deferred:
+            logger.info(f"--- Deferred ({len(deferred)}) ---")
+        while deferred:
+            ready_at, _, model_cfg, prompt_item, times = heapq.heappop(deferred)
+            time.sleep(max(0.0, ready_at - time.monotonic()))
+            record(
+                model_cfg,
+                prompt_item,
+                lambda: worker(model_cfg, prompt_item, logger, **options),
+                times,
+            )
+
+    return counts
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Collect AI-generated code from LLMs for the security study."
@@ -322,13 +1858,122 @@ def main():
         action="store_true",
         help="Preview what would be collected without running",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum in-flight API calls across all models (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=None,
+        help=(
+            f"Requests per minute per OpenRouter provider (default: {DEFAULT_RPM} "
+            "with --concurrency > 1, unlimited when sequential)"
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream completions (SSE) and report time-to-first-token and tokens/sec",
+    )
+    parser.add_argument(
+        "--stop-at-fence",
+        action="store_true",
+        help="With --stream, stop reading once the first code block closes",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="Collect N samples per prompt as {prompt_id}.s1..sN, deduplicated by code",
+    )
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=None,
+        help="With --samples, override every model's temperature",
+    )
+    parser.add_argument(
+        "--pipeline-scan",
+        action="store_true",
+        help="Scan each new code file with scan.py's tools while collection continues",
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=DEFAULT_SCAN_WORKERS,
+        help=f"Concurrent scan batches for --pipeline-scan (default: {DEFAULT_SCAN_WORKERS})",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help=f"Store responses in {ARCHIVE_PATH.name} instead of .response.md files",
+    )
+    parser.add_argument(
+        "--reextract",
+        action="store_true",
+        help="Re-extract code from stored .response.md files (no API calls)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for --reextract (default: CPU count)",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Print per-provider latency and token usage from the manifest and exit",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always call the API instead of reusing responses from {CACHE_DIR}",
+    )
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.rpm is not None and args.rpm <= 0:
+        parser.error("--rpm must be positive")
+    try:
+        check_openrouter_url(OPENROUTER_URL)
+    except RuntimeError as e:
+        parser.error(str(e))
+    if args.stop_at_fence and not args.stream:
+        parser.error("--stop-at-fence requires --stream")
+    if args.samples is not None and args.samples < 1:
+        parser.error("--samples must be at least 1")
+    if args.temperature is not None and args.samples is None:
+        parser.error("--temperature requires --samples")
+    if args.scan_workers < 1:
+        parser.error("--scan-workers must be at least 1")
+
     logger = setup_logging()
     logger.info("=" * 60)
     logger.info("AI Code Security Study 2026 - Code Collection")
     logger.info("=" * 60)
 
+    if args.reextract:
+        logger.info(f"RE-EXTRACT MODE - rewriting code files from {OUTPUT_DIR}")
+        logger.info("-" * 60)
+        start = time.time()
+        manifest = CollectionManifest(MANIFEST_PATH) if MANIFEST_PATH.exists() else None
+        archive = response_archive.ResponseArchive(ARCHIVE_PATH) if ARCHIVE_PATH.exists() else None
+        counts = reextract_all(
+            logger, jobs=args.jobs, model_filter=args.model, prompt_filter=args.prompt_id,
+            manifest=manifest, archive=archive,
+        )
+        logger.info("-" * 60)
+        logger.info(
+            f"Responses: {sum(counts.values())} | Updated: {counts['updated']} | "
+            f"Created: {counts['created']} | Unchanged: {counts['unchanged']} | "
+            f"{time.time() - start:.1f}s"
+        )
+        return
+
     # Load config and prompts
     config = load_config()
     models = config["models"]
@@ -347,43 +1992,137 @@ def main():
             logger.error(f"Prompt ID '{args.prompt_id}' not found in prompt files")
             sys.exit(1)
 
-    total = len(models) * len(prompt_items)
+    if args.temperature is not None:
+        models = [dict(m, temperature=args.temperature) for m in models]
+
+    # An existing archive is always read; --archive makes new responses go there
+    archive = None
+    if args.archive or ARCHIVE_PATH.exists():
+        archive = response_archive.ResponseArchive(ARCHIVE_PATH)
+
+    manifest = CollectionManifest(MANIFEST_PATH)
+    if not MANIFEST_PATH.exists():
+        # --dry-run and --report leave output/ untouched
+        save = not (args.dry_run or args.report)
+        added = manifest.bootstrap(load_prompts(), archive, save=save)
+        logger.info(
+            f"Manifest: bootstrapped {added} records from {OUTPUT_DIR}"
+            + ("" if save else " (not saved)")
+        )
+
+    if args.report:
+        for line in manifest_report(manifest, models):
+            logger.info(line)
+        return
+
+    if args.samples:
+        stems = [
+            (p, sample_stem(p["prompt"]["id"], k))
+            for p in prompt_items
+            for k in range(1, args.samples + 1)
+        ]
+    else:
+        stems = [(p, p["prompt"]["id"]) for p in prompt_items]
+    total = len(models) * len(stems)
+    pending = sum(
+        1 for m in models for p, stem in stems
+        if not manifest_collected(manifest, m["id"], p, stem, archive, mark=False)
+    )
     logger.info(
         f"Models: {len(models)} | Prompts: {len(prompt_items)} | "
-        f"Combinations: {total}"
+        f"Combinations: {total} | To collect: {pending}"
     )
+    if args.samples:
+        temperatures = sorted({m.get("temperature", 0) for m in models})
+        logger.info(
+            f"Samples: {args.samples} per prompt | "
+            f"Temperature: {', '.join(f'{t:g}' for t in temperatures)}"
+        )
 
+    concurrent = args.concurrency > 1 and not args.dry_run
+    # Sequential runs are not rate-limited unless --rpm asks for it
+    rpm = args.rpm if args.rpm is not None or not concurrent else DEFAULT_RPM
     if args.dry_run:
         logger.info("DRY RUN MODE - no API calls will be made")
+    elif concurrent:
+        logger.info(
+            f"Concurrency: {args.concurrency} | "
+            f"Rate limit: {rpm:g} req/min per provider"
+        )
+    elif rpm is not None:
+        logger.info(f"Rate limit: {rpm:g} req/min per provider")
 
     logger.info("-" * 60)
 
-    # Collect
-    done_count = 0
-    skip_count = 0
-    error_count = 0
+    scanner = None
+    if args.pipeline_scan and not args.dry_run:
+        import scan  # only needed here; probes for installed SAST tools
 
-    for model_cfg in models:
-        model_id = model_cfg["id"]
-        logger.info(f"--- {model_cfg['name']} ({model_id}) ---")
+        tools = scan.available_tools()
+        if not tools:
+            logger.error("--pipeline-scan: no SAST tools installed (see scan.py)")
+            sys.exit(1)
+        scanner = scan.PipelineScanner(
+            tools, logger, workers=args.scan_workers, output_dir=OUTPUT_DIR,
+        )
+        logger.info(f"Pipeline scan: {', '.join(tools)} | Workers: {args.scan_workers}")
 
-        for prompt_item in prompt_items:
-            try:
-                result = collect_one(model_cfg, prompt_item, logger, dry_run=args.dry_run)
-                if result:
-                    done_count += 1
-                else:
-                    skip_count += 1
-            except Exception as e:
-                prompt_id = prompt_item["prompt"]["id"]
-                logger.error(f"[{model_id}] [{prompt_id}] ... ERROR: {e}")
-                error_count += 1
+    # Collect
+    cache = None if args.no_cache else ResponseCache(CACHE_DIR)
+    stream_metrics = StreamMetrics(args.stop_at_fence) if args.stream else None
+    run_stats = RunStats()
+    breakers = ProviderCircuitBreakers()
+
+    counts = run_collection(
+        models, prompt_items, logger,
+        concurrency=args.concurrency,
+        dry_run=args.dry_run,
+        limiter=ProviderRateLimiter(rpm) if rpm is not None else None,
+        cache=cache,
+        stream_metrics=stream_metrics,
+        run_stats=run_stats,
+        manifest=manifest,
+        breakers=breakers,
+        samples=args.samples,
+        scanner=scanner,
+        archive=archive if args.archive else None,
+        stored=archive,
+    )
+    error_count = counts["errors"]
+    if not args.dry_run:
+        manifest.compact()
+        load_catalog()  # refresh for scan.py and aggregate.py
+    if scanner:
+        logger.info("Waiting for pipelined scans to finish...")
+        scanner.close()
+        merged = scan.merge_pipeline_results(logger)
+        error_count += scanner.stats["errors"]
 
     # Summary
     logger.info("-" * 60)
     logger.info(
-        f"Done: {done_count} | Skipped: {skip_count} | Errors: {error_count}"
+        f"Done: {counts['done']} | Skipped: {counts['skipped']} | Errors: {error_count}"
     )
+    if run_stats.retries:
+        logger.info(f"Retries: {run_stats.retry_summary()}")
+    if breakers.summary():
+        logger.info(f"Circuit breakers: {breakers.summary()} | Deferrals: {counts['deferred']}")
+    if cache and cache.stats:
+        logger.info(f"Cache: {cache.summary()}")
+    if HTTP_POOL.stats["requests"]:
+        logger.info(f"HTTP: {HTTP_POOL.summary()}")
+    if stream_metrics:
+        for line in stream_metrics.summary_lines():
+            logger.info(f"Stream: {line}")
+    if scanner:
+        logger.info(f"Pipeline scan: {scanner.summary()} | Merged: {merged} tool results")
+    if args.archive:
+        stats = archive.stats()
+        logger.info(
+            f"Archive: {stats['records']} responses, {stats['raw_bytes']} -> "
+            f"{stats['pack_bytes']} bytes ({ARCHIVE_PATH})"
+        )
+    logger.info(f"Manifest: {MANIFEST_PATH}")
     logger.info(f"Log: {LOG_PATH}")
 
     if error_count > 0:
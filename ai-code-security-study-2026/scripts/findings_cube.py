@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Findings Cube
+AI-Generated Code Security Study 2026
+
+A materialized count cube over the validation rows, so new breakdowns don't
+need aggregate.py edits or a full pass over validation.csv:
+
+    dimensions: model, language, owasp, cwe, severity, tools, verdict
+    per cell:   finding count + the set of distinct files (a bitmap)
+
+Dimension values and file paths are dictionary-encoded. Only populated cells
+are stored, column-wise: one array of value codes per dimension, an array of
+counts, the CSV position of each cell's first row, and one file bitmap per
+cell (bit i = files[i]). Slices visit cells in first-row order, so their
+output is ordered as a pass over the CSV would order it.
+
+    findings.cube        JSON header line, then the binary columns
+    findings.cube.rows   one tab-separated line per validation row:
+                         finding_id, digest, cell, file (for updates)
+
+update() diffs a validation CSV against the row index and only touches the
+cells of rows that were added, changed or removed. A file bit is cleared
+when the last row contributing it to a cell goes away.
+
+Usage:
+    python3 findings_cube.py update --csv validation.csv
+    python3 findings_cube.py info
+    python3 findings_cube.py slice --by model,owasp --where verdict=TP
+    python3 findings_cube.py slice --by severity --where verdict=TP,language=python
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from aggregate import extract_language_from_file
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_CSV = SCRIPT_DIR / "validation.csv"
+DEFAULT_CUBE = SCRIPT_DIR / "findings.cube"
+
+CUBE_VERSION = 1
+
+DIMENSIONS = ("model", "language", "owasp", "cwe", "severity", "tools", "verdict")
+
+# Row fields that determine a row's cell and file
+ROW_FIELDS = ("model", "file", "owasp", "cwe", "severity", "tools", "validated")
+
+
+# ---------------------------------------------------------------------------
+# Row helpers
+# ---------------------------------------------------------------------------
+
+
+def row_values(row):
+    """Normalized dimension values for one validation row, in DIMENSIONS order."""
+    tools = sorted(t.strip() for t in (row.get("tools") or "").split(",") if t.strip())
+    return (
+        row.get("model") or "",
+        extract_language_from_file(row.get("file") or ""),
+        (row.get("owasp") or "").strip(),
+        (row.get("cwe") or "").strip(),
+        (row.get("severity") or "").strip().upper(),
+        ", ".join(tools),
+        (row.get("validated") or "").strip().upper(),
+    )
+
+
+def row_digest(row):
+    payload = "\x1f".join([row.get(k) or "" for k in ROW_FIELDS])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_keyed_rows(rows):
+    """
+    Yield (row_key, row) with a unique key per row: the finding ID, with a
+    #n suffix for repeats, or the row digest for rows without an ID.
+    """
+    seen = Counter()
+    for row in rows:
+        base = (row.get("finding_id") or "").strip().replace("\t", " ") or "~" + row_digest(row)
+        seen[base] += 1
+        yield (base if seen[base] == 1 else f"{base}#{seen[base]}"), row
+
+
+def bitmap_files(bitmap):
+    """Yield the set bit positions of an int bitmap."""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+# ---------------------------------------------------------------------------
+# Cube
+# ---------------------------------------------------------------------------
+
+
+class FindingsCube:
+    """
+    Sparse, column-stored count cube with per-cell file bitmaps.
+
+    Cells are addressed by index; cell_index maps a tuple of dimension codes
+    to its cell. The row index (rows, pairs) is only loaded for updates.
+    """
+
+    def __init__(self, path=DEFAULT_CUBE):
+        self.path = Path(path)
+        self.rows_path = self.path.with_name(self.path.name + ".rows")
+        self.values = {dim: [] for dim in DIMENSIONS}   # dim -> code -> value
+        self.codes = {dim: {} for dim in DIMENSIONS}    # dim -> value -> code
+        self.files = []
+        self.file_codes = {}
+        self.columns = {dim: array("I") for dim in DIMENSIONS}
+        self.counts = array("I")
+        self.first_row = array("I")  # CSV position of the cell's first row
+        self.bitmaps = []
+        self.cell_index = {}
+        self.order = []  # cell indexes sorted by first_row
+        self.rows = None   # row key -> [digest, cell, file code or -1]
+        self.pairs = None  # (cell, file code) -> rows contributing that bit
+
+    # -- persistence --------------------------------------------------------
+
+    @classmethod
+    def load(cls, path=DEFAULT_CUBE, with_rows=False):
+        """Load a cube (an empty one if the file doesn't exist)."""
+        cube = cls(path)
+        if with_rows and not cube.rows_path.exists():
+            # Cells can't be updated without the row index: rebuild
+            cube._load_rows()
+            return cube
+        if cube.path.exists():
+            cube._load_cells()
+        if with_rows:
+            cube._load_rows()
+        return cube
+
+    def _load_cells(self):
+        with open(self.path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CUBE_VERSION:
+                raise ValueError(f"{self.path}: unsupported cube version {header.get('version')}")
+            n = header["cells"]
+            for dim in DIMENSIONS:
+                self.values[dim] = header["dimensions"][dim]
+                self.codes[dim] = {v: i for i, v in enumerate(self.values[dim])}
+                self.columns[dim] = self._read_array(f, "I", n)
+            self.files = header["files"]
+            self.file_codes = {p: i for i, p in enumerate(self.files)}
+            self.counts = self._read_array(f, "I", n)
+            self.first_row = self._read_array(f, "I", n)
+            lengths = self._read_array(f, "I", n)
+            self.bitmaps = [int.from_bytes(f.read(length), "little") for length in lengths]
+        self.cell_index = {self._cell_key(c): c for c in range(n)}
+        self._sort_cells()
+
+    def _sort_cells(self):
+        self.order = sorted(range(len(self.counts)), key=self.first_row.__getitem__)
+
+    @staticmethod
+    def _read_array(f, typecode, n):
+        a = array(typecode)
+        a.frombytes(f.read(a.itemsize * n))
+        if sys.byteorder == "big":
+            a.byteswap()
+        return a
+
+    @staticmethod
+    def _write_array(f, a):
+        if sys.byteorder == "big":
+            a = array(a.typecode, a)
+            a.byteswap()
+        f.write(a.tobytes())
+
+    def _load_rows(self):
+        self.rows = {}
+        self.pairs = Counter()
+        if not self.rows_path.exists():
+            return
+        rows, pairs = self.rows, self.pairs
+        with open(self.rows_path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, digest, cell, file_code = line.rstrip("\n").split("\t")
+                cell, file_code = int(cell), int(file_code)
+                rows[key] = [digest, cell, file_code]
+                if file_code >= 0:
+                    pairs[(cell, file_code)] += 1
+
+    def save(self):
+        """Drop empty cells and write cube and row index atomically."""
+        self._compact()
+        n = len(self.counts)
+        header = {
+            "version": CUBE_VERSION,
+            "cells": n,
+            "dimensions": self.values,
+            "files": self.files,
+        }
+        bitmaps = [b.to_bytes((b.bit_length() + 7) // 8, "little") for b in self.bitmaps]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            for dim in DIMENSIONS:
+                self._write_array(f, self.columns[dim])
+            self._write_array(f, self.counts)
+            self._write_array(f, self.first_row)
+            self._write_array(f, array("I", (len(b) for b in bitmaps)))
+            for b in bitmaps:
+                f.write(b)
+
+        if self.rows is not None:
+            tmp_rows = self.rows_path.with_name(self.rows_path.name + ".tmp")
+            with open(tmp_rows, "w", encoding="utf-8") as f:
+                for key, (digest, cell, file_code) in self.rows.items():
+                    f.write(f"{key}\t{digest}\t{cell}\t{file_code}\n")
+            os.replace(tmp_rows, self.rows_path)
+        os.replace(tmp, self.path)
+
+    def _compact(self):
+        live = [c for c in range(len(self.counts)) if self.counts[c]]
+        if len(live) == len(self.counts):
+            return
+        remap = {old: new for new, old in enumerate(live)}
+        for dim in DIMENSIONS:
+            self.columns[dim] = array("I", (self.columns[dim][c] for c in live))
+        self.counts = array("I", (self.counts[c] for c in live))
+        self.first_row = array("I", (self.first_row[c] for c in live))
+        self.bitmaps = [self.bitmaps[c] for c in live]
+        self.cell_index = {self._cell_key(c): c for c in range(len(live))}
+        self._sort_cells()
+        if self.rows is not None:
+            for entry in self.rows.values():
+                entry[1] = remap[entry[1]]
+            self.pairs = Counter({(remap[c], f): k for (c, f), k in self.pairs.items()})
+
+    # -- updates ------------------------------------------------------------
+
+    def _cell_key(self, cell):
+        return tuple(self.columns[dim][cell] for dim in DIMENSIONS)
+
+    def _code(self, dim, value):
+        code = self.codes[dim].get(value)
+        if code is None:
+            code = self.codes[dim][value] = len(self.values[dim])
+            self.values[dim].append(value)
+        return code
+
+    def _cell_for(self, values):
+        key = tuple(self._code(dim, v) for dim, v in zip(DIMENSIONS, values))
+        cell = self.cell_index.get(key)
+        if cell is None:
+            cell = self.cell_index[key] = len(self.counts)
+            for dim, code in zip(DIMENSIONS, key):
+                self.columns[dim].append(code)
+            self.counts.append(0)
+            self.first_row.append(0)
+            self.bitmaps.append(0)
+        return cell
+
+    def _file_code(self, filepath):
+        if not filepath:
+            return -1
+        code = self.file_codes.get(filepath)
+        if code is None:
+            code = self.file_codes[filepath] = len(self.files)
+            self.files.append(filepath)
+        return code
+
+    def _add(self, key, digest, row):
+        cell = self._cell_for(row_values(row))
+        file_code = self._file_code(row.get("file") or "")
+        self.counts[cell] += 1
+        if file_code >= 0:
+            self.pairs[(cell, file_code)] += 1
+            self.bitmaps[cell] |= 1 << file_code
+        self.rows[key] = [digest, cell, file_code]
+        return cell
+
+    def _remove(self, key):
+        _, cell, file_code = self.rows.pop(key)
+        self.counts[cell] -= 1
+        if file_code >= 0:
+            self.pairs[(cell, file_code)] -= 1
+            if not self.pairs[(cell, file_code)]:
+                del self.pairs[(cell, file_code)]
+                self.bitmaps[cell] &= ~(1 << file_code)
+
+    def update(self, rows):
+        """
+        Make the cube reflect `rows` (the full current validation CSV).
+
+        Returns a Counter of added/changed/removed/unchanged rows.
+        """
+        if self.rows is None:
+            self._load_rows()
+        stats = Counter()
+        seen = set()
+        first_seen = set()
+        for position, (key, row) in enumerate(iter_keyed_rows(rows)):
+            seen.add(key)
+            digest = row_digest(row)
+            entry = self.rows.get(key)
+            if entry is not None and entry[0] == digest:
+                stats["unchanged"] += 1
+                cell = entry[1]
+            else:
+                if entry is not None:
+                    self._remove(key)
+                    stats["changed"] += 1
+                else:
+                    stats["added"] += 1
+                cell = self._add(key, digest, row)
+            if cell not in first_seen:
+                first_seen.add(cell)
+                self.first_row[cell] = position
+        for key in [k for k in self.rows if k not in seen]:
+            self._remove(key)
+            stats["removed"] += 1
+        self._sort_cells()
+        return stats
+
+    # -- queries ------------------------------------------------------------
+
+    def _resolve_where(self, where):
+        """Turn {dim: value or [values]} into {dim: set of codes} (None = no match)."""
+        resolved = {}
+        for dim, wanted in (where or {}).items():
+            if dim not in self.codes:
+                raise ValueError(f"unknown dimension: {dim}")
+            wanted = [wanted] if isinstance(wanted, str) else wanted
+            codes = {self.codes[dim][v] for v in wanted if v in self.codes[dim]}
+            if not codes:
+                return None
+            resolved[dim] = codes
+        return resolved
+
+    def cells(self, where=None):
+        """Yield the indexes of non-empty cells matching `where`."""
+        resolved = self._resolve_where(where)
+        if resolved is None:
+            return
+        filters = [(self.columns[dim], codes) for dim, codes in resolved.items()]
+        counts = self.counts
+        for cell in self.order:
+            if counts[cell] and all(col[cell] in codes for col, codes in filters):
+                yield cell
+
+    def slice(self, by=(), where=None):
+        """
+        Roll the cube up to the `by` dimensions for cells matching `where`.
+
+        Returns {group values tuple: {"findings": n, "files": bitmap}} in
+        first-row order; file_count() and file_paths() read bitmaps.
+        """
+        for dim in by:
+            if dim not in self.columns:
+                raise ValueError(f"unknown dimension: {dim}")
+        groups = {}
+        group_columns = [(self.columns[dim], self.values[dim]) for dim in by]
+        for cell in self.cells(where):
+            key = tuple(values[col[cell]] for col, values in group_columns)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {"findings": 0, "files": 0}
+            group["findings"] += self.counts[cell]
+            group["files"] |= self.bitmaps[cell]
+        return groups
+
+    @staticmethod
+    def file_count(bitmap):
+        return bitmap.bit_count()
+
+    def file_paths(self, bitmap):
+        return {self.files[i] for i in bitmap_files(bitmap)}
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def parse_where(text):
+    """Parse "dim=value,dim=value|value" into {dim: [values]}."""
+    where = {}
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        dim, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"expected dim=value, got: {part}")
+        where.setdefault(dim.strip(), []).extend(v.strip() for v in value.split("|"))
+    return where
+
+
+def iter_csv(csv_path):
+    with open(csv_path, "r", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build, update and slice the persisted findings cube."
+    )
+    parser.add_argument(
+        "--cube",
+        type=Path,
+        default=DEFAULT_CUBE,
+        help=f"Cube path (default: {DEFAULT_CUBE})",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("update", help="Apply a validation CSV to the cube incrementally")
+    p.add_argument("--csv", type=Path, default=DEFAULT_CSV, help=f"Validation CSV (default: {DEFAULT_CSV})")
+    sub.add_parser("info", help="Show cube size and dimension cardinalities")
+    p = sub.add_parser("slice", help="Print counts grouped by some dimensions")
+    p.add_argument("--by", default="", help=f"Comma-separated dimensions: {', '.join(DIMENSIONS)}")
+    p.add_argument("--where", default="", help="Filter, e.g. verdict=TP,language=python,owasp=A01|A03")
+    p.add_argument("--files", action="store_true", help="List the distinct files of each group")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        if not args.csv.exists():
+            parser.error(f"no such file: {args.csv}")
+        start = time.monotonic()
+        cube = FindingsCube.load(args.cube, with_rows=True)
+        stats = cube.update(iter_csv(args.csv))
+        cube.save()
+        print(
+            f"Updated {args.cube}: {stats['added']} added, {stats['changed']} changed, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged "
+            f"({len(cube.counts)} cells, {time.monotonic() - start:.2f}s)"
+        )
+        return
+
+    cube = FindingsCube.load(args.cube)
+    if args.command == "info":
+        print(f"Cube:  {args.cube}")
+        print(f"Cells: {len(cube.counts)} | Rows: {sum(cube.counts)} | Files: {len(cube.files)}")
+        for dim in DIMENSIONS:
+            print(f"  {dim:10s} {len(cube.values[dim])} values")
+        return
+
+    by = [d.strip() for d in args.by.split(",") if d.strip()]
+    try:
+        start = time.monotonic()
+        groups = cube.slice(by, parse_where(args.where))
+        elapsed = time.monotonic() - start
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"{'  '.join(by or ['(all)'])}  findings  files")
+    for key, group in sorted(groups.items()):
+        label = "  ".join(v or "-" for v in key) or "(all)"
+        print(f"{label}  {group['findings']}  {cube.file_count(group['files'])}")
+        if args.files:
+            for path in sorted(cube.file_paths(group["files"])):
+                print(f"    {path}")
+    print(f"({len(groups)} groups, {elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
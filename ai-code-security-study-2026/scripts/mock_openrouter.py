@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Mock OpenRouter Server
+AI-Generated Code Security Study 2026
+
+A local stand-in for the OpenRouter chat-completions endpoint, for exercising
+collect.py (throughput, retries, concurrency) without spending API credits.
+
+Responses are canned: a request is answered with the stored .response.md for
+the same model and prompt when one exists under output/, otherwise with a
+randomly chosen stored response. Latency is drawn from a configurable
+distribution, and a fraction of requests can be failed with 429 (carrying
+Retry-After) or 5xx. One OpenRouter provider can also be marked degraded so
+that all of its requests fail with 5xx. Both plain JSON and streaming
+(stream: true) requests are supported.
+
+Latency specs:
+    fixed:0.5            always 0.5s
+    uniform:0.2,1.5      uniform between 0.2s and 1.5s
+    exp:0.8              exponential with mean 0.8s
+    lognormal:0.6,0.5    lognormal with median 0.6s and sigma 0.5
+
+Usage:
+    python3 mock_openrouter.py                               # 127.0.0.1:8089
+    python3 mock_openrouter.py --latency lognormal:1.2,0.6 --rate-429 0.05
+    OPENROUTER_URL=http://127.0.0.1:8089/api/v1/chat/completions \\
+        OPENROUTER_API_KEY=dummy python3 collect.py --concurrency 8
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import response_archive
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STUDY_DIR = SCRIPT_DIR.parent
+CONFIG_PATH = SCRIPT_DIR / "config.json"
+PROMPTS_DIR = STUDY_DIR / "prompts"
+RESPONSES_DIR = STUDY_DIR / "output"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8089
+DEFAULT_LATENCY = "lognormal:0.3,0.5"
+DEFAULT_TOKENS_PER_SEC = 200.0
+
+# Roughly four characters per token, for usage figures and stream chunking
+CHARS_PER_TOKEN = 4
+
+FALLBACK_RESPONSE = "```python\nprint('mock response')\n```\n"
+
+
+# ---------------------------------------------------------------------------
+# Latency distributions
+# ---------------------------------------------------------------------------
+
+
+def parse_latency(spec):
+    """
+    Parse a latency spec (see module docstring) into a zero-argument sampler
+    returning seconds. Raises ValueError on malformed specs.
+    """
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(v) for v in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency parameters: {spec}")
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp" and len(values) == 1 and values[0] > 0:
+        return lambda: random.expovariate(1.0 / values[0])
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+# ---------------------------------------------------------------------------
+# Canned responses
+# ---------------------------------------------------------------------------
+
+
+def load_canned_responses(responses_dir, prompts_dir, config_path):
+    """
+    Index stored responses (.response.md files or the response archive) for
+    lookup by request.
+
+    Returns (by_request, pool) where by_request maps
+    (openrouter model_id, task text) -> response text, and pool is a list of
+    every response for requests that have no exact match.
+    """
+    # prompt id -> task text
+    prompt_tasks = {}
+    if prompts_dir.is_dir():
+        for json_path in sorted(prompts_dir.glob("*/*.json")):
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for prompt in data.get("prompts", []):
+                prompt_tasks[prompt["id"]] = prompt["task"]
+
+    # study model id -> openrouter model_id
+    model_ids = {}
+    if config_path.exists():
+        with open(config_path, "r", encoding="utf-8") as f:
+            for m in json.load(f).get("models", []):
+                model_ids[m["id"]] = m["model_id"]
+
+    # (study model id, prompt id) -> response text, from the response
+    # archive (temperature-0 samples) and then any loose files
+    stored = {}
+    archive_path = responses_dir / response_archive.ARCHIVE_PATH.name
+    if archive_path.exists():
+        archive = response_archive.ResponseArchive(archive_path)
+        for entry, text in archive.iter_entries():
+            if entry["sample"] == 0:
+                stored[(entry["model"], entry["prompt_id"])] = text
+    if responses_dir.is_dir():
+        for path in sorted(responses_dir.glob("*/*/*/*.response.md")):
+            model_id = path.relative_to(responses_dir).parts[0]
+            prompt_id = path.name[: -len(".response.md")]
+            stored[(model_id, prompt_id)] = path.read_text(encoding="utf-8")
+
+    by_request = {}
+    for (model_id, prompt_id), text in stored.items():
+        or_model = model_ids.get(model_id)
+        task = prompt_tasks.get(prompt_id)
+        if or_model and task:
+            by_request[(or_model, task)] = text
+
+    pool = list(stored.values()) or [FALLBACK_RESPONSE]
+    return by_request, pool
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class MockOptions:
+    """Behaviour knobs shared by all request handlers of one server."""
+
+    def __init__(self, latency=DEFAULT_LATENCY, rate_429=0.0, rate_5xx=0.0,
+                 retry_after=1.0, tokens_per_sec=DEFAULT_TOKENS_PER_SEC,
+                 responses_dir=RESPONSES_DIR, prompts_dir=PROMPTS_DIR,
+                 config_path=CONFIG_PATH, seed=None, degraded_provider=None):
+        self.latency_spec = latency
+        self.sample_latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.degraded_provider = degraded_provider
+        self.tokens_per_sec = tokens_per_sec
+        self.by_request, self.pool = load_canned_responses(
+            responses_dir, prompts_dir, config_path
+        )
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def roll(self, body):
+        """Decide this request's fate: "429", "5xx" or "ok"."""
+        if self.degraded_provider:
+            routed = (body.get("provider") or {}).get("only") or []
+            if self.degraded_provider in routed:
+                return "5xx"
+        with self.lock:
+            r = self.rng.random()
+        if r < self.rate_429:
+            return "429"
+        if r < self.rate_429 + self.rate_5xx:
+            return "5xx"
+        return "ok"
+
+    def response_for(self, body):
+        messages = body.get("messages", [])
+        task = messages[-1].get("content", "") if messages else ""
+        text = self.by_request.get((body.get("model"), task))
+        if text is None:
+            self.count("unmatched")
+            with self.lock:
+                text = self.rng.choice(self.pool)
+        return text
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options = None  # set per server in make_server()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        opts = self.options
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"code": 400, "message": "invalid JSON"}})
+            return
+
+        opts.count("requests")
+        fate = opts.roll(body)
+        if fate == "429":
+            opts.count("429")
+            self._send_json(
+                429,
+                {"error": {"code": 429, "message": "Rate limit exceeded (mock)"}},
+                headers={"Retry-After": f"{opts.retry_after:g}"},
+            )
+            return
+
+        time.sleep(max(0.0, opts.sample_latency()))
+
+        if fate == "5xx":
+            opts.count("5xx")
+            status = opts.rng.choice((500, 502, 503))
+            self._send_json(status, {"error": {"code": status, "message": "Upstream error (mock)"}})
+            return
+
+        text = opts.response_for(body)
+        completion_tokens = max(1, len(text) // CHARS_PER_TOKEN)
+        usage = {
+            "prompt_tokens": sum(len(m.get("content", "")) for m in body.get("messages", []))
+            // CHARS_PER_TOKEN,
+            "completion_tokens": completion_tokens,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + completion_tokens
+
+        if not body.get("stream"):
+            opts.count("ok")
+            self._send_json(200, {
+                "id": "mock-completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        delay = 1.0 / opts.tokens_per_sec if opts.tokens_per_sec > 0 else 0.0
+        try:
+            self._write_chunk(b": OPENROUTER PROCESSING\n\n")
+            for i in range(0, len(text), CHARS_PER_TOKEN):
+                chunk = {"choices": [{"index": 0, "delta": {"content": text[i:i + CHARS_PER_TOKEN]}}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                if delay:
+                    time.sleep(delay)
+            final = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+            self._write_chunk(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading early (collect.py --stop-at-fence)
+            opts.count("stream_aborted")
+            self.close_connection = True
+            return
+        opts.count("ok")
+
+
+def make_server(options, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Create a ThreadingHTTPServer bound to (host, port); port 0 picks one."""
+    handler = type("BoundMockHandler", (MockHandler,), {"options": options})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(options, host=DEFAULT_HOST, port=0):
+    """Start a server on a background thread; returns (server, url)."""
+    server = make_server(options, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/api/v1/chat/completions"
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve canned chat completions as a local OpenRouter stand-in."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Bind address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--latency",
+        default=DEFAULT_LATENCY,
+        help=f"Latency distribution spec (default: {DEFAULT_LATENCY})",
+    )
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered 5xx")
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s (default: 1)"
+    )
+    parser.add_argument(
+        "--tokens-per-sec",
+        type=float,
+        default=DEFAULT_TOKENS_PER_SEC,
+        help=f"Streaming speed (default: {DEFAULT_TOKENS_PER_SEC:g})",
+    )
+    parser.add_argument(
+        "--responses-dir",
+        type=Path,
+        default=RESPONSES_DIR,
+        help=f"Directory of stored responses (default: {RESPONSES_DIR})",
+    )
+    parser.add_argument(
+        "--degraded-provider",
+        default=None,
+        help="Fail every request routed to this OpenRouter provider with 5xx",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for failure injection")
+    args = parser.parse_args()
+
+    try:
+        options = MockOptions(
+            latency=args.latency,
+            rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx,
+            retry_after=args.retry_after,
+            tokens_per_sec=args.tokens_per_sec,
+            responses_dir=args.responses_dir,
+            seed=args.seed,
+            degraded_provider=args.degraded_provider,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = make_server(options, args.host, args.port)
+    print("Mock OpenRouter Server")
+    print("=" * 50)
+    print(f"Canned responses: {len(options.pool)} ({len(options.by_request)} matched to requests)")
+    print(f"Latency:  {args.latency}")
+    print(f"Failures: 429 {args.rate_429:.0%} | 5xx {args.rate_5xx:.0%}")
+    if args.degraded_provider:
+        print(f"Degraded: {args.degraded_provider} (always 5xx)")
+    print(f"Endpoint: http://{args.host}:{args.port}/api/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nServed: {dict(options.stats)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
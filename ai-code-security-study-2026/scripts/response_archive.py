@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Packed Response Archive
+AI-Generated Code Security Study 2026
+
+An optional replacement for the thousands of small output/**/*.response.md
+files: one append-only container of individually compressed responses plus
+a JSONL offset index keyed by (model, prompt_id, sample). Sample 0 is the
+single temperature-0 sample; 1..N are collect.py --samples samples.
+
+    output/responses.pack        compressed records, back to back
+    output/responses.pack.idx    one JSON line per record: key, language,
+                                 owasp, offset, length, size, sha256, codec
+
+Records are compressed one by one, so any response can be read with a
+single seek. Re-archiving a key appends a new record and the last index
+line wins; compact() rewrites the pack without superseded records.
+Records are compressed with zstd when the zstandard package is installed,
+otherwise with headerless LZMA2 from the standard library; responses too
+small to benefit are stored raw. The codec is stored per record.
+
+Only the code files stay loose, since those are what the scanners read.
+
+Usage:
+    python3 response_archive.py pack            # Archive output/**/*.response.md
+    python3 response_archive.py pack --delete   # ...and remove the loose files
+    python3 response_archive.py unpack          # Write .response.md files back out
+    python3 response_archive.py ls --model gpt-5.2
+    python3 response_archive.py cat gpt-5.2 a03-py-01
+    python3 response_archive.py compact
+"""
+
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional; lzma is always available
+    zstandard = None
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = SCRIPT_DIR / "output"
+ARCHIVE_PATH = OUTPUT_DIR / "responses.pack"
+
+# Raw LZMA2 stream: skips the ~60 byte .xz container per record
+LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6}]
+ZSTD_LEVEL = 19
+
+# {prompt_id}.response.md or {prompt_id}.s{k}.response.md
+RESPONSE_NAME_RE = re.compile(r"^(?P<prompt>.+?)(?:\.s(?P<sample>\d+))?\.response\.md$")
+
+
+# ---------------------------------------------------------------------------
+# Codecs
+# ---------------------------------------------------------------------------
+
+
+def compress(data):
+    """Compress bytes with the best available codec. Returns (codec, blob)."""
+    if zstandard is not None:
+        codec, blob = "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        codec, blob = "lzma2", lzma.compress(data, format=lzma.FORMAT_RAW, filters=LZMA_FILTERS)
+    if len(blob) >= len(data):
+        return "raw", data
+    return codec, blob
+
+
+def decompress(codec, blob):
+    if codec == "raw":
+        return blob
+    if codec == "lzma2":
+        return lzma.decompress(blob, format=lzma.FORMAT_RAW, filters=LZMA_FILTERS)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("record is zstd-compressed; install the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    raise RuntimeError(f"unknown codec: {codec}")
+
+
+def parse_response_name(name):
+    """Split a .response.md file name into (prompt_id, sample), or None."""
+    m = RESPONSE_NAME_RE.match(name)
+    if not m:
+        return None
+    return m.group("prompt"), int(m.group("sample") or 0)
+
+
+# ---------------------------------------------------------------------------
+# Archive
+# ---------------------------------------------------------------------------
+
+
+class ResponseArchive:
+    """
+    Append-only compressed response store with an in-memory offset index.
+
+    Thread-safe for one writing process. Index entries whose record is not
+    fully present in the pack (a crash between the two writes, or a
+    truncated pack) are ignored on load, and dropped from the index before
+    the next append so that new records never land under them. Reads check
+    each record's size and sha256.
+    """
+
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.entries = {}  # (model, prompt_id, sample) -> index entry
+        self._dirty_index = False  # index has lines for records not in the pack
+        self._lock = threading.Lock()
+        if self.index_path.exists():
+            self._load()
+
+    def _load(self):
+        size = self.path.stat().st_size if self.path.exists() else 0
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key = (entry["model"], entry["prompt_id"], entry["sample"])
+                    complete = entry["offset"] + entry["length"] <= size
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    complete = False
+                if complete:
+                    self.entries[key] = entry
+                else:
+                    self._dirty_index = True
+
+    def _write_index(self, entries):
+        tmp_index = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            for key in sorted(entries):
+                f.write(json.dumps(entries[key], ensure_ascii=False) + "\n")
+        os.replace(tmp_index, self.index_path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def put(self, model_id, prompt_id, sample, text, language=None, owasp=None):
+        """Append one response. Returns its index entry."""
+        data = text.encode("utf-8")
+        codec, blob = compress(data)
+        with self._lock:
+            if self._dirty_index:
+                # Drop entries past the end of the pack before it grows under them
+                self._write_index(self.entries)
+                self._dirty_index = False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            entry = {
+                "model": model_id,
+                "prompt_id": prompt_id,
+                "sample": sample,
+                "language": language,
+                "owasp": owasp,
+                "offset": offset,
+                "length": len(blob),
+                "size": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "codec": codec,
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.entries[(model_id, prompt_id, sample)] = entry
+            return entry
+
+    def _read(self, f, entry):
+        f.seek(entry["offset"])
+        data = decompress(entry["codec"], f.read(entry["length"]))
+        if len(data) != entry["size"] or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise RuntimeError(
+                f"corrupt record for {entry['model']} {entry['prompt_id']} s{entry['sample']}"
+                f" at offset {entry['offset']} in {self.path}"
+            )
+        return data.decode("utf-8")
+
+    def get(self, model_id, prompt_id, sample=0):
+        """Return the response text for a key, or None if not archived."""
+        entry = self.entries.get((model_id, prompt_id, sample))
+        if entry is None:
+            return None
+        with open(self.path, "rb") as f:
+            return self._read(f, entry)
+
+    def keys(self, model_filter=None):
+        return sorted(k for k in self.entries if not model_filter or k[0] == model_filter)
+
+    def iter_entries(self, model_filter=None):
+        """Yield (entry, text) in pack order, reading the pack sequentially."""
+        entries = sorted(
+            (e for e in self.entries.values() if not model_filter or e["model"] == model_filter),
+            key=lambda e: e["offset"],
+        )
+        if not entries:
+            return
+        with open(self.path, "rb") as f:
+            for entry in entries:
+                yield entry, self._read(f, entry)
+
+    def stats(self):
+        pack_bytes = self.path.stat().st_size if self.path.exists() else 0
+        live = sum(e["length"] for e in self.entries.values())
+        raw = sum(e["size"] for e in self.entries.values())
+        return {
+            "records": len(self.entries),
+            "raw_bytes": raw,
+            "pack_bytes": pack_bytes,
+            "stale_bytes": pack_bytes - live,
+        }
+
+    def compact(self):
+        """Rewrite pack and index with only the live record for each key."""
+        with self._lock:
+            tmp_pack = self.path.with_name(self.path.name + ".tmp")
+            entries = {}
+            with open(self.path, "rb") as src, open(tmp_pack, "wb") as dst:
+                for key in sorted(self.entries):
+                    entry = dict(self.entries[key])
+                    src.seek(entry["offset"])
+                    blob = src.read(entry["length"])
+                    entry["offset"] = dst.tell()
+                    dst.write(blob)
+                    entries[key] = entry
+            os.replace(tmp_pack, self.path)
+            self._write_index(entries)
+            self._dirty_index = False
+            self.entries = entries
+
+
+def response_path_for(output_dir, entry):
+    """Loose .response.md path an archive entry corresponds to."""
+    stem = entry["prompt_id"] if not entry["sample"] else f"{entry['prompt_id']}.s{entry['sample']}"
+    return (
+        Path(output_dir) / entry["model"] / entry["language"] / entry["owasp"]
+        / f"{stem}.response.md"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+
+def cmd_pack(archive, args):
+    added = skipped = deleted = 0
+    for path in sorted(args.output_dir.glob("*/*/*/*.response.md")):
+        model_id, language, owasp = path.relative_to(args.output_dir).parts[:3]
+        if model_id.startswith(".") or (args.model and model_id != args.model):
+            continue
+        parsed = parse_response_name(path.name)
+        if parsed is None:
+            continue
+        prompt_id, sample = parsed
+        text = path.read_text(encoding="utf-8")
+        entry = archive.entries.get((model_id, prompt_id, sample))
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if entry and entry["sha256"] == digest:
+            skipped += 1
+        else:
+            archive.put(model_id, prompt_id, sample, text, language=language, owasp=owasp)
+            added += 1
+        if args.delete and archive.get(model_id, prompt_id, sample) == text:
+            path.unlink()
+            deleted += 1
+    print(f"Packed: {added} added, {skipped} already archived, {deleted} loose files removed")
+
+
+def cmd_unpack(archive, args):
+    written = 0
+    for entry, text in archive.iter_entries(model_filter=args.model):
+        path = response_path_for(args.output_dir, entry)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        written += 1
+    print(f"Unpacked: {written} responses into {args.output_dir}")
+
+
+def cmd_ls(archive, args):
+    for key in archive.keys(model_filter=args.model):
+        e = archive.entries[key]
+        print(
+            f"{e['model']:20s} {e['prompt_id']:12s} s{e['sample']:<3} "
+            f"{e['size']:>8} -> {e['length']:>7} {e['codec']}"
+        )
+
+
+def cmd_cat(archive, args):
+    text = archive.get(args.model_id, args.prompt_id, args.sample)
+    if text is None:
+        print(f"Not archived: {args.model_id} {args.prompt_id} s{args.sample}", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(text)
+
+
+def cmd_compact(archive, args):
+    before = archive.stats()
+    archive.compact()
+    after = archive.stats()
+    print(f"Compacted: {before['pack_bytes']} -> {after['pack_bytes']} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pack, inspect and unpack the compressed LLM response archive."
+    )
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        default=ARCHIVE_PATH,
+        help=f"Archive path (default: {ARCHIVE_PATH})",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=OUTPUT_DIR,
+        help=f"Output directory with loose responses (default: {OUTPUT_DIR})",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pack", help="Archive loose .response.md files")
+    p.add_argument("--model", default=None, help="Only this model ID")
+    p.add_argument("--delete", action="store_true", help="Remove loose files once archived")
+    p = sub.add_parser("unpack", help="Write archived responses back as .response.md files")
+    p.add_argument("--model", default=None, help="Only this model ID")
+    p = sub.add_parser("ls", help="List archived responses")
+    p.add_argument("--model", default=None, help="Only this model ID")
+    p = sub.add_parser("cat", help="Print one archived response")
+    p.add_argument("model_id")
+    p.add_argument("prompt_id")
+    p.add_argument("sample", nargs="?", type=int, default=0)
+    sub.add_parser("compact", help="Drop superseded records")
+    args = parser.parse_args()
+
+    archive = ResponseArchive(args.archive)
+    {
+        "pack": cmd_pack,
+        "unpack": cmd_unpack,
+        "ls": cmd_ls,
+        "cat": cmd_cat,
+        "compact": cmd_compact,
+    }[args.command](archive, args)
+
+    if args.command in ("pack", "compact"):
+        s = archive.stats()
+        print(
+            f"Archive: {s['records']} records | {s['raw_bytes']} raw bytes -> "
+            f"{s['pack_bytes']} packed ({s['stale_bytes']} stale)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Prompt and Sample Catalog
+AI-Generated Code Security Study 2026
+
+One precomputed index of every prompt and every (model, prompt) code sample,
+shared by collect.py, scan.py and aggregate.py so none of them has to
+re-parse prompts/ or walk output/:
+
+    prompts   the prompt items collect.py sends (owasp_id, language, prompt)
+    samples   {model: {prompt_id: row}}, each row holding prompt_id, owasp,
+              language, expected_cwes, path (relative to output/), sha256 of
+              the code file, size, mtime_ns and status (collected, error,
+              missing)
+
+The catalog is a single JSON file (output/catalog.json), so loading it is
+one file read. It records what it was built from: the prompt files' sizes
+and mtimes, the collection manifest's, the model list, and (in the sample
+rows) every code file's. load() stats those and rebuilds only when one
+changed, e.g. after collect.py --reextract or a manual edit; a rebuild
+re-hashes only code files whose size or mtime changed. Commands that only
+preview (collect.py --dry-run/--report, scan.py --dry-run) keep a rebuilt
+catalog in memory instead of writing it.
+
+collect.py, scan.py and aggregate.py all use PROMPTS_DIR and OUTPUT_DIR
+from here, so they share one catalog.
+
+Usage:
+    python3 sample_catalog.py                 # Build or refresh, print a summary
+    python3 sample_catalog.py --rebuild       # Re-hash every code file
+    python3 sample_catalog.py --model gpt-5.2 --status missing
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STUDY_DIR = SCRIPT_DIR.parent
+CONFIG_PATH = SCRIPT_DIR / "config.json"
+PROMPTS_DIR = STUDY_DIR / "prompts"
+OUTPUT_DIR = SCRIPT_DIR / "output"
+CATALOG_NAME = "catalog.json"
+MANIFEST_NAME = "collection-manifest.jsonl"
+
+CATALOG_VERSION = 1
+
+# Languages collected, in collection order, and their code file extensions
+EXTENSIONS = {"python": ".py", "javascript": ".js"}
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+
+def file_stamp(path):
+    """(size, mtime_ns) of a file, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def prompt_sources(prompts_dir):
+    """Stamps of every prompts/{language}/*.json file, keyed by relative path."""
+    sources = {}
+    for lang in EXTENSIONS:
+        lang_dir = prompts_dir / lang
+        if not lang_dir.is_dir():
+            continue
+        for json_path in sorted(lang_dir.glob("*.json")):
+            sources[f"{lang}/{json_path.name}"] = file_stamp(json_path)
+    return sources
+
+
+def parse_prompts(prompts_dir):
+    """Parse prompt files into collect.py prompt items, in collection order."""
+    items = []
+    for lang in EXTENSIONS:
+        lang_dir = prompts_dir / lang
+        if not lang_dir.is_dir():
+            continue
+        for json_path in sorted(lang_dir.glob("*.json")):
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for prompt in data["prompts"]:
+                items.append(
+                    {
+                        "owasp_id": data["owasp_id"],
+                        "language": data["language"],
+                        "prompt": prompt,
+                    }
+                )
+    return items
+
+
+def read_manifest_status(manifest_path):
+    """(model, prompt_id) -> status from the collection manifest (last line wins)."""
+    status = {}
+    if not manifest_path.exists():
+        return status
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+                status[(rec["model"], rec["prompt_id"])] = rec.get("status")
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    return status
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------------------------
+
+
+class SampleCatalog:
+    """
+    In-memory view of output/catalog.json.
+
+    samples[model][prompt_id] is a row dict; by_path maps a code path
+    relative to its model directory ("python/A03/a03-py-01.py") to the
+    row of the first model that has it, for language/OWASP lookups.
+    """
+
+    def __init__(self, data, path=None):
+        self.data = data
+        self.path = path
+        self.prompts = data["prompts"]
+        self.samples = data["samples"]
+        self.by_path = {}
+        for rows in self.samples.values():
+            for row in rows.values():
+                rel = row["path"].split("/", 1)[1]
+                self.by_path.setdefault(rel, row)
+
+    @classmethod
+    def read(cls, path):
+        """Read a catalog file as-is, without checking freshness. None if missing."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get("version") != CATALOG_VERSION:
+            return None
+        return cls(data, path)
+
+    @classmethod
+    def load(cls, prompts_dir, output_dir, models, rebuild=False, save=True):
+        """
+        Return an up-to-date catalog for these prompts, outputs and models,
+        rebuilding output_dir/catalog.json only if its sources changed. With
+        save=False a rebuilt catalog is not written back.
+        """
+        path = output_dir / CATALOG_NAME
+        sources = {
+            "prompts_dir": str(prompts_dir),
+            "prompts": prompt_sources(prompts_dir),
+            "manifest": file_stamp(output_dir / MANIFEST_NAME),
+            "models": list(models),
+        }
+        previous = cls.read(path)
+        if (previous is not None and not rebuild and previous.data["sources"] == sources
+                and not previous.code_changed(output_dir)):
+            return previous
+
+        catalog = cls.build(prompts_dir, output_dir, sources, None if rebuild else previous)
+        if save and output_dir.is_dir():
+            catalog.save()
+        return catalog
+
+    @classmethod
+    def build(cls, prompts_dir, output_dir, sources, previous=None):
+        """Build a catalog, reusing hashes from `previous` for unchanged files."""
+        if previous is not None and previous.data["sources"]["prompts"] == sources["prompts"] \
+                and previous.data["sources"]["prompts_dir"] == sources["prompts_dir"]:
+            prompts = previous.prompts
+        else:
+            prompts = parse_prompts(prompts_dir)
+        status = read_manifest_status(output_dir / MANIFEST_NAME)
+        old_samples = previous.samples if previous is not None else {}
+
+        samples = {}
+        for model_id in sources["models"]:
+            rows = samples[model_id] = {}
+            old_rows = old_samples.get(model_id, {})
+            for item in prompts:
+                prompt = item["prompt"]
+                rel = (
+                    f"{model_id}/{item['language']}/{item['owasp_id']}/"
+                    f"{prompt['id']}{EXTENSIONS[item['language']]}"
+                )
+                stamp = file_stamp(output_dir / rel)
+                old = old_rows.get(prompt["id"])
+                if stamp is None:
+                    digest = None
+                elif old and old["path"] == rel and [old["size"], old["mtime_ns"]] == stamp:
+                    digest = old["sha256"]
+                else:
+                    digest = sha256_file(output_dir / rel)
+                rows[prompt["id"]] = {
+                    "prompt_id": prompt["id"],
+                    "owasp": item["owasp_id"],
+                    "language": item["language"],
+                    "expected_cwes": prompt.get("expected_vulns", []),
+                    "path": rel,
+                    "sha256": digest,
+                    "size": stamp[0] if stamp else None,
+                    "mtime_ns": stamp[1] if stamp else None,
+                    # The file decides; the manifest only refines a present one
+                    "status": "missing" if stamp is None
+                    else status.get((model_id, prompt["id"])) or "collected",
+                }
+
+        data = {
+            "version": CATALOG_VERSION,
+            "sources": sources,
+            "prompts": prompts,
+            "samples": samples,
+        }
+        return cls(data, output_dir / CATALOG_NAME)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def code_changed(self, output_dir):
+        """True if any code file was added, removed or modified since the build."""
+        for rows in self.samples.values():
+            for row in rows.values():
+                stamp = [row["size"], row["mtime_ns"]] if row["sha256"] is not None else None
+                if file_stamp(Path(output_dir) / row["path"]) != stamp:
+                    return True
+        return False
+
+    # -- queries ------------------------------------------------------------
+
+    def prompt_counts(self):
+        """(total_prompts, {language: prompts}) with languages sorted."""
+        by_language = Counter(item["language"] for item in self.prompts)
+        return len(self.prompts), dict(sorted(by_language.items()))
+
+    def rows(self, model_filter=None, status=None):
+        for model_id, rows in self.samples.items():
+            if model_filter and model_id != model_filter:
+                continue
+            for row in rows.values():
+                if status is None or row["status"] == status:
+                    yield model_id, row
+
+    def lookup(self, relpath):
+        """Row for a code path relative to a model directory, or None."""
+        return self.by_path.get(Path(relpath).as_posix())
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or refresh the prompt/sample catalog and print a summary."
+    )
+    parser.add_argument("--model", default=None, help="Only list this model ID")
+    parser.add_argument("--status", default=None, help="List samples with this status (e.g. missing)")
+    parser.add_argument("--rebuild", action="store_true", help="Re-hash every code file")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=OUTPUT_DIR,
+        help=f"Output directory (default: {OUTPUT_DIR})",
+    )
+    parser.add_argument(
+        "--prompts-dir",
+        type=Path,
+        default=PROMPTS_DIR,
+        help=f"Prompts directory (default: {PROMPTS_DIR})",
+    )
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        models = [m["id"] for m in json.load(f)["models"]]
+
+    catalog = SampleCatalog.load(args.prompts_dir, args.output_dir, models, rebuild=args.rebuild)
+    total, by_language = catalog.prompt_counts()
+    print(f"Catalog: {catalog.path}")
+    print(f"Prompts: {total} ({', '.join(f'{k}: {v}' for k, v in by_language.items())})")
+    for model_id in catalog.samples:
+        counts = Counter(row["status"] for _, row in catalog.rows(model_filter=model_id))
+        print(f"  {model_id:20s} " + " | ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
+
+    if args.status:
+        for model_id, row in catalog.rows(model_filter=args.model, status=args.status):
+            print(f"{model_id}\t{row['prompt_id']}\t{row['path']}")
+    if not total:
+        print(f"No prompts found in {args.prompts_dir}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,20 +18,29 @@ Usage:
     python3 scan.py --tool bandit      # Run only Bandit
     python3 scan.py --model gpt-5.2    # Scan only one model
     python3 scan.py --dry-run          # Preview without running
+    python3 scan.py --merge-pipeline   # Merge leftover pipelined results
+
+collect.py --pipeline-scan runs these same tool runners on samples as they
+are written (see PipelineScanner below).
 """
 
 import argparse
 import json
 import logging
 import os
+import queue
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from collections import Counter, defaultdict
 from pathlib import Path
 
+import sample_catalog
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -43,6 +52,17 @@ SCANS_DIR = SCRIPT_DIR / "scans"
 RULES_DIR = SCRIPT_DIR / "rules" / "opengrep"
 LOG_PATH = SCANS_DIR / "scan.log"
 
+# Per-file findings from pipelined scans, merged into scans/{model}/{tool}.json
+# (dot-dir: skipped by validate.py)
+PIPELINE_DIR = SCANS_DIR / ".pipeline"
+
+# Prompt/sample catalog shared with collect.py (see sample_catalog.py); loaded,
+# and refreshed if stale, in main() and used for language/OWASP lookups
+# before path parsing
+CATALOG = None
+PIPELINE_BATCH_SIZE = 32    # max files handed to one tool invocation
+PIPELINE_BATCH_WAIT = 2.0   # seconds to wait for a batch to fill up
+
 # Tool binary paths — resolve via PATH, allow env var override
 TOOL_PATHS = {
     "bandit": os.environ.get("BANDIT_PATH", shutil.which("bandit") or "bandit"),
@@ -144,7 +164,8 @@ def extract_owasp_from_path(filepath, model_output_dir):
 
     Expected structure: output/{model_id}/{language}/{owasp_id}/{file}
     The filepath may be absolute or already relative (e.g. SARIF URIs).
-    Returns the owasp_id component (e.g. "A03") or "unknown".
+    Uses the catalog entry for the file if there is one. Returns the
+    owasp_id component (e.g. "A03") or "unknown".
     """
     p = Path(filepath)
 
@@ -155,6 +176,10 @@ def extract_owasp_from_path(filepath, model_output_dir):
         # Already relative or under a different root — use as-is
         rel = p
 
+    row = CATALOG.lookup(rel) if CATALOG else None
+    if row:
+        return row["owasp"]
+
     parts = rel.parts
     # parts[0] = language, parts[1] = owasp_id, parts[2] = filename
     if len(parts) >= 3:
@@ -168,7 +193,8 @@ def extract_language_from_path(filepath, model_output_dir):
     """
     Extract language from file path structure or extension.
 
-    First tries the directory structure: output/{model_id}/{language}/...
+    Uses the catalog entry for the file if there is one, then the directory
+    structure: output/{model_id}/{language}/...
     The filepath may be absolute or already relative (e.g. SARIF URIs).
     Falls back to file extension.
     """
@@ -178,6 +204,10 @@ def extract_language_from_path(filepath, model_output_dir):
     except ValueError:
         rel = p
 
+    row = CATALOG.lookup(rel) if CATALOG else None
+    if row:
+        return row["language"]
+
     parts = rel.parts
     if len(parts) >= 1 and parts[0] in ("python", "javascript"):
         return parts[0]
@@ -784,6 +814,197 @@ TOOL_OUTPUT_NAMES = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Pipelined scanning
+# ---------------------------------------------------------------------------
+
+
+def available_tools(tools=None):
+    """Return the tools (default: ALL_TOOLS) whose binaries are installed."""
+    return [t for t in (tools or ALL_TOOLS) if tool_available(TOOL_BINARY_CHECK[t])]
+
+
+class PipelineScanner:
+    """
+    Scan code files as they are written, while collection is still running.
+
+    submit() queues one code file under output_dir/{model}/{language}/{owasp}/.
+    Worker threads take up to batch_size queued files at a time, copy them
+    into a temporary tree with the same layout and run the usual tool
+    runners on it, so findings go through the same normalizers and get the
+    same relative paths as a full scan. Findings are appended per file to
+    scans/.pipeline/{model}/{tool}.jsonl; close() waits for the queue to
+    drain, and merge_pipeline_results() then folds them into
+    scans/{model}/{tool}.json.
+    """
+
+    def __init__(self, tools, logger, workers=2, output_dir=OUTPUT_DIR,
+                 batch_size=PIPELINE_BATCH_SIZE, batch_wait=PIPELINE_BATCH_WAIT):
+        self.tools = tools
+        self.logger = logger
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.stats = Counter()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"scan-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, model_id, code_path):
+        self._queue.put((model_id, Path(code_path)))
+
+    def close(self):
+        """Stop accepting work and wait for every queued file to be scanned."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                # Leave the stop signal for this worker's next get()
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            by_model = defaultdict(list)
+            for model_id, code_path in batch:
+                by_model[model_id].append(code_path)
+            for model_id, code_paths in by_model.items():
+                try:
+                    self._scan(model_id, code_paths)
+                except Exception as e:
+                    self.logger.error(f"[{model_id}] [pipeline] ERROR: {e}")
+                    with self._lock:
+                        self.stats["errors"] += 1
+
+    def _scan(self, model_id, code_paths):
+        model_output_dir = self.output_dir / model_id
+        tmpdir = tempfile.mkdtemp(prefix="pipeline_scan_")
+        try:
+            staged_dir = Path(tmpdir) / model_id
+            rel_paths = []
+            for code_path in code_paths:
+                rel = code_path.relative_to(model_output_dir)
+                (staged_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(code_path, staged_dir / rel)
+                rel_paths.append(str(rel))
+
+            start_time = time.time()
+            spooled = {}
+            for tool in self.tools:
+                by_file = defaultdict(list)
+                for finding in TOOL_RUNNERS[tool](model_id, staged_dir, self.logger):
+                    by_file[finding["file"]].append(finding)
+                # One record per scanned file, including clean ones, so a
+                # merge drops stale findings for re-collected samples
+                spooled[tool] = [
+                    {"file": rel, "findings": by_file.get(rel, [])} for rel in rel_paths
+                ]
+            elapsed = time.time() - start_time
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        findings = 0
+        with self._lock:
+            for tool, records in spooled.items():
+                spool_path = PIPELINE_DIR / model_id / f"{tool}.jsonl"
+                spool_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(spool_path, "a", encoding="utf-8") as f:
+                    for rec in records:
+                        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                        findings += len(rec["findings"])
+            self.stats["files"] += len(code_paths)
+            self.stats["batches"] += 1
+            self.stats["findings"] += findings
+            self.stats["scan_seconds"] += elapsed
+        self.logger.info(
+            f"[{model_id}] [pipeline] scanned {len(code_paths)} files "
+            f"({findings} findings, {elapsed:.1f}s)"
+        )
+
+    def summary(self):
+        return (
+            f"{self.stats['files']} files in {self.stats['batches']} batches, "
+            f"{self.stats['findings']} findings, {self.stats['scan_seconds']:.1f}s tool time"
+            + (f", {self.stats['errors']} errors" if self.stats["errors"] else "")
+        )
+
+
+def merge_pipeline_results(logger, model_filter=None):
+    """
+    Fold scans/.pipeline/{model}/{tool}.jsonl into scans/{model}/{tool}.json.
+
+    For every file a spool mentions, its latest spooled findings replace
+    whatever the tool's JSON had for that file; other files keep their
+    findings. Spools are removed once merged. Returns the number of tool
+    results written.
+    """
+    merged = 0
+    if not PIPELINE_DIR.is_dir():
+        return merged
+    for model_dir in sorted(PIPELINE_DIR.iterdir()):
+        model_id = model_dir.name
+        if not model_dir.is_dir() or (model_filter and model_id != model_filter):
+            continue
+        for spool_path in sorted(model_dir.glob("*.jsonl")):
+            tool = spool_path.stem
+            scanned = {}
+            with open(spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    scanned[rec["file"]] = rec["findings"]
+
+            output_path = SCANS_DIR / model_id / TOOL_OUTPUT_NAMES[tool]
+            findings = []
+            if output_path.exists():
+                with open(output_path, "r", encoding="utf-8") as f:
+                    findings = [
+                        fd for fd in json.load(f).get("findings", [])
+                        if fd.get("file") not in scanned
+                    ]
+            for file_findings in scanned.values():
+                findings.extend(file_findings)
+            findings.sort(key=lambda fd: (fd.get("file", ""), fd.get("line", 0), fd.get("rule_id", "")))
+
+            save_results(tool, model_id, findings, output_path)
+            spool_path.unlink()
+            merged += 1
+            logger.info(
+                f"[{model_id}] [{tool}] merged {len(scanned)} pipelined files "
+                f"({len(findings)} findings total)"
+            )
+        if not any(model_dir.iterdir()):
+            model_dir.rmdir()
+    if not any(PIPELINE_DIR.iterdir()):
+        PIPELINE_DIR.rmdir()
+    return merged
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -811,13 +1032,30 @@ def main():
         action="store_true",
         help="Preview what would be scanned without running tools",
     )
+    parser.add_argument(
+        "--merge-pipeline",
+        action="store_true",
+        help=f"Only merge pipelined results from {PIPELINE_DIR} into the tool JSON files",
+    )
     args = parser.parse_args()
 
+    global CATALOG
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config_models = [m["id"] for m in json.load(f)["models"]]
+    CATALOG = sample_catalog.SampleCatalog.load(
+        sample_catalog.PROMPTS_DIR, OUTPUT_DIR, config_models, save=not args.dry_run,
+    )
+
     logger = setup_logging()
     logger.info("=" * 60)
     logger.info("AI Code Security Study 2026 - SAST Scanning")
     logger.info("=" * 60)
 
+    if args.merge_pipeline:
+        merged = merge_pipeline_results(logger, model_filter=args.model)
+        logger.info(f"Merged: {merged} tool results | Results: {SCANS_DIR}")
+        return
+
     # Discover models
     model_ids = discover_models()
     if not model_ids:
@@ -841,20 +1079,17 @@ def main():
         tools = [args.tool]
 
     # Check tool availability
-    available_tools = []
+    available = available_tools(tools)
     for tool in tools:
-        check_binary = TOOL_BINARY_CHECK[tool]
-        if tool_available(check_binary):
-            available_tools.append(tool)
-        else:
-            logger.warning(f"[SKIP] {tool}: binary '{check_binary}' not found")
+        if tool not in available:
+            logger.warning(f"[SKIP] {tool}: binary '{TOOL_BINARY_CHECK[tool]}' not found")
 
-    if not available_tools:
+    if not available:
         logger.error("No tools available. Install at least one SAST tool.")
         sys.exit(1)
 
     logger.info(f"Models:  {len(model_ids)} ({', '.join(model_ids)})")
-    logger.info(f"Tools:   {len(available_tools)} ({', '.join(available_tools)})")
+    logger.info(f"Tools:   {len(available)} ({', '.join(available)})")
     logger.info(f"Output:  {SCANS_DIR}")
 
     if args.dry_run:
@@ -862,13 +1097,14 @@ def main():
         logger.info("DRY RUN - no tools will be executed")
         logger.info("-" * 60)
         for model_id in model_ids:
+            # Count what the tools will scan, .s{k} sample files included
             model_dir = OUTPUT_DIR / model_id
             py_count = len(list(model_dir.rglob("*.py")))
             js_count = len(list(model_dir.rglob("*.js")))
             logger.info(
                 f"  {model_id}: {py_count} .py files, {js_count} .js files"
             )
-            for tool in available_tools:
+            for tool in available:
                 out_path = SCANS_DIR / model_id / TOOL_OUTPUT_NAMES[tool]
                 status = "EXISTS" if out_path.exists() else "would scan"
                 logger.info(f"    {tool}: {status} -> {out_path}")
@@ -887,7 +1123,7 @@ def main():
         model_dir = OUTPUT_DIR / model_id
         logger.info(f"--- {model_id} ---")
 
-        for tool in available_tools:
+        for tool in available:
             output_path = SCANS_DIR / model_id / TOOL_OUTPUT_NAMES[tool]
 
             logger.info(f"[{model_id}] [{tool}] scanning...")
@@ -4,19 +4,46 @@ Validation Template Generator
 AI-Generated Code Security Study 2026
 
 Reads all scan results from scans/, deduplicates findings (same file + same CWE
-from different tools = one row), and generates a validation CSV for manual review.
+from different tools = one row), optionally (--cluster) clusters what is left by
+line proximity (nearby findings from different tools with compatible CWEs = one
+row), and generates a validation CSV for manual review.
+
+Clustering is opt-in because it changes which rows exist: merging a CSV that
+was reviewed without it sends clusters whose members were labelled
+differently back to review.
+
+Finding IDs are derived from the finding's content, not its position, so they
+survive re-runs. With --merge, TP/FP labels from an existing CSV are carried
+over, new findings are left unreviewed and vanished findings are listed (and
+written to {output}.removed.csv) so only the delta needs re-triage.
+
+With --propagate, labelled findings are also indexed by (prompt ID, rule ID,
+CWE, hash of the normalized flagged code line), and unreviewed findings with
+the same key get the verdict and notes as a suggestion: validated is set to
+"auto:TP" or "auto:FP", which aggregate.py treats as unreviewed until the
+"auto:" prefix is removed.
 
 Usage:
     python3 analysis/validate.py                # Generate validation.csv
     python3 analysis/validate.py --output out.csv   # Custom output path
     python3 analysis/validate.py --model gpt-5.2    # Only one model
+    python3 analysis/validate.py --jobs 8           # Read scan files in 8 processes
+    python3 analysis/validate.py --cluster          # Also cluster findings up to 3 lines apart
+    python3 analysis/validate.py --cluster --line-window 5  # ...or up to 5 lines apart
+    python3 analysis/validate.py --merge            # Keep labels from the existing output CSV
+    python3 analysis/validate.py --merge old.csv    # ...or from another CSV
+    python3 analysis/validate.py --merge --propagate  # ...and suggest labels for new findings
 """
 
 import argparse
 import csv
+import hashlib
 import json
+import os
+import re
 import sys
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -26,6 +53,7 @@ from pathlib import Path
 SCRIPT_DIR = Path(__file__).resolve().parent
 STUDY_DIR = SCRIPT_DIR.parent
 SCANS_DIR = STUDY_DIR / "scans"
+CODE_DIR = STUDY_DIR / "output"
 DEFAULT_OUTPUT = SCRIPT_DIR / "validation.csv"
 
 # Severity ranking for "take highest" logic
@@ -48,25 +76,151 @@ CSV_COLUMNS = [
     "tools",
     "validated",
     "notes",
+    "rule_id",
 ]
 
 
+# Load scan files in worker processes once there are at least this many
+PARALLEL_MIN_FILES = 16
+
+# Hex digits of the content hash in a finding ID (F + 8 hex = 32 bits)
+FINDING_ID_DIGITS = 8
+
+# Positional IDs written before stable IDs existed (F001, F002, ...)
+LEGACY_ID_RE = re.compile(r"^F\d+$")
+
+LABEL_COLUMNS = ("validated", "notes")
+
+# Findings from different tools at most this many lines apart are clustered
+DEFAULT_LINE_WINDOW = 3
+
+# CWEs that describe the same weakness for clustering purposes. Scanners
+# disagree on how specific to be (CWE-89 vs CWE-943, CWE-94 vs CWE-96).
+CWE_EQUIVALENCE_CLASSES = {
+    "injection-command": ["CWE-77", "CWE-78", "CWE-88"],
+    "injection-sql": ["CWE-89", "CWE-564", "CWE-943"],
+    "injection-code": ["CWE-94", "CWE-95", "CWE-96", "CWE-829"],
+    "xss": ["CWE-79", "CWE-80", "CWE-116"],
+    "path-traversal": ["CWE-22", "CWE-23", "CWE-35", "CWE-36", "CWE-73"],
+    "ssrf": ["CWE-918"],
+    "deserialization": ["CWE-502"],
+    "xxe": ["CWE-611", "CWE-776"],
+    "open-redirect": ["CWE-601"],
+    "csrf": ["CWE-352"],
+    "credentials": ["CWE-259", "CWE-321", "CWE-522", "CWE-798"],
+    "weak-crypto": ["CWE-310", "CWE-326", "CWE-327", "CWE-328", "CWE-916"],
+    "weak-random": ["CWE-330", "CWE-338"],
+    "debug": ["CWE-215", "CWE-489"],
+    "info-exposure": ["CWE-200", "CWE-209", "CWE-497", "CWE-532"],
+    "cookie": ["CWE-614", "CWE-1004", "CWE-1275"],
+    "regex-dos": ["CWE-185", "CWE-400", "CWE-730", "CWE-1333"],
+    "log-injection": ["CWE-117"],
+    "mass-assignment": ["CWE-915", "CWE-1321"],
+    "timing": ["CWE-208"],
+}
+
+# CWEs implied by rules whose scanners report no CWE (eslint-plugin-security,
+# some njsscan rules). Used only to pick an equivalence class.
+RULE_CWE = {
+    "security/detect-child-process": "CWE-78",
+    "security/detect-non-literal-fs-filename": "CWE-22",
+    "security/detect-non-literal-regexp": "CWE-1333",
+    "security/detect-non-literal-require": "CWE-829",
+    "security/detect-object-injection": "CWE-915",
+    "security/detect-possible-timing-attacks": "CWE-208",
+    "security/detect-unsafe-regex": "CWE-1333",
+    "cookie_session_no_samesite": "CWE-1275",
+    "cookie_session_no_secure": "CWE-614",
+}
+
+# CWE -> equivalence class, precomputed once
+CWE_CLASS = {
+    cwe: name for name, cwes in CWE_EQUIVALENCE_CLASSES.items() for cwe in cwes
+}
+
+CWE_RE = re.compile(r"^CWE-0*(\d+)$", re.IGNORECASE)
+
+# Verdict prefix for labels suggested by propagate_labels
+AUTO_PREFIX = "auto:"
+
+# Hex digits of the normalized code line hash in a propagation key
+SNIPPET_HASH_DIGITS = 16
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
 # ---------------------------------------------------------------------------
 # Core logic
 # ---------------------------------------------------------------------------
 
 
-def load_scan_results(scans_dir, model_filter=None):
+class Finding:
+    """
+    One raw finding, reduced to the fields deduplication needs.
+
+    Slots instead of a per-finding dict keep the memory cost of a raw
+    finding to a few pointers.
+    """
+
+    __slots__ = ("model", "tool", "file", "line", "cwe", "owasp", "severity", "rule_id")
+
+    def __init__(self, model, tool, file, line, cwe, owasp, severity, rule_id):
+        self.model = model
+        self.tool = tool
+        self.file = file
+        self.line = line
+        self.cwe = cwe
+        self.owasp = owasp
+        self.severity = severity
+        self.rule_id = rule_id
+
+    def __reduce__(self):
+        # Pickle as a plain tuple when sent back from a worker process
+        return (Finding, tuple(getattr(self, name) for name in self.__slots__))
+
+
+def load_scan_file(scan_file, model_id):
+    """
+    Read one scans/{model_id}/{tool}.json file.
+
+    Returns (findings, error) where findings is a list of Finding records
+    and error is None, or ([], message) if the file could not be read.
     """
-    Load all scan JSON files from scans/{model_id}/{tool}.json.
+    try:
+        with open(scan_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        return [], f"Could not read {scan_file}: {e}"
+
+    tool_name = data.get("tool", Path(scan_file).stem)
+    scan_model = data.get("model", model_id)
+    return [
+        Finding(
+            scan_model,
+            tool_name,
+            f.get("file", ""),
+            f.get("line", 0),
+            f.get("cwe", ""),
+            f.get("owasp", ""),
+            f.get("severity", "LOW"),
+            f.get("rule_id", ""),
+        )
+        for f in data.get("findings", [])
+    ], None
+
 
-    Returns a flat list of finding dicts, each with an added 'tool' field.
+def iter_scan_results(scans_dir, model_filter=None, jobs=None):
     """
-    all_findings = []
+    Yield every finding from scans/{model_id}/{tool}.json as a Finding.
 
+    Files are read in sorted order, and in worker processes once there are
+    PARALLEL_MIN_FILES or more of them (jobs=1 forces sequential reads).
+    Results are still yielded in file order, so output is deterministic.
+    """
     if not scans_dir.is_dir():
-        return all_findings
+        return
 
+    scan_files = []
     for model_dir in sorted(scans_dir.iterdir()):
         if not model_dir.is_dir() or model_dir.name.startswith("."):
             continue
@@ -77,23 +231,24 @@ def load_scan_results(scans_dir, model_filter=None):
             continue
 
         for scan_file in sorted(model_dir.glob("*.json")):
-            try:
-                with open(scan_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except (json.JSONDecodeError, OSError) as e:
-                print(f"  WARNING: Could not read {scan_file}: {e}", file=sys.stderr)
-                continue
-
-            tool_name = data.get("tool", scan_file.stem)
-            scan_model = data.get("model", model_id)
-
-            for finding in data.get("findings", []):
-                finding_copy = dict(finding)
-                finding_copy["_tool"] = tool_name
-                finding_copy["_model"] = scan_model
-                all_findings.append(finding_copy)
-
-    return all_findings
+            scan_files.append((str(scan_file), model_id))
+
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) if len(scan_files) >= PARALLEL_MIN_FILES else 1
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(load_scan_file, *zip(*scan_files))
+            for findings, error in results:
+                if error:
+                    print(f"  WARNING: {error}", file=sys.stderr)
+                yield from findings
+    else:
+        for scan_file, model_id in scan_files:
+            findings, error = load_scan_file(scan_file, model_id)
+            if error:
+                print(f"  WARNING: {error}", file=sys.stderr)
+            yield from findings
 
 
 def highest_severity(*severities):
@@ -108,64 +263,171 @@ def highest_severity(*severities):
     return best
 
 
-def deduplicate_findings(raw_findings):
+class DedupBuckets:
     """
-    Deduplicate findings: same model + same file + same CWE from different
-    tools collapses into one row with a combined tool list.
+    Incremental deduplication: same model + same file + same CWE from
+    different tools collapses into one row with a combined tool list.
 
-    The dedup key is (model, file, cwe). We keep the lowest line number,
-    the highest severity, and merge the OWASP field (take first non-empty).
-
-    Returns a list of deduped finding dicts.
+    The dedup key is (model, file, cwe). Each bucket keeps only running
+    aggregates, never the findings themselves: the tool set, the highest
+    severity, the lowest line number, the first non-empty OWASP field and
+    the first rule ID (used to classify findings without a CWE).
     """
-    # Group by (model, file, cwe)
-    groups = defaultdict(list)
-    for f in raw_findings:
-        cwe = f.get("cwe", "").strip()
+
+    def __init__(self):
+        self.buckets = {}  # key -> [tools, severity, rank, line, cwe, owasp, rule_id]
+
+    def add(self, f):
+        cwe = f.cwe.strip()
         if not cwe:
             # Findings without a CWE are not deduped against each other;
             # use tool+rule_id as additional key component so they stay separate
-            key = (f["_model"], f.get("file", ""), f"_nocwe_{f['_tool']}_{f.get('rule_id', '')}")
+            key = (f.model, f.file, f"_nocwe_{f.tool}_{f.rule_id}")
         else:
-            key = (f["_model"], f.get("file", ""), cwe)
-        groups[key].append(f)
+            key = (f.model, f.file, cwe)
 
-    deduped = []
-    for key, group in groups.items():
-        model = key[0]
-        file_path = key[1]
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            # CWE: use the key CWE or the first finding's
+            bucket = [set(), "LOW", 0, 0, cwe or f.cwe, "", f.rule_id]
+            self.buckets[key] = bucket
 
-        # Collect tools
-        tools = sorted(set(f["_tool"] for f in group))
+        bucket[0].add(f.tool)
 
         # Take highest severity
-        sev = highest_severity(*(f.get("severity", "LOW") for f in group))
+        rank = SEVERITY_RANK.get(f.severity.upper(), 0) if f.severity else 0
+        if rank > bucket[2]:
+            bucket[1] = f.severity.upper()
+            bucket[2] = rank
 
         # Take lowest line number (most relevant location)
-        lines = [f.get("line", 0) for f in group if f.get("line", 0) > 0]
-        line = min(lines) if lines else 0
-
-        # CWE: use the key CWE or first from group
-        cwe = key[2] if not key[2].startswith("_nocwe_") else group[0].get("cwe", "")
+        if f.line > 0 and (bucket[3] == 0 or f.line < bucket[3]):
+            bucket[3] = f.line
 
         # OWASP: take first non-empty
-        owasp = ""
-        for f in group:
-            if f.get("owasp", "") and f["owasp"] != "unknown":
-                owasp = f["owasp"]
-                break
+        if not bucket[5] and f.owasp and f.owasp != "unknown":
+            bucket[5] = f.owasp
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def rows(self):
+        """Return the deduped finding dicts, in first-seen order."""
+        return [
+            {
+                "model": key[0],
+                "file": key[1],
+                "line": line,
+                "cwe": cwe,
+                "owasp": owasp,
+                "severity": sev,
+                "tools": ", ".join(sorted(tools)),
+                "rule_id": rule_id,
+            }
+            for key, (tools, sev, _, line, cwe, owasp, rule_id) in self.buckets.items()
+        ]
+
+
+def deduplicate_findings(raw_findings):
+    """
+    Deduplicate an iterable of Finding records (see DedupBuckets).
+
+    Returns a list of deduped finding dicts.
+    """
+    buckets = DedupBuckets()
+    for f in raw_findings:
+        buckets.add(f)
+    return buckets.rows()
+
+
+def normalize_cwe(cwe):
+    """Canonical CWE spelling: "CWE-089" -> "CWE-89". Non-CWE text is kept."""
+    m = CWE_RE.match(cwe.strip())
+    return f"CWE-{int(m.group(1))}" if m else cwe.strip()
+
+
+def cwe_class(finding):
+    """
+    Equivalence class used to decide whether two findings may cluster.
+
+    CWEs outside CWE_EQUIVALENCE_CLASSES are a class of their own. Findings
+    without a CWE are classed by the CWE their rule implies (RULE_CWE), or
+    not at all (None), in which case they never cluster.
+    """
+    cwe = normalize_cwe(finding.get("cwe") or "")
+    if not cwe:
+        cwe = RULE_CWE.get(finding.get("rule_id", ""))
+        if not cwe:
+            return None
+    return CWE_CLASS.get(cwe, cwe)
+
+
+def cluster_findings(findings, window=DEFAULT_LINE_WINDOW):
+    """
+    Merge deduped findings that are within `window` lines of each other in
+    the same (model, file), come from different tools and have compatible
+    CWEs (same cwe_class).
+
+    Sort-and-sweep: findings are sorted by (model, file, line) once, then
+    swept in order while keeping, per CWE class, the clusters whose first
+    line is still within the window. Clusters don't chain: a finding joins
+    a cluster only if it is within `window` of the cluster's first line.
+    O(n log n) for the sort; the sweep is linear in practice, since only
+    clusters inside the window are ever compared.
+
+    A cluster keeps its lowest line, the union of tools, the highest
+    severity, the first CWE and OWASP category among its members (in line
+    order) and the first member's rule ID, plus "merged_ids" and
+    "merged_locations", the stable IDs and finding_location()s its members
+    had before clustering (so merge_labels can carry their labels over).
+    Findings without a line number or a CWE class are passed
+    through unchanged.
+    """
+    ordered = sorted(
+        findings, key=lambda f: (f.get("model", ""), f.get("file", ""), f.get("line", 0))
+    )
+    clusters = []
+    open_clusters = {}  # cwe class -> clusters still within the window
+    group = None
+
+    for f in ordered:
+        if (f["model"], f["file"]) != group:
+            group = (f["model"], f["file"])
+            open_clusters = {}
+
+        cls = cwe_class(f)
+        line = f.get("line", 0)
+        tools = set(f["tools"].split(", ")) if f["tools"] else set()
+        if cls is None or line <= 0:
+            clusters.append([dict(f), tools])
+            continue
+
+        candidates = [
+            c for c in open_clusters.get(cls, ()) if line - c[0]["line"] <= window
+        ]
+        open_clusters[cls] = candidates
+        target = next((c for c in candidates if not (c[1] & tools)), None)
+        if target is None:
+            target = [dict(f), tools]
+            clusters.append(target)
+            candidates.append(target)
+            continue
 
-        deduped.append({
-            "model": model,
-            "file": file_path,
-            "line": line,
-            "cwe": cwe,
-            "owasp": owasp,
-            "severity": sev,
-            "tools": ", ".join(tools),
-        })
+        merged, merged_tools = target
+        if "merged_ids" not in merged:
+            merged["merged_ids"] = [stable_id(finding_key(merged))]
+            merged["merged_locations"] = [finding_location(merged)]
+        merged["merged_ids"].append(stable_id(finding_key(f)))
+        merged["merged_locations"].append(finding_location(f))
+        merged_tools |= tools
+        merged["tools"] = ", ".join(sorted(merged_tools))
+        merged["severity"] = highest_severity(merged["severity"], f["severity"])
+        if not merged["cwe"]:
+            merged["cwe"] = f["cwe"]
+        if not merged["owasp"]:
+            merged["owasp"] = f["owasp"]
 
-    return deduped
+    return [c[0] for c in clusters]
 
 
 def sort_findings(findings):
@@ -180,13 +442,236 @@ def sort_findings(findings):
     return sorted(findings, key=sort_key)
 
 
+def finding_key(finding):
+    """
+    Identity of a deduped finding, built from CSV columns only so it can be
+    recomputed from a previously written CSV.
+
+    A CWE finding is identified by (model, file, cwe), the dedup key with
+    the CWE in its canonical spelling (normalize_cwe), so CWE-022 and
+    CWE-22 get the same ID (with a -2 suffix if both are reported); its
+    line, severity and tool list may change between runs without it
+    becoming a new finding. A finding without a CWE is one tool's rule hit,
+    so its tool, line and rule identify it.
+    """
+    model = finding.get("model", "")
+    file = finding.get("file", "")
+    cwe = normalize_cwe(finding.get("cwe") or "")
+    if cwe:
+        return (model, file, cwe)
+    return (
+        model, file, "", finding.get("tools", ""), str(finding.get("line", 0)),
+        finding.get("rule_id") or "",
+    )
+
+
+def finding_location(finding):
+    """(model, file, line, tools): where and by whom a finding was reported."""
+    return (
+        finding.get("model", ""), finding.get("file", ""),
+        int(finding.get("line") or 0), finding.get("tools", ""),
+    )
+
+
+def stable_id(key):
+    """Content-derived finding ID: F + the first hex digits of a SHA-256."""
+    digest = hashlib.sha256("\x1f".join(key).encode("utf-8")).hexdigest()
+    return "F" + digest[:FINDING_ID_DIGITS].upper()
+
+
 def assign_ids(findings):
-    """Assign sequential finding IDs (F001, F002, ...)."""
-    for i, f in enumerate(findings, start=1):
-        f["finding_id"] = f"F{i:03d}"
+    """
+    Assign stable content-derived finding IDs (see finding_key).
+
+    Findings sharing a key (or, rarely, a hash prefix) get -2, -3, ...
+    suffixes in their sorted order.
+    """
+    seen = Counter()
+    for f in findings:
+        base = stable_id(finding_key(f))
+        seen[base] += 1
+        f["finding_id"] = base if seen[base] == 1 else f"{base}-{seen[base]}"
     return findings
 
 
+def read_csv(csv_path):
+    """Read a previously written validation CSV into a list of row dicts."""
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def merge_labels(findings, previous_rows):
+    """
+    Carry TP/FP labels from a previous validation CSV onto new findings.
+
+    Rows are matched on finding ID. Rows from a CSV with positional IDs
+    (F001, ...) are re-keyed with assign_ids first, so labels from before
+    stable IDs existed are migrated too. A clustered finding also claims the previous rows of its members
+    (merged_ids). Previous rows still unmatched after that are matched on
+    finding_location() to a finding without any match yet or to a cluster
+    member. If the labels of a finding's previous rows agree the label is
+    kept, if they conflict the finding goes back to review with the
+    conflicting labels in its notes. Findings with no previous row keep
+    empty labels (unreviewed).
+
+    Returns (carried, moved, new, removed): matched new findings, the
+    subset of those whose line or tool list changed, unmatched or
+    conflicting new findings, and previous rows with no counterpart any
+    more.
+    """
+    previous_rows = [dict(r) for r in previous_rows]
+    for r in previous_rows:
+        r["line"] = int(r["line"]) if (r.get("line") or "").isdigit() else 0
+    legacy = [r for r in previous_rows if LEGACY_ID_RE.match(r.get("finding_id") or "")]
+    assign_ids(sort_findings(legacy))
+
+    previous = {}  # finding ID -> previous rows
+    for r in previous_rows:
+        if r.get("finding_id"):
+            previous.setdefault(r["finding_id"], []).append(r)
+
+    matches = {id(f): [] for f in findings}
+    for f in findings:
+        matches[id(f)].extend(previous.pop(f["finding_id"], ()))
+    for f in findings:
+        for member_id in f.get("merged_ids", ()):
+            matches[id(f)].extend(previous.pop(member_id, ()))
+
+    # Location fallback, for rows whose key changed (e.g. rules without a
+    # CWE, which can share a line): a finding without a match takes one row,
+    # then a cluster takes every row at a member's location
+    by_location = {}
+    for f in findings:
+        for loc in f.get("merged_locations", ()):
+            by_location.setdefault(loc, []).append((f, True))
+        if not matches[id(f)]:
+            by_location.setdefault(finding_location(f), []).append((f, False))
+    leftover = []
+    for rows in previous.values():
+        for r in rows:
+            candidates = by_location.get(finding_location(r), ())
+            f = next((f for f, member in candidates if not member and not matches[id(f)]), None)
+            if f is None:
+                f = next((f for f, member in candidates if member), None)
+            if f is None and candidates:
+                f = candidates[0][0]
+            if f is not None:
+                matches[id(f)].append(r)
+            else:
+                leftover.append(r)
+
+    carried, moved, new = [], [], []
+    for f in findings:
+        olds = matches[id(f)]
+        if not olds:
+            new.append(f)
+            continue
+        labels = {(o.get("validated") or "").strip().upper() for o in olds} - {""}
+        if len(labels) > 1:
+            f["validated"] = ""
+            f["notes"] = "label conflict after clustering: " + ", ".join(
+                f"{o['finding_id']}={(o.get('validated') or '').strip() or '-'}" for o in olds
+            )
+            new.append(f)
+            continue
+        labeled = [o for o in olds if (o.get("validated") or "").strip()] or olds
+        f["validated"] = (labeled[0].get("validated") or "").strip()
+        f["notes"] = "; ".join(dict.fromkeys(o.get("notes") or "" for o in labeled if o.get("notes")))
+        carried.append(f)
+        old = olds[0]
+        if len(olds) > 1 or (old["line"], old.get("tools", "")) != (f["line"], f["tools"]):
+            moved.append(f)
+
+    removed = sort_findings(leftover)
+    return carried, moved, new, removed
+
+
+class SnippetHasher:
+    """
+    Hashes of normalized code lines from output/{model}/{file}, reading
+    each code file at most once.
+
+    Normalization removes all whitespace, so indentation and spacing
+    differences between models don't prevent a match.
+    """
+
+    def __init__(self, code_dir):
+        self.code_dir = Path(code_dir)
+        self.files = {}  # (model, file) -> list of lines, or None if unreadable
+
+    def __call__(self, finding):
+        """Hash of the finding's flagged line, or None if it can't be read."""
+        key = (finding.get("model", ""), finding.get("file", ""))
+        lines = self.files.get(key, False)
+        if lines is False:
+            try:
+                path = self.code_dir / key[0] / key[1]
+                lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+            except OSError:
+                lines = None
+            self.files[key] = lines
+        line = finding.get("line", 0)
+        if not lines or not 0 < line <= len(lines):
+            return None
+        code = WHITESPACE_RE.sub("", lines[line - 1])
+        if not code:
+            return None
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()[:SNIPPET_HASH_DIGITS]
+
+
+def propagation_key(finding, snippet_hash):
+    """
+    (prompt ID, rule ID, CWE, code line hash) of a finding, or None if it has
+    no readable code line. The prompt ID is the code file's stem (a03-py-01),
+    so the same prompt answered by different models shares keys.
+    """
+    digest = snippet_hash(finding)
+    if digest is None:
+        return None
+    return (
+        Path(finding.get("file", "")).stem,
+        finding.get("rule_id", ""),
+        normalize_cwe(finding.get("cwe") or ""),
+        digest,
+    )
+
+
+def propagate_labels(findings, snippet_hash):
+    """
+    Suggest labels for unreviewed findings from labelled findings with the
+    same propagation_key.
+
+    Only human TP/FP labels are indexed, never earlier suggestions, so
+    suggestions don't chain. A key whose labelled findings disagree on the
+    verdict suggests nothing; otherwise the most common note for the
+    verdict is used. Suggested findings get validated = "auto:TP"/"auto:FP".
+
+    Returns the list of findings that received a suggestion.
+    """
+    index = {}  # key -> Counter of (verdict, notes)
+    pending = []
+    for f in findings:
+        verdict = (f.get("validated") or "").strip().upper()
+        if verdict in ("TP", "FP"):
+            key = propagation_key(f, snippet_hash)
+            if key is not None:
+                index.setdefault(key, Counter())[(verdict, (f.get("notes") or "").strip())] += 1
+        elif not verdict:
+            pending.append(f)
+
+    suggested = []
+    for f in pending:
+        key = propagation_key(f, snippet_hash)
+        labels = index.get(key) if key is not None else None
+        if not labels or len({verdict for verdict, _ in labels}) > 1:
+            continue
+        (verdict, notes), _ = labels.most_common(1)[0]
+        f["validated"] = AUTO_PREFIX + verdict
+        f["notes"] = notes
+        suggested.append(f)
+    return suggested
+
+
 def write_csv(findings, output_path):
     """Write findings to CSV with the standard column set."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -204,8 +689,9 @@ def write_csv(findings, output_path):
                 "owasp": finding.get("owasp", ""),
                 "severity": finding.get("severity", ""),
                 "tools": finding.get("tools", ""),
-                "validated": "",
-                "notes": "",
+                "validated": finding.get("validated", ""),
+                "notes": finding.get("notes", ""),
+                "rule_id": finding.get("rule_id", ""),
             }
             writer.writerow(row)
 
@@ -219,7 +705,8 @@ def main():
     parser = argparse.ArgumentParser(
         description=(
             "Generate a validation CSV from scan results. "
-            "Deduplicates findings (same file + CWE from multiple tools = one row) "
+            "Deduplicates findings (same file + CWE from multiple tools = one row), "
+            "optionally clusters nearby findings with compatible CWEs across tools, "
             "and produces a template for manual TP/FP review."
         )
     )
@@ -241,43 +728,135 @@ def main():
         default=SCANS_DIR,
         help=f"Scans directory (default: {SCANS_DIR})",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=f"Processes for reading scan files (default: CPU count if {PARALLEL_MIN_FILES}+ files, else 1)",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="?",
+        type=Path,
+        const=True,
+        default=None,
+        metavar="CSV",
+        help="Carry over validated/notes from an existing CSV (default: the output path)",
+    )
+    parser.add_argument(
+        "--line-window",
+        type=int,
+        default=None,
+        help=f"With --cluster, cluster findings up to this many lines apart (default: {DEFAULT_LINE_WINDOW})",
+    )
+    parser.add_argument(
+        "--cluster",
+        action="store_true",
+        help="Also cluster nearby findings from different tools (default: exact file + CWE dedup only)",
+    )
+    parser.add_argument(
+        "--propagate",
+        action="store_true",
+        help="With --merge, suggest auto:TP/auto:FP labels for new findings matching labelled ones",
+    )
+    parser.add_argument(
+        "--code-dir",
+        type=Path,
+        default=CODE_DIR,
+        help=f"Collected code directory, for --propagate (default: {CODE_DIR})",
+    )
     args = parser.parse_args()
 
+    if args.line_window is not None and not args.cluster:
+        parser.error("--line-window requires --cluster")
+    if args.line_window is None:
+        args.line_window = DEFAULT_LINE_WINDOW
+    if args.line_window < 0:
+        parser.error("--line-window must be >= 0")
+
+    merge_path = args.output if args.merge is True else args.merge
+    if merge_path and not merge_path.exists():
+        parser.error(f"--merge: no such file: {merge_path}")
+    if args.propagate and not merge_path:
+        parser.error("--propagate requires --merge")
+
     print("Validation Template Generator")
     print("=" * 50)
 
-    # Load raw findings
+    # Stream raw findings straight into dedup buckets
     print(f"Scanning: {args.scans_dir}")
-    raw_findings = load_scan_results(args.scans_dir, model_filter=args.model)
-
-    if not raw_findings:
+    buckets = DedupBuckets()
+    model_counts = Counter()
+    for f in iter_scan_results(args.scans_dir, model_filter=args.model, jobs=args.jobs):
+        buckets.add(f)
+        model_counts[f.model] += 1
+    raw_count = sum(model_counts.values())
+
+    if not raw_count:
         print("No scan results found.")
         print(f"  Looked in: {args.scans_dir}")
         print("  Expected structure: scans/{model_id}/{tool}.json")
         print("  Run scan.py first to generate scan results.")
         sys.exit(0)
 
-    print(f"Raw findings loaded: {len(raw_findings)}")
+    print(f"Raw findings loaded: {raw_count}")
 
     # Count by model before dedup
-    model_counts = defaultdict(int)
-    for f in raw_findings:
-        model_counts[f["_model"]] += 1
     for model_id, count in sorted(model_counts.items()):
         print(f"  {model_id}: {count} raw findings")
 
     # Deduplicate
-    deduped = deduplicate_findings(raw_findings)
+    deduped = buckets.rows()
     print(f"\nAfter deduplication: {len(deduped)} unique findings")
-    print(f"  Removed {len(raw_findings) - len(deduped)} duplicates")
+    print(f"  Removed {raw_count - len(deduped)} duplicates")
+
+    # Cluster nearby findings from different tools
+    if args.cluster:
+        exact_count = len(deduped)
+        deduped = cluster_findings(deduped, window=args.line_window)
+        print(f"\nAfter line clustering (window {args.line_window}): {len(deduped)} findings")
+        print(f"  Rows: {exact_count} -> {len(deduped)} "
+              f"({exact_count - len(deduped)} merged into nearby findings)")
 
     # Sort and assign IDs
     deduped = sort_findings(deduped)
     deduped = assign_ids(deduped)
 
+    # Carry over labels from the previous CSV
+    removed = []
+    if merge_path:
+        previous_rows = read_csv(merge_path)
+        carried, moved, new, removed = merge_labels(deduped, previous_rows)
+        labeled = sum(1 for f in carried if f.get("validated", "").strip())
+        print(f"\nMerged with: {merge_path} ({len(previous_rows)} rows)")
+        print(f"  Matched: {len(carried)} ({labeled} labeled, labels kept; "
+              f"{len(moved)} with a new line or tool list)")
+        print(f"  New:     {len(new)} (unreviewed or conflicting labels)")
+        print(f"  Removed: {len(removed)}")
+        for r in removed:
+            label = (r.get("validated") or "").strip() or "unreviewed"
+            print(f"    {r.get('finding_id', '')} {r.get('model', '')} {r.get('file', '')}"
+                  f":{r.get('line', '')} {r.get('cwe', '') or '-'} [{label}]")
+
+    # Suggest labels for new findings from matching labelled ones
+    if args.propagate:
+        suggested = propagate_labels(deduped, SnippetHasher(args.code_dir))
+        verdicts = Counter(f["validated"] for f in suggested)
+        unreviewed = sum(1 for f in deduped if not (f.get("validated") or "").strip())
+        print(f"\nPropagated labels: {len(suggested)} suggested "
+              f"({', '.join(f'{v}: {n}' for v, n in sorted(verdicts.items())) or 'none'}), "
+              f"{unreviewed} still unreviewed")
+        print(f"  Confirm a suggestion by removing the '{AUTO_PREFIX}' prefix")
+
     # Write CSV
     write_csv(deduped, args.output)
     print(f"\nWrote: {args.output}")
+    removed_path = args.output.with_suffix(".removed.csv")
+    if removed:
+        write_csv(removed, removed_path)
+        print(f"Wrote: {removed_path} (findings no longer reported)")
+    elif merge_path and removed_path.exists():
+        removed_path.unlink()  # stale list from an earlier merge
     print(f"Columns: {', '.join(CSV_COLUMNS)}")
     print("\nNext step: Open the CSV and fill in the 'validated' column")
     print("  TP = True Positive (real vulnerability)")
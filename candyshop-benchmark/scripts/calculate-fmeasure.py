@@ -10,20 +10,109 @@ Reads triage CSV files and ground truth CSVs, then produces:
 
 Usage:
     python3 calculate-fmeasure.py <triage-dir> <ground-truth-dir> <output-dir> [speed-file]
+
+<triage-dir> may instead be a normalized findings database
+(normalize-results.py --db) that triage-consensus.py has stored its
+results in; its `triage` table is read in place of the *-auto.csv files.
+Reviewed *-final.csv files in the triage directory recorded in the database
+still take precedence over it.
 """
 
 import csv
+import sqlite3
 import sys
 import os
+import re
 from pathlib import Path
 from collections import defaultdict
 
 
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+
+def is_sqlite(path):
+    """True if path is a SQLite database file."""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def read_triage_csv(filepath, target):
+    """Read one triage CSV, tagging each row with its target."""
+    rows = []
+    with open(filepath, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        for row in reader:
+            row["_target"] = target
+            rows.append(row)
+    print(f"  Loaded {len(rows)} findings from {filepath.name} ({target})")
+    return rows
+
+
+def load_triage_db(db_path):
+    """Load triage rows from the `triage` table of a normalized findings database.
+
+    Targets with a reviewed *-final.csv in the triage directory recorded by
+    triage-consensus.py are read from that file instead, as they would be by
+    load_triage_files.
+
+    Returns dict: target -> list of row dicts, like load_triage_files.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT * FROM triage ORDER BY target, rowid").fetchall()
+    except sqlite3.OperationalError:
+        print(f"Error: no triage table in {db_path}; run triage-consensus.py on it first",
+              file=sys.stderr)
+        sys.exit(1)
+    try:
+        meta = conn.execute(
+            "SELECT value FROM triage_meta WHERE key = 'triage_dir'").fetchone()
+    except sqlite3.OperationalError:
+        meta = None
+    finally:
+        conn.close()
+
+    results = {}
+    for row in rows:
+        row = dict(row)
+        row["_target"] = row["target"]
+        results.setdefault(row["target"], []).append(row)
+
+    final_files = {}
+    if meta is None:
+        print(f"Warning: {db_path} does not record its triage directory; reviewed "
+              f"*-final.csv files are ignored (re-run triage-consensus.py on it, "
+              f"or pass the triage directory instead)", file=sys.stderr)
+    elif Path(meta[0]).is_dir():
+        for f in sorted(Path(meta[0]).glob("*-final.csv")):
+            final_files[f.stem.rsplit("-final", 1)[0]] = f
+    else:
+        print(f"Warning: triage directory {meta[0]} recorded in {db_path} not found; "
+              f"reviewed *-final.csv files are ignored", file=sys.stderr)
+
+    for target in sorted(set(results) | set(final_files)):
+        if target in final_files:
+            results[target] = read_triage_csv(final_files[target], target)
+        else:
+            print(f"  Loaded {len(results[target])} findings from {Path(db_path).name} ({target})")
+
+    return dict(sorted(results.items()))
+
+
 def load_triage_files(triage_dir):
     """Load all triage CSVs. Prefer *-final.csv, fall back to *-auto.csv.
 
+    A normalized findings database is read with load_triage_db instead.
+
     Returns dict: target -> list of row dicts.
     """
+    if is_sqlite(triage_dir):
+        return load_triage_db(triage_dir)
+
     triage_dir = Path(triage_dir)
     if not triage_dir.is_dir():
         print(f"Error: triage directory not found: {triage_dir}", file=sys.stderr)
@@ -57,14 +146,7 @@ def load_triage_files(triage_dir):
 
     results = {}
     for target, filepath in sorted(chosen.items()):
-        rows = []
-        with open(filepath, newline="", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
-            for row in reader:
-                row["_target"] = target
-                rows.append(row)
-        results[target] = rows
-        print(f"  Loaded {len(rows)} findings from {filepath.name} ({target})")
+        results[target] = read_triage_csv(filepath, target)
 
     return results
 
@@ -124,8 +206,9 @@ def load_speed_data(speed_file):
 def extract_tool_findings(triage_data):
     """From grouped triage data, extract per-tool findings.
 
-    Each triage row has a 'tools' column (comma-separated tool names).
-    A TP for tools='bearer,zap' means both bearer and zap get credit for that TP.
+    Each triage row has a 'tools' column (tool names separated by "|", as
+    triage-consensus.py writes them, or by commas in hand-edited files).
+    A TP for tools='bearer|zap' means both bearer and zap get credit for that TP.
     An FP for tools='nodejsscan' means only nodejsscan gets that FP.
 
     Returns dict: (tool, target) -> {"tp": int, "fp": int, "tp_cwes": set}
@@ -138,7 +221,7 @@ def extract_tool_findings(triage_data):
             if not tools_str:
                 continue
 
-            tools = [t.strip().lower() for t in tools_str.split(",") if t.strip()]
+            tools = [t.strip().lower() for t in re.split(r"[,|]", tools_str) if t.strip()]
             verdict = row.get("verdict", "").strip().upper()
             cwe = row.get("cwe", "").strip()
 
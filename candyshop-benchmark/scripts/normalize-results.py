@@ -6,10 +6,50 @@ into a unified CSV format for the CandyShop Benchmark.
 Usage:
     python3 normalize-results.py results/2026-03-01
     python3 normalize-results.py results/2026-03-01 > results/normalized-all.csv
+    python3 normalize-results.py --jobs 8 results/2026-03-01 > results/normalized-all.csv
+    python3 normalize-results.py --db results/normalized-all.db results/2026-03-01 > /dev/null
+    python3 normalize-results.py --cache results/2026-03-01 > results/normalized-all.csv
+    python3 normalize-results.py --dedup results/normalized-dedup.csv results/2026-03-01 > results/normalized-all.csv
+
+With --jobs N, report files are parsed in N worker processes (0 = one per
+CPU). Results are merged in discovery order, so finding_id numbering is the
+same as in a sequential run.
+
+Trivy, Dependency-Check and Checkov reports can run to hundreds of MB, so
+their parsers stream just the arrays they need (Results[].Vulnerabilities[],
+dependencies[], results.failed_checks[]) instead of loading the whole
+report, and rows are written to the CSV as they are parsed.
+
+With --cache, each report's normalized rows are kept in a SQLite cache
+(results-dir/normalize-cache.db, or --cache-file) keyed by the report's path,
+size, mtime, SHA-256 and PARSER_VERSION. Only new or changed reports are
+parsed again; unchanged ones are replayed from the cache. A report whose
+size and mtime are unchanged is not even re-hashed. finding_ids are
+assigned at output time, so they are the same as in a full run.
 
 Unified CSV schema:
     finding_id,tool,target,category,cwe,severity,location,description,raw_id
 
+With --db PATH the same rows are also written to a SQLite database: tool,
+target, category, cwe and severity are dictionary-encoded into small
+per-column tables, location, description and raw_id are stored once per
+distinct value in a shared string table, and the findings table is
+indexed on (target, cwe) and (tool, target). The `normalized` view
+returns rows in the CSV schema; triage-consensus.py accepts the database
+in place of the CSV.
+
+With --dedup PATH a second CSV is written in which container and SCA
+findings of the same advisory in the same package, reported by several
+scanners, are merged into one row. Advisories are canonicalized across
+CVE/GHSA aliases, packages are compared as name@version, and the rows are
+hash-joined on (target, advisory, package). Rows are only split again when
+two tools give the advisory different CWEs (a missing CWE, as from Grype,
+matches any), or when a tool reports it at several locations. Merged rows
+add four columns: tools, and finding_ids, cwes and locations
+(pipe-separated, one per merged row). The per-tool CSV on stdout is unchanged, and F-measure
+should still be computed from it: see triage-consensus.py for how merged
+rows change consensus.
+
 Supports:
     Container: trivy, grype
     SAST:      bearer, nodejsscan, bandit
@@ -18,11 +58,19 @@ Supports:
     IaC:       checkov
 """
 
+import argparse
 import csv
+import hashlib
+import itertools
 import json
 import os
+import re
+import sqlite3
 import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from urllib.parse import unquote
 
 
 # ---------------------------------------------------------------------------
@@ -172,6 +220,19 @@ def sanitize(text):
     return " ".join(str(text).split())
 
 
+def purl_coordinates(purl):
+    """name@version of a package URL: pkg:npm/%40babel%2Fhelpers@7.25.0 -> @babel/helpers@7.25.0."""
+    if not purl.startswith("pkg:"):
+        return ""
+    path = purl[4:].split("?", 1)[0].split("#", 1)[0]
+    path = path.split("/", 1)[1] if "/" in path else path  # drop the type
+    name, _, version = path.rpartition("@")
+    if not name:
+        name, version = version, ""
+    name = unquote(name)
+    return f"{name}@{unquote(version)}" if version else name
+
+
 def extract_target_from_path(filepath, results_dir):
     """Try to extract target name from path structure or filename."""
     rel = os.path.relpath(filepath, results_dir)
@@ -190,36 +251,241 @@ def extract_target_from_path(filepath, results_dir):
     return None
 
 
+# ---------------------------------------------------------------------------
+# Streaming JSON
+# ---------------------------------------------------------------------------
+
+STREAM_CHUNK_SIZE = 1 << 20
+
+_WS_RE = re.compile(r"[ \t\n\r]*")
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_RE = re.compile(r"[^,:{}\[\]\s]+")
+_DECODER = json.JSONDecoder()
+
+
+class JSONStream:
+    """Incremental reader for one JSON document.
+
+    Values selected by iter_path() are decoded one at a time; containers
+    off the path are skipped by decoding and dropping their children one
+    at a time. Memory is bounded by the largest such value plus one read
+    chunk, not by the size of the document.
+    """
+
+    def __init__(self, fh, chunk_size=STREAM_CHUNK_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.base = 0      # document offset of buf[0]
+        self.mark = None   # start of the value being read; kept on refill
+
+    def _fill(self):
+        """Read another chunk, dropping consumed text. False at EOF.
+
+        Reads at least as much as is buffered, so a value spanning many
+        chunks is re-scanned only a logarithmic number of times.
+        """
+        chunk = self.fh.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:] + chunk
+        self.base += keep
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def _error(self, what):
+        return ValueError(f"{what}: char {self.base + self.pos}")
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at EOF)."""
+        while True:
+            self.pos = _WS_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def _match(self, regex):
+        """Match regex at pos, refilling while the match may be cut off."""
+        while True:
+            m = regex.match(self.buf, self.pos)
+            if m and m.end() < len(self.buf):
+                return m
+            if not self._fill():
+                return m
+
+    def read_string(self):
+        if self.peek() != '"':
+            raise self._error("Expecting string")
+        m = self._match(_STRING_RE)
+        if m is None:
+            raise self._error("Unterminated string")
+        self.pos = m.end()
+        return json.loads(m.group())
+
+    def skip_value(self):
+        char = self.peek()
+        if char == '"':
+            self.read_string()
+        elif char in ("{", "["):
+            # Decode and drop one child at a time: C speed, and memory is
+            # bounded by the largest child rather than the whole container
+            close = "}" if char == "{" else "]"
+            self.pos += 1
+            if self.peek() == close:
+                self.pos += 1
+                return
+            while True:
+                if close == "}":
+                    self.read_string()
+                    self.expect(":")
+                self.read_value()
+                char = self.peek()
+                self.pos += 1
+                if char == close:
+                    return
+                if char != ",":
+                    raise self._error(f"Expecting ',' or '{close}'")
+        else:
+            m = self._match(_SCALAR_RE) if char else None
+            if m is None:
+                raise self._error("Expecting value")
+            self.pos = m.end()
+
+    def read_value(self):
+        char = self.peek()
+        if char and char not in '{["':
+            # A bare number stops decoding at a chunk boundary ("7." decodes
+            # as 7), so find the whole token before decoding it
+            m = self._match(_SCALAR_RE)
+            if m is None:
+                raise self._error("Expecting value")
+            try:
+                value = json.loads(m.group())
+            except json.JSONDecodeError:
+                raise self._error("Malformed value") from None
+            self.pos = m.end()
+            return value
+        self.mark = self.pos
+        try:
+            while True:
+                try:
+                    value, end = _DECODER.raw_decode(self.buf, self.mark)
+                except json.JSONDecodeError:
+                    value, end = _DECODER, None
+                if end is None and self._fill():
+                    continue
+                break
+            if end is None:
+                raise self._error("Malformed or truncated value")
+            self.pos = end
+            return value
+        finally:
+            self.mark = None
+
+    def iter_path(self, path):
+        """Yield the values at `path` in document order.
+
+        Path components are object keys, "*" for every element of an array,
+        or "*?" for every element of an array or the value itself if it is
+        not one. Values that don't have the expected shape (null instead of
+        a list, a string instead of an object) are skipped.
+        """
+        if not path:
+            yield self.read_value()
+            return
+
+        head, rest = path[0], path[1:]
+        char = self.peek()
+        if head in ("*", "*?") and char == "[":
+            self.pos += 1
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                yield from self.iter_path(rest)
+                char = self.peek()
+                self.pos += 1
+                if char == "]":
+                    return
+                if char != ",":
+                    raise self._error("Expecting ',' or ']'")
+        elif head == "*?":
+            yield from self.iter_path(rest)
+        elif head != "*" and char == "{":
+            self.pos += 1
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                key = self.read_string()
+                self.expect(":")
+                if key == head:
+                    yield from self.iter_path(rest)
+                else:
+                    self.skip_value()
+                char = self.peek()
+                self.pos += 1
+                if char == "}":
+                    return
+                if char != ",":
+                    raise self._error("Expecting ',' or '}'")
+        else:
+            self.skip_value()
+
+
+def stream_json(filepath, path):
+    """Stream the values at `path` (see JSONStream.iter_path) from a JSON file.
+
+    Like load_json, problems are reported as warnings: on malformed JSON the
+    values read so far have been yielded and the stream just ends.
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+            stream = JSONStream(f)
+            yield from stream.iter_path(path)
+            if stream.peek():
+                raise stream._error("Extra data")
+    except ValueError as e:
+        warn(f"Malformed JSON in {filepath}: {e}")
+    except Exception as e:
+        warn(f"Error reading {filepath}: {e}")
+
+
 # ---------------------------------------------------------------------------
 # Tool-specific parsers
-# Each returns a list of dicts matching the CSV schema fields.
+# Each returns a list (or, for the streaming parsers, a generator) of dicts
+# matching the CSV schema fields.
 # ---------------------------------------------------------------------------
 
 def parse_trivy(filepath, target):
-    data = load_json(filepath)
-    if data is None:
-        return []
-    findings = []
-    results = data.get("Results") or []
-    for result_block in results:
-        vulns = result_block.get("Vulnerabilities") or []
-        for v in vulns:
-            cwe_list = v.get("CweIDs") or []
-            cwe = cwe_list[0] if cwe_list else ""
-            pkg = v.get("PkgName", "")
-            ver = v.get("InstalledVersion", "")
-            location = f"{pkg}@{ver}" if pkg else ""
-            findings.append({
-                "tool": "trivy",
-                "target": target,
-                "category": "container",
-                "cwe": cwe,
-                "severity": normalize_severity(v.get("Severity"), TRIVY_SEVERITY),
-                "location": location,
-                "description": sanitize(v.get("Title") or v.get("Description", "")),
-                "raw_id": v.get("VulnerabilityID", ""),
-            })
-    return findings
+    """Streams Results[].Vulnerabilities[]."""
+    for v in stream_json(filepath, ("Results", "*", "Vulnerabilities", "*")):
+        cwe_list = v.get("CweIDs") or []
+        cwe = cwe_list[0] if cwe_list else ""
+        pkg = v.get("PkgName", "")
+        ver = v.get("InstalledVersion", "")
+        location = f"{pkg}@{ver}" if pkg else ""
+        yield {
+            "tool": "trivy",
+            "target": target,
+            "category": "container",
+            "cwe": cwe,
+            "severity": normalize_severity(v.get("Severity"), TRIVY_SEVERITY),
+            "location": location,
+            "description": sanitize(v.get("Title") or v.get("Description", "")),
+            "raw_id": v.get("VulnerabilityID", ""),
+            "package": location,
+        }
 
 
 def parse_grype(filepath, target):
@@ -243,6 +509,12 @@ def parse_grype(filepath, target):
         pkg = artifact.get("name", "")
         ver = artifact.get("version", "")
         location = f"{pkg}@{ver}" if pkg else ""
+        # Aliases of the advisory (e.g. the CVE behind a GHSA)
+        aliases = [
+            rel.get("id", "")
+            for rel in (m.get("relatedVulnerabilities") or []) + related
+            if isinstance(rel, dict)
+        ]
         findings.append({
             "tool": "grype",
             "target": target,
@@ -252,6 +524,8 @@ def parse_grype(filepath, target):
             "location": location,
             "description": sanitize(vuln.get("description", "")),
             "raw_id": vuln.get("id", ""),
+            "package": location,
+            "aliases": " ".join(a for a in aliases if a),
         })
     return findings
 
@@ -467,6 +741,7 @@ def parse_npm_audit(filepath, target):
             "location": location,
             "description": description,
             "raw_id": raw_id,
+            "package": pkg_name,  # npm audit reports no installed version
         })
     return findings
 
@@ -496,19 +771,21 @@ def parse_pip_audit(filepath, target):
                 "location": location,
                 "description": sanitize(v.get("description", "")),
                 "raw_id": vuln_id,
+                "package": location,
+                "aliases": " ".join(v.get("aliases") or []),
             })
     return findings
 
 
 def parse_dep_check(filepath, target):
-    data = load_json(filepath)
-    if data is None:
-        return []
-    findings = []
-    deps = data.get("dependencies") or []
-    for dep in deps:
+    """Streams dependencies[], one dependency (with its vulnerabilities) at a time."""
+    for dep in stream_json(filepath, ("dependencies", "*")):
+        if not isinstance(dep, dict):
+            continue
         dep_vulns = dep.get("vulnerabilities") or []
         filename = dep.get("fileName", "")
+        purls = [p.get("id", "") for p in dep.get("packages") or [] if isinstance(p, dict)]
+        package = purl_coordinates(purls[0]) if purls else ""
         for v in dep_vulns:
             cwes = v.get("cwes") or []
             cwe = ""
@@ -520,7 +797,7 @@ def parse_dep_check(filepath, target):
                     cwe = first_cwe.get("cwe", "")
                 elif isinstance(first_cwe, int):
                     cwe = f"CWE-{first_cwe}"
-            findings.append({
+            yield {
                 "tool": "dep-check",
                 "target": target,
                 "category": "sca",
@@ -529,52 +806,41 @@ def parse_dep_check(filepath, target):
                 "location": filename,
                 "description": sanitize(v.get("description", "")),
                 "raw_id": v.get("name", ""),
-            })
-    return findings
+                "package": package,
+            }
 
 
 def parse_checkov(filepath, results_dir):
     """Checkov is special: single file covering all targets.
-    Target is extracted from file_path in each check."""
-    data = load_json(filepath)
-    if data is None:
-        return []
-    findings = []
-
-    # Checkov output can be a list of framework results or a single dict
-    results_list = []
-    if isinstance(data, list):
-        results_list = data
-    elif isinstance(data, dict):
-        results_list = [data]
+    Target is extracted from file_path in each check.
 
-    for result_block in results_list:
-        if not isinstance(result_block, dict):
+    The report is a list of framework results or a single one; streams
+    results.failed_checks[] of each.
+    """
+    for check in stream_json(filepath, ("*?", "results", "failed_checks", "*")):
+        if not isinstance(check, dict):
             continue
-        checks = (result_block.get("results", {}) or {}).get("failed_checks") or []
-        for check in checks:
-            file_path = check.get("file_path", "")
-            # Try to extract target from the file path
-            # e.g., /targets/vulnpy/Dockerfile → vulnpy
-            target = "unknown"
-            for t in KNOWN_TARGETS:
-                if t in file_path:
-                    target = t
-                    break
+        file_path = check.get("file_path", "")
+        # Try to extract target from the file path
+        # e.g., /targets/vulnpy/Dockerfile → vulnpy
+        target = "unknown"
+        for t in KNOWN_TARGETS:
+            if t in file_path:
+                target = t
+                break
 
-            resource = check.get("resource", "")
-            location = f"{file_path}:{resource}" if resource else file_path
-            findings.append({
-                "tool": "checkov",
-                "target": target,
-                "category": "iac",
-                "cwe": "",
-                "severity": "MEDIUM",
-                "location": location,
-                "description": sanitize(check.get("check_id", "") + ": " + (check.get("guideline", "") or check.get("check_type", ""))),
-                "raw_id": check.get("check_id", ""),
-            })
-    return findings
+        resource = check.get("resource", "")
+        location = f"{file_path}:{resource}" if resource else file_path
+        yield {
+            "tool": "checkov",
+            "target": target,
+            "category": "iac",
+            "cwe": "",
+            "severity": "MEDIUM",
+            "location": location,
+            "description": sanitize(check.get("check_id", "") + ": " + (check.get("guideline", "") or check.get("check_type", ""))),
+            "raw_id": check.get("check_id", ""),
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -678,48 +944,543 @@ PARSERS = {
 }
 
 
+def parse_file(tool, target, filepath, results_dir):
+    """Run the parser for one discovered report file.
+
+    Returns (findings, warning) with warning None, or ([], message) if
+    there is no parser for the tool. findings may be a generator that
+    parses the file as it is consumed.
+    """
+    if tool == "checkov":
+        return parse_checkov(filepath, results_dir), None
+    if tool in PARSERS:
+        return PARSERS[tool](filepath, target), None
+    return [], f"No parser for tool: {tool} ({filepath})"
+
+
+# With --jobs N, at most this many report files per worker are parsed ahead
+# of the one being written out
+PARSE_WINDOW_PER_JOB = 2
+
+
+def parse_file_list(tool, target, filepath, results_dir):
+    """parse_file with the findings as a list, to send back from a worker process."""
+    findings, warning = parse_file(tool, target, filepath, results_dir)
+    return list(findings), warning
+
+
+def iter_parsed(files, results_dir, jobs=1):
+    """Yield parse_file results for each discovered file, in discovery order.
+
+    Sequentially, each file is parsed only when its result is requested,
+    and streaming parsers keep memory bounded. With jobs > 1 the files are
+    parsed in a process pool, which has to send each file's rows back as a
+    list; to bound memory all the same, files are submitted in discovery
+    order and at most PARSE_WINDOW_PER_JOB * jobs are in flight or waiting
+    to be consumed at a time.
+    """
+    if jobs <= 1 or len(files) <= 1:
+        for tool, target, filepath in files:
+            yield parse_file(tool, target, filepath, results_dir)
+        return
+
+    window = PARSE_WINDOW_PER_JOB * jobs
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = deque()
+        pending = iter(files)
+        for item in itertools.islice(pending, window):
+            futures.append(pool.submit(parse_file_list, *item, results_dir))
+        while futures:
+            result = futures.popleft().result()
+            for item in itertools.islice(pending, 1):
+                futures.append(pool.submit(parse_file_list, *item, results_dir))
+            yield result
+
+
 # ---------------------------------------------------------------------------
-# Main
+# Report cache
 # ---------------------------------------------------------------------------
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: normalize-results.py <results-dir>", file=sys.stderr)
-        print("  e.g.: python3 normalize-results.py results/2026-03-01", file=sys.stderr)
-        sys.exit(1)
+# Bump when a parser's output changes, so cached rows are re-parsed
+PARSER_VERSION = 2
+
+CACHE_NAME = "normalize-cache.db"
+
+# Finding fields kept per cached row (finding_id is assigned at output time;
+# package and aliases feed --dedup)
+CACHE_FIELDS = (
+    "tool", "target", "category", "cwe", "severity", "location", "description", "raw_id",
+    "package", "aliases",
+)
+
+
+def sha256_file(filepath):
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ReportCache:
+    """Normalized rows per report file, for incremental re-runs.
+
+    Reports are keyed by their path relative to the results directory, so
+    the cache stays valid if the directory is moved. A report is a hit if
+    its parser version matches and either its (size, mtime) or, failing
+    that, its SHA-256 matches the cached entry.
+    """
+
+    def __init__(self, path, results_dir):
+        self.path = Path(path)
+        self.results_dir = results_dir
+        self.conn = sqlite3.connect(self.path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != PARSER_VERSION:
+            # The rows table follows CACHE_FIELDS, so start over on a version change
+            self.conn.executescript("DROP TABLE IF EXISTS reports; DROP TABLE IF EXISTS rows;")
+        self.conn.executescript(f"""
+            PRAGMA user_version = {PARSER_VERSION};
+            CREATE TABLE IF NOT EXISTS reports (
+                path TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                target TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                parser_version INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                path TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                {", ".join(f"{c} TEXT NOT NULL" for c in CACHE_FIELDS)},
+                PRIMARY KEY (path, seq)
+            ) WITHOUT ROWID;
+        """)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, filepath):
+        return Path(os.path.relpath(filepath, self.results_dir)).as_posix()
+
+    def lookup(self, tool, target, filepath):
+        """Return (entry, cached) for a discovered report.
+
+        entry is the fingerprint to store() after re-parsing; cached is
+        True if the rows in the cache are still valid (see rows()).
+        """
+        key = self.key(filepath)
+        st = os.stat(filepath)
+        entry = {
+            "path": key, "tool": tool, "target": target,
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "sha256": None, "parser_version": PARSER_VERSION,
+        }
+        old = self.conn.execute(
+            "SELECT tool, target, size, mtime_ns, sha256, parser_version"
+            " FROM reports WHERE path = ?",
+            (key,),
+        ).fetchone()
+        if old is None or old[5] != PARSER_VERSION or old[:2] != (tool, target):
+            return entry, False
+        if old[2:4] == (st.st_size, st.st_mtime_ns):
+            return entry, True
+        entry["sha256"] = sha256_file(filepath)
+        if entry["sha256"] != old[4]:
+            return entry, False
+        # Touched but unchanged: keep the rows, remember the new stamp
+        with self.conn:
+            self.conn.execute(
+                "UPDATE reports SET size = ?, mtime_ns = ? WHERE path = ?",
+                (st.st_size, st.st_mtime_ns, key),
+            )
+        return entry, True
+
+    def rows(self, entry):
+        """Yield the cached finding dicts of a report, in parse order."""
+        self.hits += 1
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(CACHE_FIELDS)} FROM rows WHERE path = ? ORDER BY seq",
+            (entry["path"],),
+        )
+        for values in cursor:
+            yield dict(zip(CACHE_FIELDS, values))
+
+    def store(self, entry, filepath, findings):
+        """Yield findings while recording them as the report's cached rows.
+
+        The report's entry and rows are replaced in one transaction once
+        all findings have been consumed.
+        """
+        self.misses += 1
+        if entry["sha256"] is None:
+            entry["sha256"] = sha256_file(filepath)
+        insert = (
+            f"INSERT INTO rows (path, seq, {', '.join(CACHE_FIELDS)}) "
+            f"VALUES ({', '.join('?' * (len(CACHE_FIELDS) + 2))})"
+        )
+        with self.conn:
+            self.conn.execute("DELETE FROM rows WHERE path = ?", (entry["path"],))
+            for seq, f in enumerate(findings):
+                self.conn.execute(
+                    insert, (entry["path"], seq) + tuple(f.get(c) or "" for c in CACHE_FIELDS)
+                )
+                yield f
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reports VALUES (:path, :tool, :target, :size,"
+                " :mtime_ns, :sha256, :parser_version)",
+                entry,
+            )
+
+    def prune(self, keep):
+        """Drop cached reports whose path is not in `keep`."""
+        stale = [
+            (path,) for (path,) in self.conn.execute("SELECT path FROM reports")
+            if path not in keep
+        ]
+        with self.conn:
+            self.conn.executemany("DELETE FROM reports WHERE path = ?", stale)
+            self.conn.executemany("DELETE FROM rows WHERE path = ?", stale)
+        return len(stale)
+
+    def close(self):
+        self.conn.close()
 
-    results_dir = sys.argv[1]
 
-    # Collect all findings
-    all_findings = []
-    files_processed = 0
+# ---------------------------------------------------------------------------
+# SQLite output
+# ---------------------------------------------------------------------------
 
-    for tool, target, filepath in discover_files(results_dir):
-        files_processed += 1
-        print(f"  Parsing: {filepath}", file=sys.stderr)
-
-        if tool == "checkov":
-            findings = parse_checkov(filepath, results_dir)
-        elif tool == "nuclei":
-            findings = parse_nuclei(filepath, target)
-        elif tool in PARSERS:
-            findings = PARSERS[tool](filepath, target)
-        else:
-            warn(f"No parser for tool: {tool} ({filepath})")
-            continue
+DB_SCHEMA_VERSION = 1
+
+# Low-cardinality columns, each stored as an id into its own string table
+DICT_COLUMNS = ("tool", "target", "category", "cwe", "severity")
+
+# Long or repeated text (advisory text, package coordinates, CVE ids),
+# stored once each in the shared `strings` table
+STRING_COLUMNS = ("location", "description", "raw_id")
+
+DB_BATCH_SIZE = 5000
+
+
+class FindingsDB:
+    """Normalized findings written to a SQLite file as they are produced.
+
+    Every column except finding_id is stored as an integer id: into
+    {column}_values for DICT_COLUMNS, into `strings` for STRING_COLUMNS.
+    Rows are inserted in batches into a temporary file; close() adds the
+    string tables, indexes and `normalized` view and moves it into place,
+    so readers never see a half-written database.
+    """
+
+    def __init__(self, path, results_dir):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+        self.conn = sqlite3.connect(self.tmp_path)
+        id_columns = ",\n".join(
+            f"{c}_id INTEGER NOT NULL" for c in DICT_COLUMNS + STRING_COLUMNS
+        )
+        self.conn.executescript(f"""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE strings (id INTEGER PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE findings (
+                seq INTEGER PRIMARY KEY,
+                finding_id TEXT NOT NULL,
+                {id_columns}
+            );
+        """)
+        for column in DICT_COLUMNS:
+            self.conn.execute(
+                f"CREATE TABLE {column}_values (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+            )
+        self.conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("schema_version", str(DB_SCHEMA_VERSION)), ("results_dir", str(results_dir))],
+        )
+        self.values = {column: {} for column in DICT_COLUMNS}
+        self.strings = {}
+        self.batch = []
+
+    @staticmethod
+    def _intern(table, value):
+        ident = table.get(value)
+        if ident is None:
+            ident = table[value] = len(table)
+        return ident
+
+    def add(self, f):
+        self.batch.append(
+            (f["finding_id"],)
+            + tuple(self._intern(self.values[c], f.get(c) or "") for c in DICT_COLUMNS)
+            + tuple(self._intern(self.strings, f.get(c) or "") for c in STRING_COLUMNS)
+        )
+        if len(self.batch) >= DB_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        columns = ["finding_id"] + [f"{c}_id" for c in DICT_COLUMNS + STRING_COLUMNS]
+        self.conn.executemany(
+            f"INSERT INTO findings ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            self.batch,
+        )
+        self.batch = []
+
+    def close(self):
+        self._flush()
+        for column, table in self.values.items():
+            self.conn.executemany(
+                f"INSERT INTO {column}_values (id, name) VALUES (?, ?)",
+                [(ident, name) for name, ident in table.items()],
+            )
+        self.conn.executemany(
+            "INSERT INTO strings (id, value) VALUES (?, ?)",
+            [(ident, value) for value, ident in self.strings.items()],
+        )
+        select = ",\n".join(
+            [f"{c}.name AS {c}" for c in DICT_COLUMNS]
+            + [f"s_{c}.value AS {c}" for c in STRING_COLUMNS]
+        )
+        joins = "\n".join(
+            [f"JOIN {c}_values {c} ON {c}.id = f.{c}_id" for c in DICT_COLUMNS]
+            + [f"JOIN strings s_{c} ON s_{c}.id = f.{c}_id" for c in STRING_COLUMNS]
+        )
+        self.conn.executescript(f"""
+            CREATE INDEX findings_target_cwe ON findings (target_id, cwe_id);
+            CREATE INDEX findings_tool_target ON findings (tool_id, target_id);
+            CREATE VIEW normalized AS
+                SELECT f.seq, f.finding_id,
+                       {select}
+                FROM findings f
+                {joins};
+        """)
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.conn.close()
+        os.replace(self.tmp_path, self.path)
 
-        all_findings.extend(findings)
 
-    # Assign finding IDs
-    # Group by (tool, target) for sequential numbering
-    counters = {}
-    for f in all_findings:
-        key = (f["tool"], f["target"])
-        counters.setdefault(key, 0)
-        counters[key] += 1
-        f["finding_id"] = make_finding_id(f["tool"], f["target"], counters[key])
+# ---------------------------------------------------------------------------
+# Cross-tool deduplication (--dedup)
+# ---------------------------------------------------------------------------
+
+# Dependency findings that can be joined across scanners
+DEDUP_CATEGORIES = ("container", "sca")
+
+# Columns added to the unified schema in the --dedup CSV
+DEDUP_FIELDS = ["tools", "finding_ids", "cwes", "locations"]
+
+SEVERITY_RANK = {"INFO": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+
+
+def canonical_advisory(advisory_id):
+    """Upper-case CVE ids and GHSA-prefixed lower-case GHSA ids; others as-is."""
+    advisory_id = advisory_id.strip()
+    upper = advisory_id.upper()
+    if upper.startswith("CVE-"):
+        return upper
+    if upper.startswith("GHSA-"):
+        return "GHSA-" + advisory_id[5:].lower()
+    return advisory_id
+
 
-    # Write CSV to stdout
+def advisory_preference(advisory_id):
+    """Sort key for naming a group of aliases: a CVE, else a GHSA, else any id."""
+    return (not advisory_id.startswith("CVE-"), not advisory_id.startswith("GHSA-"), advisory_id)
+
+
+def split_package(coordinates):
+    """(name, version) of name@version coordinates; version is "" if absent.
+
+    Names are lower-cased with runs of -_. folded to "-" (PEP 503), so
+    PyYAML, pyyaml and py_yaml join; the advisory must match too.
+    """
+    coordinates = coordinates.strip()
+    name, _, version = coordinates.rpartition("@")
+    if not name:  # no version, or a bare scoped name like @babel/core
+        name, version = coordinates, ""
+    return re.sub(r"[-_.]+", "-", name.lower()), version
+
+
+def merge_findings(rows, advisory):
+    """One row for findings of the same advisory and package from several tools.
+
+    The CWE and location of each merged finding are kept in `cwes` and
+    `locations`, next to its id in `finding_ids`.
+    """
+    merged = dict(rows[0])
+    merged["raw_id"] = advisory
+    merged["severity"] = max(
+        (r["severity"] for r in rows), key=lambda s: SEVERITY_RANK.get(s, -1)
+    )
+    for field in ("cwe", "description"):
+        merged[field] = next((r[field] for r in rows if r[field]), "")
+    # Prefer the location of a tool that saw the installed version
+    versioned = [r for r in rows if split_package(r.get("package") or "")[1]]
+    merged["location"] = next((r["location"] for r in versioned + rows if r["location"]), "")
+    merged["tools"] = "|".join(sorted({r["tool"] for r in rows}))
+    merged["finding_ids"] = "|".join(r["finding_id"] for r in rows)
+    merged["cwes"] = "|".join(r["cwe"] for r in rows)
+    merged["locations"] = "|".join(r["location"] for r in rows)
+    return merged
+
+
+class AdvisoryDedup:
+    """Hash join of dependency findings reported by more than one scanner.
+
+    Advisory ids and their aliases (GHSA <-> CVE, from Grype's related
+    vulnerabilities and pip-audit's aliases) are merged with union-find,
+    and each alias set is named by its preferred id. Findings are then
+    joined on (target, advisory, package, version). npm audit reports no
+    installed version, so its rows join the bucket's only version, or stay
+    separate if the other scanners saw several versions.
+
+    Aliases can link two ids late in the run, so joinable findings are
+    held until merged(); everything else passes straight through.
+    """
+
+    def __init__(self):
+        self.parent = {}  # advisory id -> union-find parent
+        self.held = []  # (advisory, package name, version, finding), in output order
+        self.passed = 0
+
+    def _find(self, advisory):
+        parent = self.parent
+        root = parent.setdefault(advisory, advisory)
+        while parent[root] != root:
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def add(self, finding):
+        """Hold a joinable finding and return True; return False to pass it through."""
+        advisory = canonical_advisory(finding.get("raw_id") or "")
+        name, version = split_package(finding.get("package") or "")
+        if finding.get("category") not in DEDUP_CATEGORIES or not advisory or not name:
+            self.passed += 1
+            return False
+        root = self._find(advisory)
+        for alias in (finding.get("aliases") or "").split():
+            other = self._find(canonical_advisory(alias))
+            if other != root:
+                self.parent[other] = root
+        self.held.append((advisory, name, version, dict(finding)))
+        return True
+
+    def merged(self):
+        """Yield one row per join group, in order of each group's first finding."""
+        names = {}
+        for advisory in self.parent:
+            root = self._find(advisory)
+            if root not in names or advisory_preference(advisory) < advisory_preference(names[root]):
+                names[root] = advisory
+
+        # (target, advisory, package) -> {version: [held index, ...]}
+        buckets = {}
+        for i, (advisory, name, version, finding) in enumerate(self.held):
+            key = (finding["target"], names[self._find(advisory)], name)
+            buckets.setdefault(key, {}).setdefault(version, []).append(i)
+
+        groups = []
+        for (_, advisory, _), versions in buckets.items():
+            unversioned = versions.pop("", [])
+            if len(versions) == 1:
+                (members,) = versions.values()
+                members.extend(unversioned)
+                members.sort()
+            elif versions:
+                groups.extend((advisory, [i]) for i in unversioned)
+            elif unversioned:
+                versions[""] = unversioned
+            for members in versions.values():
+                for same_cwe in self._split_cwes(members):
+                    groups.extend((advisory, part) for part in self._one_per_tool(same_cwe))
+
+        groups.sort(key=lambda group: group[1][0])
+        for advisory, members in groups:
+            yield merge_findings([self.held[i][3] for i in members], advisory)
+
+    def _split_cwes(self, members):
+        """Split a join group where tools give the advisory different CWEs.
+
+        Most scanners report no CWE (Grype hardly ever does), and such rows
+        match any CWE: they join the group of the first CWE in the bucket.
+        """
+        by_cwe = {}
+        for i in members:
+            cwe = (self.held[i][3].get("cwe") or "").strip().upper()
+            by_cwe.setdefault(cwe, []).append(i)
+        without = by_cwe.pop("", [])
+        if len(by_cwe) <= 1:
+            return [members]
+        parts = list(by_cwe.values())
+        parts[0] = sorted(parts[0] + without)
+        return parts
+
+    def _one_per_tool(self, members):
+        """Split a join group so that no tool contributes more than one row.
+
+        A tool that reports the group several times saw it at different
+        locations (the same jar bundled twice, say), and there is no telling
+        which of them another tool's row stands for, so those rows stay
+        separate and only the other tools' rows are merged.
+        """
+        tools = Counter(self.held[i][3]["tool"] for i in members)
+        joined = [i for i in members if tools[self.held[i][3]["tool"]] == 1]
+        repeated = [[i] for i in members if tools[self.held[i][3]["tool"]] > 1]
+        return ([joined] if joined else []) + repeated
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Normalize security tool output into the unified CandyShop CSV (on stdout).",
+        epilog="e.g.: python3 normalize-results.py results/2026-03-01",
+    )
+    parser.add_argument("results_dir", help="Results directory of one scan run")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes for parsing report files, 0 = one per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--db",
+        metavar="PATH",
+        default=None,
+        help="Also write the findings to this SQLite database (dictionary-encoded, indexed)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Re-parse only new or changed reports, reusing cached rows for the rest",
+    )
+    parser.add_argument(
+        "--cache-file",
+        metavar="PATH",
+        default=None,
+        help=f"Report cache for --cache (default: results-dir/{CACHE_NAME})",
+    )
+    parser.add_argument(
+        "--dedup",
+        metavar="PATH",
+        default=None,
+        help="Also write a CSV with the same CVE/GHSA in the same package merged across tools",
+    )
+    args = parser.parse_args()
+
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    results_dir = args.results_dir
+    jobs = args.jobs or os.cpu_count() or 1
+
+    # Write CSV to stdout as files are parsed
     fieldnames = [
         "finding_id", "tool", "target", "category",
         "cwe", "severity", "location", "description", "raw_id",
@@ -731,12 +1492,92 @@ def main():
         quoting=csv.QUOTE_MINIMAL,
     )
     writer.writeheader()
-    for f in all_findings:
-        writer.writerow(f)
+    db = FindingsDB(args.db, results_dir) if args.db else None
+    dedup = None
+    if args.dedup:
+        dedup = AdvisoryDedup()
+        dedup_file = open(args.dedup, "w", newline="", encoding="utf-8")
+        dedup_writer = csv.DictWriter(
+            dedup_file,
+            fieldnames=fieldnames + DEDUP_FIELDS,
+            extrasaction="ignore",
+            quoting=csv.QUOTE_MINIMAL,
+        )
+        dedup_writer.writeheader()
+
+    files = list(discover_files(results_dir))
+    files_processed = 0
+
+    # Reports whose cached rows are still valid are not parsed again
+    cache = None
+    cached = {}
+    if args.cache or args.cache_file:
+        cache_path = args.cache_file or Path(results_dir) / CACHE_NAME
+        cache = ReportCache(cache_path, results_dir)
+        for item in files:
+            cached[item] = cache.lookup(*item)
+    stale = [item for item in files if not cached.get(item, (None, False))[1]]
+    parsed = iter_parsed(stale, results_dir, jobs)
+    total_findings = 0
+
+    # Finding IDs are numbered sequentially per (tool, target) in output order
+    counters = {}
+
+    for item in files:
+        filepath = item[2]
+        files_processed += 1
+        entry, hit = cached.get(item, (None, False))
+        if hit:
+            print(f"  Cached:  {filepath}", file=sys.stderr)
+            findings = cache.rows(entry)
+        else:
+            print(f"  Parsing: {filepath}", file=sys.stderr)
+            findings, warning = next(parsed)
+            if warning:
+                warn(warning)
+                continue
+            if cache is not None:
+                findings = cache.store(entry, filepath, findings)
+        for f in findings:
+            key = (f["tool"], f["target"])
+            counters[key] = counters.get(key, 0) + 1
+            f["finding_id"] = make_finding_id(f["tool"], f["target"], counters[key])
+            writer.writerow(f)
+            if db is not None:
+                db.add(f)
+            if dedup is not None and not dedup.add(f):
+                dedup_writer.writerow({**f, "tools": f["tool"], "finding_ids": f["finding_id"],
+                                       "cwes": f["cwe"], "locations": f["location"]})
+            total_findings += 1
+
+    if db is not None:
+        db.close()
+        print(f"Wrote {args.db}", file=sys.stderr)
+    if dedup is not None:
+        groups = multi_tool = 0
+        for row in dedup.merged():
+            dedup_writer.writerow(row)
+            groups += 1
+            multi_tool += "|" in row["tools"]
+        dedup_file.close()
+        print(
+            f"Dedup: {len(dedup.held)} dependency findings -> {groups} rows "
+            f"({multi_tool} reported by more than one tool), "
+            f"{dedup.passed} other findings unchanged ({args.dedup})",
+            file=sys.stderr,
+        )
+    if cache is not None:
+        pruned = cache.prune({entry["path"] for entry, _ in cached.values()})
+        print(
+            f"Cache: {cache.hits} reports reused, {cache.misses} parsed, "
+            f"{pruned} stale entries dropped ({cache.path})",
+            file=sys.stderr,
+        )
+        cache.close()
 
     # Summary to stderr
     print(
-        f"\nProcessed {files_processed} files, {len(all_findings)} total findings",
+        f"\nProcessed {files_processed} files, {total_findings} total findings",
         file=sys.stderr,
     )
 
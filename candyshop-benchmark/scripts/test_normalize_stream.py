@@ -0,0 +1,71 @@
+"""
+test_normalize_stream.py — check JSONStream against json.load.
+
+Run with: python -m pytest scripts/test_normalize_stream.py
+"""
+
+import importlib.util
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "normalize_results", Path(__file__).with_name("normalize-results.py"))
+normalize_results = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(normalize_results)
+JSONStream = normalize_results.JSONStream
+
+CHUNK_SIZES = [1, 2, 3, 7, 25, 35, 1 << 20]
+
+DOCUMENTS = [
+    '{"Metadata": {"Score": 7.5, "n": 1e3}, "Results": [{"Target": "a",'
+    ' "Vulnerabilities": [{"VulnerabilityID": "CVE-1", "CVSS": 9.8}]}]}',
+    '{"Results": [{"Vulnerabilities": null}, {"Vulnerabilities":'
+    ' [{"Score": -0.25E+2, "Fixed": true, "Note": null}]}], "Tail": 12345}',
+    '{"Skip": [1.5e-3, [2.0, {"x": "\\"}]"}], -7], "Results": []}',
+    '{"Results": [{"Vulnerabilities": [1.25, 3e10, "s", false]}]}',
+    '{"Results": {"Vulnerabilities": {"VulnerabilityID": "CVE-2"}}}',
+]
+
+PATH = ["Results", "*?", "Vulnerabilities", "*"]
+
+
+def expected_values(value, path):
+    """What iter_path(path) yields, computed on a fully loaded document."""
+    if not path:
+        yield value
+        return
+    head, rest = path[0], path[1:]
+    if head in ("*", "*?") and isinstance(value, list):
+        for item in value:
+            yield from expected_values(item, rest)
+    elif head == "*?":
+        yield from expected_values(value, rest)
+    elif isinstance(value, dict) and head in value:
+        yield from expected_values(value[head], rest)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_iter_path_matches_json_load(text, chunk_size):
+    stream = JSONStream(io.StringIO(text), chunk_size=chunk_size)
+    assert list(stream.iter_path(PATH)) == list(expected_values(json.loads(text), PATH))
+    assert stream.peek() == ""
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_read_value_matches_json_load(text, chunk_size):
+    stream = JSONStream(io.StringIO(text), chunk_size=chunk_size)
+    assert stream.read_value() == json.loads(text)
+    assert stream.peek() == ""
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", ["7.", "1e", "-", "[1, }"])
+def test_malformed_value_raises(text, chunk_size):
+    stream = JSONStream(io.StringIO(text), chunk_size=chunk_size)
+    with pytest.raises(ValueError):
+        stream.read_value()
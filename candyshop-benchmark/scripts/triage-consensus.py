@@ -10,10 +10,25 @@ Usage:
 
 Example:
     python3 scripts/triage-consensus.py results/normalized-all.csv ground-truth/ triage/
+
+The normalized CSV may also be the --dedup output of normalize-results.py,
+where one row stands for the same advisory reported by several tools (its
+`tools` column); each of those tools counts towards consensus. That is a
+different consensus from the per-tool CSV: tools that agree on an advisory
+are grouped even when their locations would not match, so more groups
+reach two tools and are auto-confirmed. Triage the per-tool CSV for the
+published F-measure, and write --dedup triage to its own directory.
+
+The normalized findings may also be a SQLite database written by
+normalize-results.py --db. The triage results are then also stored in its
+`triage` table, which calculate-fmeasure.py can read in place of a triage
+directory, along with the triage output directory so that reviewed
+*-final.csv files there still take precedence.
 """
 
 import csv
 import os
+import sqlite3
 import sys
 from collections import defaultdict
 from urllib.parse import urlparse
@@ -122,29 +137,91 @@ def normalize_cwe(cwe_str):
 # Data loading
 # ---------------------------------------------------------------------------
 
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+# Columns normalize-results.py --db stores in per-column tables; location,
+# description and raw_id are ids into its shared `strings` table
+DB_DICT_COLUMNS = ("tool", "target", "category", "cwe", "severity")
+
+
+def is_sqlite(path):
+    """True if path is a SQLite database file."""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def iter_normalized_db(db_path):
+    """
+    Yield normalized finding dicts from a normalize-results.py --db database.
+
+    The string tables are read once and the integer-encoded findings are
+    decoded by list lookups, which is much cheaper than joining per row.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        def values(table, column):
+            return [v for _, v in conn.execute(f"SELECT id, {column} FROM {table} ORDER BY id")]
+
+        tools, targets, categories, cwes, severities = (
+            values(f"{c}_values", "name") for c in DB_DICT_COLUMNS
+        )
+        strings = values("strings", "value")
+        cursor = conn.execute(
+            "SELECT finding_id, tool_id, target_id, category_id, cwe_id, severity_id,"
+            " location_id, description_id, raw_id_id FROM findings ORDER BY seq"
+        )
+        for finding_id, tool, target, category, cwe, severity, location, description, raw_id in cursor:
+            yield {
+                "finding_id": finding_id,
+                "tool": tools[tool],
+                "target": targets[target],
+                "category": categories[category],
+                "cwe": cwes[cwe],
+                "severity": severities[severity],
+                "location": strings[location],
+                "description": strings[description],
+                "raw_id": strings[raw_id],
+            }
+    finally:
+        conn.close()
+
+
+def iter_normalized_csv(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as fh:
+        yield from csv.DictReader(fh)
+
+
 def load_normalized(csv_path):
     """
-    Load normalized findings from CSV.
+    Load normalized findings from CSV, or from a SQLite database written by
+    normalize-results.py --db.
 
     Expected columns:
         finding_id, tool, target, category, cwe, severity, location,
         description, raw_id
+    plus, in normalize-results.py --dedup output, tools (pipe-separated).
     """
     findings = []
     if not os.path.isfile(csv_path):
         print(f"WARNING: normalized CSV not found: {csv_path}", file=sys.stderr)
         return findings
 
-    with open(csv_path, newline="", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh)
-        for row in reader:
-            row["cwe"] = normalize_cwe(row.get("cwe", ""))
-            row["severity"] = (row.get("severity") or "unknown").strip().lower()
-            row["target"] = (row.get("target") or "").strip()
-            row["location"] = (row.get("location") or "").strip()
-            row["tool"] = (row.get("tool") or "").strip()
-            row["description"] = (row.get("description") or "").strip()
-            findings.append(row)
+    if is_sqlite(csv_path):
+        reader = iter_normalized_db(csv_path)
+    else:
+        reader = iter_normalized_csv(csv_path)
+    for row in reader:
+        row["cwe"] = normalize_cwe(row.get("cwe", ""))
+        row["severity"] = (row.get("severity") or "unknown").strip().lower()
+        row["target"] = (row.get("target") or "").strip()
+        row["location"] = (row.get("location") or "").strip()
+        row["tool"] = (row.get("tool") or "").strip()
+        row["_tools"] = [t for t in (row.get("tools") or "").split("|") if t] or [row["tool"]]
+        row["description"] = (row.get("description") or "").strip()
+        findings.append(row)
     return findings
 
 
@@ -273,7 +350,7 @@ def triage_groups(groups, gt_index):
 
     for (target, cwe, _cluster_idx) in sorted_keys:
         cluster = groups[(target, cwe, _cluster_idx)]
-        tools = sorted(set(f["tool"] for f in cluster))
+        tools = sorted(set(t for f in cluster for t in f["_tools"]))
         tool_count = len(tools)
 
         # Pick highest severity
@@ -380,6 +457,32 @@ def write_triage_files(results, output_dir):
     return stats
 
 
+def write_triage_db(results, db_path, output_dir):
+    """
+    Store triage results in the `triage` table of a normalized findings
+    database, replacing any from an earlier run. The triage output directory
+    goes in `triage_meta`, so reviewed *-final.csv files written there later
+    are found by calculate-fmeasure.py.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = ", ".join(f"{c} TEXT NOT NULL" for c in TRIAGE_COLUMNS)
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS triage")
+            conn.execute(f"CREATE TABLE triage ({columns})")
+            conn.executemany(
+                f"INSERT INTO triage VALUES ({', '.join('?' * len(TRIAGE_COLUMNS))})",
+                [tuple(r[c] for c in TRIAGE_COLUMNS) for r in results],
+            )
+            conn.execute("CREATE INDEX triage_target ON triage (target)")
+            conn.execute("DROP TABLE IF EXISTS triage_meta")
+            conn.execute("CREATE TABLE triage_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("INSERT INTO triage_meta VALUES ('triage_dir', ?)",
+                         (os.path.abspath(output_dir),))
+    finally:
+        conn.close()
+
+
 def print_summary(stats):
     """Print per-target and total summary to stderr."""
     total_tp = 0
@@ -440,6 +543,9 @@ def main():
 
     # Write output
     stats = write_triage_files(results, output_dir)
+    if is_sqlite(normalized_csv):
+        write_triage_db(results, normalized_csv, output_dir)
+        print(f"Stored triage results in {normalized_csv}", file=sys.stderr)
 
     # Summary
     print("", file=sys.stderr)